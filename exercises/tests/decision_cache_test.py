@@ -0,0 +1,93 @@
+"""
+Tests for DecisionCache in fga_example.cache: TTL expiry, LRU eviction and
+invalidation on tuple writes.
+"""
+import time
+
+from fga_example.cache import DecisionCache
+
+
+class _Clock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _key(user, obj, relation="reader", context=None):
+    return DecisionCache.make_key("model", user, relation, obj, context)
+
+
+def test_ttl_expiry(monkeypatch):
+    """Allowed and denied decisions expire after their own TTL."""
+    clock = _Clock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    cache = DecisionCache(allow_ttl=10.0, deny_ttl=2.0)
+    cache.set(_key("user:anne_smith", "document:1"), True)
+    cache.set(_key("user:bob_jones", "document:1"), False)
+
+    clock.now += 5
+    assert cache.get(_key("user:anne_smith", "document:1")) is True
+    assert cache.get(_key("user:bob_jones", "document:1")) is None
+
+    clock.now += 5
+    assert cache.get(_key("user:anne_smith", "document:1")) is None
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 2
+
+
+def test_zero_ttl_is_not_cached():
+    """A TTL of zero turns caching off for that kind of decision."""
+    cache = DecisionCache(deny_ttl=0)
+    cache.set(_key("user:anne_smith", "document:4"), False)
+    assert cache.get(_key("user:anne_smith", "document:4")) is None
+
+
+def test_lru_eviction():
+    """The least recently used decision is evicted first; a hit refreshes recency."""
+    cache = DecisionCache(max_size=2)
+    cache.set(_key("user:anne_smith", "document:1"), True)
+    cache.set(_key("user:anne_smith", "document:2"), True)
+    assert cache.get(_key("user:anne_smith", "document:1")) is True
+
+    cache.set(_key("user:anne_smith", "document:3"), True)
+    assert cache.get(_key("user:anne_smith", "document:2")) is None
+    assert cache.get(_key("user:anne_smith", "document:1")) is True
+    assert cache.get(_key("user:anne_smith", "document:3")) is True
+    assert cache.stats()["evictions"] == 1
+
+
+def test_leaf_invalidation_drops_object_and_user():
+    """A document tuple drops the decisions on that document and of that user, in every context."""
+    cache = DecisionCache()
+    published, unpublished = {"is_published": True}, {"is_published": False}
+    cache.set(_key("user:anne_smith", "document:1", context=published), True)
+    cache.set(_key("user:anne_smith", "document:1", context=unpublished), True)
+    cache.set(_key("user:david_rodriguez", "document:1"), True)
+    cache.set(_key("user:bob_jones", "document:4"), True)
+    cache.set(_key("user:bob_jones", "document:6", "owner"), True)
+    cache.set(_key("user:emily_patel", "document:5"), True)
+
+    cache.invalidate_tuples([{"user": "user:bob_jones", "relation": "owner", "object": "document:1"}])
+
+    assert cache.get(_key("user:anne_smith", "document:1", context=published)) is None
+    assert cache.get(_key("user:anne_smith", "document:1", context=unpublished)) is None
+    assert cache.get(_key("user:david_rodriguez", "document:1")) is None
+    assert cache.get(_key("user:bob_jones", "document:4")) is None
+    assert cache.get(_key("user:bob_jones", "document:6", "owner")) is None
+    assert cache.get(_key("user:emily_patel", "document:5")) is True
+
+
+def test_non_leaf_invalidation_clears_everything():
+    """A folder or team tuple may change any decision, so the whole cache is flushed."""
+    cache = DecisionCache()
+    cache.set(_key("user:anne_smith", "document:1"), True)
+    cache.set(_key("user:emily_patel", "document:5"), True)
+
+    cache.invalidate_tuples([{"user": "user:emily_patel", "relation": "reader", "object": "folder:2"}])
+
+    assert len(cache) == 0
+    assert cache.stats()["invalidations"] == 1
@@ -0,0 +1,90 @@
+"""
+Tests for the OpenFGA DSL parser in fga_example.dsl.
+
+The project's model.fga is parsed and compared with the JSON form OpenFGA
+expects, including its published_only condition.
+"""
+import pytest
+
+from fga_example.dsl import ModelParseError, load_model, parse_model
+from fga_example.fga_client import get_project_root
+
+
+def _types(model):
+    return {type_def["type"]: type_def for type_def in model["type_definitions"]}
+
+
+def test_parse_project_model():
+    """model.fga compiles to the expected relations, type restrictions and condition."""
+    model = load_model(get_project_root() / "fga_example" / "model.fga")
+    types = _types(model)
+
+    assert model["schema_version"] == "1.1"
+    assert list(types) == ["user", "editors", "folder", "document"]
+
+    folder = types["folder"]
+    assert folder["relations"]["reader"] == {"union": {"child": [
+        {"this": {}},
+        {"computedUserset": {"object": "", "relation": "editor"}},
+    ]}}
+    assert folder["metadata"]["relations"]["editor"]["directly_related_user_types"] == [
+        {"type": "editors", "relation": "member"}]
+    assert folder["metadata"]["relations"]["reader"]["directly_related_user_types"] == [
+        {"type": "user"}, {"type": "user", "condition": "published_only"}]
+
+    document = types["document"]
+    assert document["relations"]["reader"] == {"tupleToUserset": {
+        "tupleset": {"object": "", "relation": "parent"},
+        "computedUserset": {"object": "", "relation": "reader"},
+    }}
+    assert document["relations"]["owner"]["intersection"]["child"][0] == {"this": {}}
+
+    assert model["conditions"] == {"published_only": {
+        "name": "published_only",
+        "expression": "is_published",
+        "parameters": {"is_published": {"type_name": "TYPE_NAME_BOOL"}},
+    }}
+
+
+def test_parse_difference_and_generic_parameters():
+    """'but not' becomes a difference, and container parameter types keep their generic type."""
+    model = parse_model("""
+model
+  schema 1.1
+
+type user
+
+type document
+  relations
+    define blocked: [user]
+    define viewer: [user with in_region] but not blocked
+
+condition in_region(region: string, allowed: list<string>) {
+  region in allowed
+}
+""")
+    viewer = _types(model)["document"]["relations"]["viewer"]
+    assert viewer == {"difference": {
+        "base": {"this": {}},
+        "subtract": {"computedUserset": {"object": "", "relation": "blocked"}},
+    }}
+    assert model["conditions"]["in_region"]["parameters"] == {
+        "region": {"type_name": "TYPE_NAME_STRING"},
+        "allowed": {"type_name": "TYPE_NAME_LIST",
+                    "generic_types": [{"type_name": "TYPE_NAME_STRING"}]},
+    }
+
+
+def test_parse_rejects_unknown_relation():
+    """A relation referencing an undefined relation is rejected."""
+    with pytest.raises(ModelParseError):
+        parse_model("""
+model
+  schema 1.1
+
+type user
+
+type document
+  relations
+    define viewer: editor
+""")
@@ -6,10 +6,10 @@ from the Exercise 1 solution.
 """
 import os
 import asyncio
-from openfga_sdk import OpenFgaClient, ClientConfiguration
 
 # Import the check_access functions from the fga_example package
 from fga_example.fga_client import check_access, batch_check_access
+from fga_example.client_pool import close_fga_clients, get_fga_client
 
 async def test_check_access():
     """Test individual and batch access checks for specific user and document combinations."""
@@ -23,12 +23,8 @@ async def test_check_access():
         print("Make sure to run fga-setup first and add the store ID to your .env file.")
         return
     
-    # Initialize OpenFGA client
-    client = OpenFgaClient(ClientConfiguration(
-        api_url=api_url,
-        store_id=store_id,
-        authorization_model_id=auth_model_id
-    ))
+    # Borrow the shared OpenFGA client
+    client = await get_fga_client(api_url, store_id, auth_model_id)
     
     try:
         # Define the access checks to perform
@@ -47,12 +43,12 @@ async def test_check_access():
         print("\n=== Batch Access Check ===")
         batch_results = await batch_check_access(client, checks)
         
-        for check in batch_results:
-            print(f"Can {check.request.user} {check.request.relation} {check.request.object}? {'Yes' if check.allowed else 'No'}")
+        for check, allowed in zip(checks, batch_results):
+            print(f"Can {check['user']} {check['relation']} {check['object']}? {'Yes' if allowed else 'No'}")
     
     finally:
-        # Close the client session
-        await client.close()
+        # Close the pooled client sessions
+        await close_fga_clients()
 
 if __name__ == "__main__":
     asyncio.run(test_check_access())
\ No newline at end of file
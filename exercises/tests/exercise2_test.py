@@ -6,10 +6,11 @@ from the Exercise 2 solution.
 """
 import os
 import asyncio
-from openfga_sdk import OpenFgaClient, ClientConfiguration
+from openfga_sdk import OpenFgaClient
 
 # Import the list_documents_for_user function from the solution file
 from fga_example.fga_client import list_documents_for_user
+from fga_example.client_pool import close_fga_clients, get_fga_client
 
 async def compare_access_speed(client: OpenFgaClient, user: str):
     """
@@ -68,12 +69,8 @@ async def test_list_documents():
         print("Make sure to run fga-setup first and add the store ID to your .env file.")
         return
     
-    # Initialize OpenFGA client
-    client = OpenFgaClient(ClientConfiguration(
-        api_url=api_url,
-        store_id=store_id,
-        authorization_model_id=auth_model_id
-    ))
+    # Borrow the shared OpenFGA client
+    client = await get_fga_client(api_url, store_id, auth_model_id)
     
     try:
         # Define users to test
@@ -103,8 +100,8 @@ async def test_list_documents():
         print(f"Results match: {'Yes' if comparison['documents_match'] else 'No'}")
     
     finally:
-        # Close the client session
-        await client.close()
+        # Close the pooled client sessions
+        await close_fga_clients()
 
 if __name__ == "__main__":
     asyncio.run(test_list_documents())
\ No newline at end of file
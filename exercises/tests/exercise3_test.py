@@ -7,10 +7,11 @@ from the Exercise 3 solution.
 import os
 import asyncio
 from typing import Dict, List
-from openfga_sdk import OpenFgaClient, ClientConfiguration
+from openfga_sdk import OpenFgaClient
 
 # Import the user listing functions from the Exercise 3 solution
 from fga_example.fga_client import list_users_for_document
+from fga_example.client_pool import close_fga_clients, get_fga_client
 
 async def get_document_access_report(client: OpenFgaClient, document_id: str) -> Dict[str, List[str]]:
     """
@@ -47,12 +48,8 @@ async def test_list_users_for_document():
         print("Make sure to run fga-setup first and add the store ID to your .env file.")
         return
     
-    # Initialize OpenFGA client
-    client = OpenFgaClient(ClientConfiguration(
-        api_url=api_url,
-        store_id=store_id,
-        authorization_model_id=auth_model_id
-    ))
+    # Borrow the shared OpenFGA client
+    client = await get_fga_client(api_url, store_id, auth_model_id)
     
     try:
         # Define the documents to test
@@ -94,8 +91,8 @@ async def test_list_users_for_document():
             print(f"Users with full access (read, write, owner): {', '.join(all_access)}")
     
     finally:
-        # Close the client session
-        await client.close()
+        # Close the pooled client sessions
+        await close_fga_clients()
 
 if __name__ == "__main__":
     asyncio.run(test_list_users_for_document())
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""
+Tests for folder-folded authorization (fga_example.hierarchy) through
+AuthorizedDocumentService, against LocalFgaClient.
+"""
+import asyncio
+
+from fga_example.document_service import AuthorizedDocumentService
+from fga_example.hierarchy import HierarchyResolver
+from fga_example.local_fga import LocalFgaClient
+
+# Document 1 starts in folder 2, read by david_rodriguez; emily_patel reads folder 1
+SECOND_PARENT = {"user": "folder:1", "relation": "parent", "object": "document:1"}
+FIRST_PARENT = {"user": "folder:2", "relation": "parent", "object": "document:1"}
+
+
+def _service():
+    service = AuthorizedDocumentService(hierarchy=HierarchyResolver.from_model_file())
+    service.fga_client = LocalFgaClient.from_files()
+    return service
+
+
+async def _readers(service, document_id):
+    readers = []
+    for user_id in ("david_rodriguez", "emily_patel"):
+        if await service.get_documents_by_ids(user_id, [document_id]):
+            readers.append(user_id)
+    return readers
+
+
+async def _folder_id(service, document_id):
+    row = await service.db.fetchone("SELECT folder_id FROM documents WHERE id = ?", (document_id,))
+    return row["folder_id"]
+
+
+def test_document_with_two_parents():
+    """Readers of either parent folder can read a document with two parents."""
+    service = _service()
+
+    async def run():
+        steps = [(await _folder_id(service, 1), await _readers(service, 1))]
+        await service.write_tuples([SECOND_PARENT])
+        steps.append((await _folder_id(service, 1), await _readers(service, 1)))
+        await service.delete_tuples([FIRST_PARENT])
+        steps.append((await _folder_id(service, 1), await _readers(service, 1)))
+        return steps
+
+    try:
+        steps = asyncio.run(run())
+    finally:
+        service.close()
+    assert steps == [
+        (2, ["david_rodriguez"]),
+        # Two parents: not folded, checked on its own
+        (None, ["david_rodriguez", "emily_patel"]),
+        (1, ["emily_patel"]),
+    ]
@@ -0,0 +1,129 @@
+"""
+Tests for the in-process evaluator in fga_example.local_fga.
+
+LocalFgaClient is loaded with model.fga and sample_tuples.json and queried
+through the fga_client helpers, as the service does against OpenFGA.
+"""
+import asyncio
+
+import pytest
+from openfga_sdk.exceptions import FgaValidationException
+
+from fga_example.dsl import parse_model
+from fga_example.fga_client import check_access, list_documents_for_user, list_users_for_document
+from fga_example.local_fga import LocalFgaClient
+
+
+def _published(is_published):
+    return {"is_published": is_published}
+
+
+def test_check():
+    """Folder readers and team editors can read the documents in their folder only."""
+    client = LocalFgaClient.from_files()
+
+    async def run():
+        return [
+            await check_access(client, "anne_smith", "reader", "document:1", context=_published(True)),
+            await check_access(client, "anne_smith", "reader", "document:4", context=_published(True)),
+            await check_access(client, "david_rodriguez", "reader", "document:3", context=_published(False)),
+            await check_access(client, "anne_smith", "owner", "document:2"),
+            await check_access(client, "bob_jones", "owner", "document:2"),
+        ]
+
+    assert asyncio.run(run()) == [True, False, True, True, False]
+
+
+def test_check_published_only():
+    """frank_miller's published_only grant only covers published documents."""
+    client = LocalFgaClient.from_files()
+
+    async def run():
+        return [
+            await check_access(client, "frank_miller", "reader", "document:4", context=_published(True)),
+            await check_access(client, "frank_miller", "reader", "document:4", context=_published(False)),
+            await check_access(client, "emily_patel", "reader", "document:4", context=_published(False)),
+        ]
+
+    assert asyncio.run(run()) == [True, False, True]
+
+
+def test_unconditional_grants_need_no_context():
+    """frank_miller's conditional tuple on folder:1 does not need a context for other users."""
+    client = LocalFgaClient.from_files()
+
+    assert client.check_sync("user:emily_patel", "reader", "document:4")
+    assert not client.check_sync("user:anne_smith", "reader", "document:4")
+    assert client.list_users_sync("document:4", "reader", "user") == [
+        "user:bob_jones", "user:clara_zhang", "user:emily_patel"]
+    with pytest.raises(FgaValidationException):
+        client.check_sync("user:frank_miller", "reader", "document:4")
+
+
+def test_list_objects():
+    """list_objects follows folder parents, and the condition context decides conditional grants."""
+    client = LocalFgaClient.from_files()
+
+    async def run():
+        return (
+            await list_documents_for_user(client, "anne_smith", context=_published(False)),
+            await list_documents_for_user(client, "frank_miller", context=_published(True)),
+            await list_documents_for_user(client, "frank_miller", context=_published(False)),
+            await list_documents_for_user(client, "bob_jones", "owner"),
+        )
+
+    anne, frank_published, frank_unpublished, bob_owner = asyncio.run(run())
+    assert sorted(anne) == ["1", "2", "3"]
+    assert sorted(frank_published) == ["4", "5", "6"]
+    assert frank_unpublished == []
+    assert bob_owner == ["6"]
+
+
+def test_list_users():
+    """list_users expands team membership and applies the condition context."""
+    client = LocalFgaClient.from_files()
+
+    async def run():
+        return (
+            await list_users_for_document(client, "4", context=_published(True)),
+            await list_users_for_document(client, "4", context=_published(False)),
+            await list_users_for_document(client, "2", "owner"),
+        )
+
+    published, unpublished, owners = asyncio.run(run())
+    assert sorted(published) == ["bob_jones", "clara_zhang", "emily_patel", "frank_miller"]
+    assert sorted(unpublished) == ["bob_jones", "clara_zhang", "emily_patel"]
+    assert owners == ["anne_smith"]
+
+
+def test_check_cyclic_usersets():
+    """A userset cycle resolves to False without caching a denial for nodes on the cycle."""
+    model = parse_model("""
+model
+  schema 1.1
+
+type user
+
+type group
+  relations
+    define member: [user, group#member]
+
+type doc
+  relations
+    define allowed: [group#member]
+    define approved: [group#member]
+    define viewer: allowed and approved
+""")
+    client = LocalFgaClient(model, [
+        {"user": "group:a#member", "relation": "allowed", "object": "doc:1"},
+        {"user": "group:b#member", "relation": "approved", "object": "doc:1"},
+        {"user": "group:b#member", "relation": "member", "object": "group:a"},
+        {"user": "group:a#member", "relation": "member", "object": "group:b"},
+        {"user": "group:c#member", "relation": "member", "object": "group:a"},
+        {"user": "user:x", "relation": "member", "object": "group:c"},
+    ])
+
+    # group:b is met while group:a is still in progress, before group:a reaches user:x
+    assert client.check_sync("user:x", "viewer", "doc:1")
+    assert client.check_sync("user:x", "member", "group:b")
+    assert not client.check_sync("user:y", "viewer", "doc:1")
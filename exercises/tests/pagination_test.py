@@ -0,0 +1,79 @@
+"""
+Tests for keyset-paginated authorized search
+(AuthorizedDocumentService.search_documents_page) against LocalFgaClient.
+"""
+import asyncio
+import json
+
+import pytest
+
+from fga_example.document_service import AuthorizedDocumentService, _decode_cursor, _encode_cursor
+from fga_example.dsl import load_model
+from fga_example.fga_client import get_project_root
+from fga_example.local_fga import LocalFgaClient
+
+# Identical documents 7-30: even ids in folder 2 (anne_smith's team), odd ids in folder 1
+LEDGER_IDS = range(7, 31)
+
+
+def _service():
+    package_dir = get_project_root() / "fga_example"
+    with open(package_dir / "sample_tuples.json", 'r') as file:
+        tuples = json.load(file)
+    tuples += [{"user": f"folder:{2 if doc_id % 2 == 0 else 1}", "relation": "parent",
+                "object": f"document:{doc_id}"} for doc_id in LEDGER_IDS]
+
+    service = AuthorizedDocumentService()
+    service.fga_client = LocalFgaClient(load_model(package_dir / "model.fga"), tuples)
+    service.db.write_sync(lambda conn: conn.executemany(
+        "INSERT INTO documents (id, title, data, created_at, is_published, folder_id) "
+        "VALUES (?, 'Ledger', 'Quarterly ledger', '2025-09-01 00:00:00', 1, ?)",
+        [(doc_id, 2 if doc_id % 2 == 0 else 1) for doc_id in LEDGER_IDS]))
+    return service
+
+
+def _pages(service, user_id, search_term, limit):
+    async def run():
+        pages, cursor = [], None
+        while True:
+            page = await service.search_documents_page(user_id, search_term, limit, cursor)
+            pages.append([document.id for document in page.documents])
+            cursor = page.next_cursor
+            if cursor is None:
+                return pages
+    return asyncio.run(run())
+
+
+def test_cursor_round_trip():
+    """A cursor carries the last consumed id and only resumes the search it came from."""
+    assert _decode_cursor(None, "ledger") == 0
+    assert _decode_cursor(_encode_cursor(42, "ledger"), "ledger") == 42
+    with pytest.raises(ValueError):
+        _decode_cursor(_encode_cursor(42, "ledger"), "survey")
+    with pytest.raises(ValueError):
+        _decode_cursor("not a cursor", "ledger")
+
+
+def test_pages_of_identical_documents():
+    """Documents with equal titles and data are ordered by id, each returned exactly once."""
+    service = _service()
+    try:
+        pages = _pages(service, "anne_smith", "ledger", 5)
+    finally:
+        service.close()
+    assert pages == [[8, 10, 12, 14, 16], [18, 20, 22, 24, 26], [28, 30]]
+
+
+def test_page_filled_mid_block():
+    """A page filled in the middle of a block resumes right after its last document."""
+    service = _service()
+    try:
+        pages = _pages(service, "emily_patel", "ledger", 4)
+        everything = [document.id for document in asyncio.run(
+            service.search_documents("emily_patel", "ledger"))]
+    finally:
+        service.close()
+    assert [doc_id for page in pages for doc_id in page] == sorted(everything)
+    assert everything == [doc_id for doc_id in LEDGER_IDS if doc_id % 2 == 1]
+    # Matches ending on a page boundary leave one empty last page: pages do not look ahead
+    assert pages[-1] == [] and all(len(page) == 4 for page in pages[:-1])
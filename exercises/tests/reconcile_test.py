@@ -0,0 +1,78 @@
+"""
+Tests for diff_tuples in fga_example.reconcile, and for reading the store
+back with read_tuple_keys (against LocalFgaClient).
+"""
+import asyncio
+
+from fga_example.dsl import parse_model
+from fga_example.local_fga import LocalFgaClient
+from fga_example.reconcile import diff_tuples, read_tuple_keys, tuple_key
+
+EMILY = {"user": "user:emily_patel", "relation": "reader", "object": "folder:1"}
+FRANK = {"user": "user:frank_miller", "relation": "reader", "object": "folder:1",
+         "condition": {"name": "published_only"}}
+DAVID = {"user": "user:david_rodriguez", "relation": "reader", "object": "folder:2"}
+
+
+def _current(*tuples):
+    return {tuple_key(t) for t in tuples}
+
+
+def test_diff_adds_and_removes():
+    """Missing tuples are written, extra ones deleted and the rest left alone."""
+    diff = diff_tuples(_current(EMILY, DAVID), [EMILY, FRANK])
+    assert diff.to_write == [FRANK]
+    assert diff.to_delete == [DAVID]
+    assert diff.unchanged == 1
+
+
+def test_diff_unchanged():
+    """A store already in the desired state needs no writes or deletes."""
+    diff = diff_tuples(_current(EMILY, FRANK), [FRANK, EMILY, EMILY])
+    assert (diff.to_write, diff.to_delete, diff.unchanged) == ([], [], 2)
+
+
+def test_diff_condition_change():
+    """A tuple whose condition or condition context changed is deleted and written again."""
+    unconditional = {key: value for key, value in FRANK.items() if key != "condition"}
+    diff = diff_tuples(_current(unconditional), [FRANK])
+    assert diff.to_write == [FRANK]
+    assert diff.to_delete == [unconditional]
+
+    region = {"user": "user:anne_smith", "relation": "reader", "object": "folder:2",
+              "condition": {"name": "in_region", "context": {"region": "eu"}}}
+    moved = {**region, "condition": {"name": "in_region", "context": {"region": "us"}}}
+    diff = diff_tuples(_current(region), [moved])
+    assert diff.to_write == [moved]
+    assert diff.to_delete == [{"user": "user:anne_smith", "relation": "reader", "object": "folder:2"}]
+    assert diff.unchanged == 0
+
+
+def test_read_tuple_keys_matches_desired():
+    """Tuples read back from a store diff as unchanged against the tuples written to it."""
+    model = parse_model("""
+model
+  schema 1.1
+
+type user
+
+type folder
+  relations
+    define reader: [user, user with published_only]
+
+type document
+  relations
+    define parent: [folder]
+
+condition published_only(is_published: bool) {
+  is_published
+}
+""")
+    parent = {"user": "folder:1", "relation": "parent", "object": "document:4"}
+    client = LocalFgaClient(model, [EMILY, FRANK, parent])
+
+    current = asyncio.run(read_tuple_keys(client))
+    diff = diff_tuples(current, [EMILY, FRANK, parent])
+    assert (diff.to_write, diff.to_delete, diff.unchanged) == ([], [], 3)
+
+    assert asyncio.run(read_tuple_keys(client, ["document"])) == _current(parent)
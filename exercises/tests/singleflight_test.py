@@ -0,0 +1,108 @@
+"""
+Tests for SingleFlight in fga_example.singleflight: coalescing of concurrent
+identical requests and cancellation of their callers.
+"""
+import asyncio
+
+import pytest
+
+from fga_example.singleflight import SingleFlight
+
+
+class _Request:
+    """Fake request that counts its calls and finishes when released."""
+
+    def __init__(self, result="allowed", error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+        self.release = None
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_callers_share_one_request():
+    """Callers with the same key share one request; other keys start their own."""
+    flight, request, other = SingleFlight(), _Request(), _Request("denied")
+
+    async def run():
+        request.release = other.release = asyncio.Event()
+        callers = [asyncio.create_task(flight.do("check", request)) for _ in range(5)]
+        callers.append(asyncio.create_task(flight.do("other", other)))
+        await asyncio.sleep(0)
+        assert len(flight) == 2
+        request.release.set()
+        return await asyncio.gather(*callers)
+
+    assert asyncio.run(run()) == ["allowed"] * 5 + ["denied"]
+    assert (request.calls, other.calls) == (1, 1)
+    assert flight.stats() == {"started": 2, "coalesced": 4, "in_flight": 0}
+
+
+def test_error_reaches_every_waiter():
+    """An error of the shared request is raised to every caller."""
+    flight, request = SingleFlight(), _Request(error=RuntimeError("unavailable"))
+
+    async def run():
+        request.release = asyncio.Event()
+        callers = [asyncio.create_task(flight.do("check", request)) for _ in range(3)]
+        await asyncio.sleep(0)
+        request.release.set()
+        return await asyncio.gather(*callers, return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert [type(result) for result in results] == [RuntimeError] * 3
+    assert request.calls == 1
+
+
+def test_cancelled_leader_leaves_request_to_followers():
+    """Cancelling the caller that started the request does not cancel it for the others."""
+    flight, request = SingleFlight(), _Request()
+
+    async def run():
+        request.release = asyncio.Event()
+        leader = asyncio.create_task(flight.do("check", request))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("check", request))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        request.release.set()
+        return await follower
+
+    assert asyncio.run(run()) == "allowed"
+    assert request.calls == 1
+    assert not request.cancelled
+
+
+def test_request_cancelled_once_every_caller_is_gone():
+    """When every caller is cancelled the request is cancelled, and the next caller starts afresh."""
+    flight, request = SingleFlight(), _Request()
+
+    async def run():
+        request.release = asyncio.Event()
+        callers = [asyncio.create_task(flight.do("check", request)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert request.cancelled
+        assert len(flight) == 0
+
+        request.release.set()
+        return await flight.do("check", request)
+
+    assert asyncio.run(run()) == "allowed"
+    assert request.calls == 2
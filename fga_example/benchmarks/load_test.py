@@ -0,0 +1,131 @@
+"""
+Load test for the document API (fga_example.main).
+
+Sends a weighted mix of requests from concurrent connections for a fixed
+duration and reports requests per second, requests per second per server
+core and latency percentiles per endpoint.
+
+Usage, against the in-process authorization backend:
+    FGA_BACKEND=local uvicorn fga_example.main:app --workers 4 --log-level warning
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --cores 4 --duration 30
+
+Pass --output to keep the results as JSON for comparison between runs.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import aiohttp
+
+from fga_example.bench import percentile
+
+# Default user set: the users of sample_tuples.json
+USERS = ["anne_smith", "bob_jones", "clara_zhang", "david_rodriguez", "emily_patel", "frank_miller"]
+SEARCH_TERMS = ["behavioral", "memory", "data", "study", "experiment", "research"]
+
+# Weighted request mix: (name, weight)
+PROFILE = [
+    ("get", 50),
+    ("batch", 10),
+    ("search", 25),
+    ("search_stream", 5),
+    ("me", 10),
+]
+
+
+def make_request(name: str, rng: random.Random, max_id: int):
+    """Return (method, path, json body) for one request of the profile."""
+    if name == "get":
+        return "GET", f"/documents/{rng.randint(1, max_id)}", None
+    if name == "batch":
+        return "POST", "/documents/batch", {"ids": [rng.randint(1, max_id) for _ in range(20)]}
+    if name == "search":
+        return "GET", f"/search?q={rng.choice(SEARCH_TERMS)}&limit=20", None
+    if name == "search_stream":
+        return "GET", f"/search/stream?q={rng.choice(SEARCH_TERMS)}", None
+    if name == "me":
+        return "GET", "/me/documents", None
+    raise ValueError(f"Unknown request {name!r}")
+
+
+async def run(url: str, duration: float, concurrency: int, max_id: int, users, seed: int) -> dict:
+    names = [name for name, _ in PROFILE]
+    weights = [weight for _, weight in PROFILE]
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    deadline = time.perf_counter() + duration
+
+    async def worker(session: aiohttp.ClientSession, worker_id: int):
+        rng = random.Random(seed + worker_id)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            method, path, body = make_request(name, rng, max_id)
+            headers = {"X-User-Id": rng.choice(users)}
+            start = time.perf_counter()
+            try:
+                async with session.request(method, url + path, json=body, headers=headers) as response:
+                    await response.read()
+                    # 403 and 404 are normal answers for random IDs
+                    if response.status >= 500:
+                        errors[name] += 1
+                        continue
+            except aiohttp.ClientError:
+                errors[name] += 1
+                continue
+            latencies[name].append((time.perf_counter() - start) * 1000)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(session, i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    results = {}
+    for name in names:
+        values = sorted(latencies[name])
+        results[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+        }
+    total = sum(len(values) for values in latencies.values())
+    return {"elapsed_s": round(elapsed, 3), "requests": total, "rps": round(total / elapsed, 1),
+            "endpoints": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the document API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent connections")
+    parser.add_argument("--cores", type=int, default=1,
+                        help="Server cores (uvicorn workers) used to report requests per second per core")
+    parser.add_argument("--max-id", type=int, default=6, help="Highest document ID to request")
+    parser.add_argument("--users", default=",".join(USERS), help="Comma-separated user IDs")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url.rstrip("/"), args.duration, args.concurrency, args.max_id,
+                             args.users.split(","), args.seed))
+    result["cores"] = args.cores
+    result["rps_per_core"] = round(result["rps"] / args.cores, 1)
+
+    print(f"{result['requests']} requests in {result['elapsed_s']}s: "
+          f"{result['rps']} req/s, {result['rps_per_core']} req/s per core")
+    print(f"{'endpoint':<15}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in result["endpoints"].items():
+        print(f"{name:<15}{stats['requests']:>10}{stats['errors']:>8}{stats['p50_ms']:>10.2f}"
+              f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(result, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark the ways of turning documents rows into API output.
+
+Fetches the same rows from a synthetic documents table and times each
+representation, with and without JSON serialization, in rows per second:
+
+    validated     Document(**dict(row)) per row (the original path)
+    validated_bulk  documents_from_rows: one TypeAdapter call for all rows
+    constructed   Document.model_construct per row, no validation
+    row_view      DocumentRow.from_rows (__slots__ view, no Pydantic)
+    row_view_no_data  DocumentRow without selecting the data column
+
+Usage:
+    python benchmarks/row_materialization.py --rows 100000 --data-size 2000
+"""
+
+import argparse
+import sqlite3
+import statistics
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+
+from fga_example.document_service import (
+    Document,
+    DocumentRow,
+    create_tables,
+    document_columns,
+    documents_from_rows,
+    documents_json,
+)
+
+
+def build_database(count: int, data_size: int) -> sqlite3.Connection:
+    """Create an in-memory documents table with count rows of data_size characters of data."""
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    create_tables(conn)
+    data = ("lorem ipsum dolor sit amet " * (data_size // 27 + 1))[:data_size]
+    conn.executemany(
+        "INSERT INTO documents (id, title, data, created_at, is_published) VALUES (?, ?, ?, ?, ?)",
+        ((i, f"Document {i}", data, "2025-08-11 07:19:32", i % 2) for i in range(1, count + 1)),
+    )
+    conn.commit()
+    return conn
+
+
+def constructed(rows):
+    return [Document.model_construct(id=row["id"], title=row["title"], data=row["data"],
+                                     created_at=row["created_at"], is_published=bool(row["is_published"]))
+            for row in rows]
+
+
+DOCUMENT_LIST = TypeAdapter(List[Document])
+
+# name -> (include data column, materialize, serialize)
+REPRESENTATIONS = {
+    "validated": (True, lambda rows: [Document(**dict(row)) for row in rows], DOCUMENT_LIST.dump_json),
+    "validated_bulk": (True, documents_from_rows, DOCUMENT_LIST.dump_json),
+    "constructed": (True, constructed, DOCUMENT_LIST.dump_json),
+    "row_view": (True, DocumentRow.from_rows, documents_json),
+    "row_view_no_data": (False, DocumentRow.from_rows, documents_json),
+}
+
+
+def time_representation(conn: sqlite3.Connection, include_data: bool, materialize, serialize,
+                        repeat: int) -> tuple:
+    """Return median (fetch+materialize, fetch+materialize+serialize) seconds."""
+    sql = f"SELECT {document_columns(include_data)} FROM documents ORDER BY id"
+    build_times, total_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        documents = materialize(conn.execute(sql).fetchall())
+        built = time.perf_counter()
+        serialize(documents)
+        build_times.append(built - start)
+        total_times.append(time.perf_counter() - start)
+    return statistics.median(build_times), statistics.median(total_times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark document row materialization")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--data-size", type=int, default=2000, help="Characters in each data column")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    conn = build_database(args.rows, args.data_size)
+    print(f"{'representation':<18}  {'rows/s (objects)':>17}  {'rows/s (to JSON)':>17}")
+    for name, (include_data, materialize, serialize) in REPRESENTATIONS.items():
+        build_s, total_s = time_representation(conn, include_data, materialize, serialize, args.repeat)
+        print(f"{name:<18}  {args.rows / build_s:>17,.0f}  {args.rows / total_s:>17,.0f}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
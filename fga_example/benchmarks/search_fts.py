@@ -0,0 +1,95 @@
+"""
+Benchmark LIKE scans against the FTS5 index for document search.
+
+Builds a synthetic documents table of each requested size in a temporary
+SQLite file, then times the same searches through the LIKE fallback and
+through the documents_fts index.
+
+Usage:
+    python benchmarks/search_fts.py --sizes 10000,100000,1000000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from fga_example.document_service import create_tables, search_sql
+
+WORDS = [
+    "behavioral", "survey", "results", "statistical", "analysis", "participant",
+    "responses", "stimuli", "conditioning", "experiment", "control", "group",
+    "therapy", "methods", "review", "memory", "formation", "attention", "span",
+    "cognitive", "bias", "research", "decision", "making", "processes", "data",
+]
+# Rare words appear in roughly one document in 10,000
+RARE_WORDS = [f"rareword{i}" for i in range(100)]
+
+QUERIES = {
+    "common word": "analysis",
+    "two words": "memory formation",
+    "prefix": "cogn",
+    "rare word": "rareword7",
+}
+
+
+def generate_documents(count: int, seed: int = 42):
+    """Yield synthetic document rows."""
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        title = " ".join(rng.choices(WORDS, k=4)).title()
+        words = rng.choices(WORDS, k=12)
+        if rng.random() < 0.01:
+            words.append(rng.choice(RARE_WORDS))
+        yield (i, title, " ".join(words), "2025-08-11 07:19:32", rng.random() < 0.5)
+
+
+def build_database(path: str, count: int) -> sqlite3.Connection:
+    """Create and fill a documents database with count rows."""
+    conn = sqlite3.connect(path)
+    create_tables(conn)
+    conn.executemany(
+        "INSERT INTO documents (id, title, data, created_at, is_published) VALUES (?, ?, ?, ?, ?)",
+        generate_documents(count),
+    )
+    conn.commit()
+    return conn
+
+
+def time_query(conn: sqlite3.Connection, sql: str, params: tuple, repeat: int) -> tuple:
+    """Return (median milliseconds, row count) for a query."""
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(conn.execute(sql, params).fetchall())
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LIKE against FTS5 document search")
+    parser.add_argument("--sizes", default="10000,100000,1000000",
+                        help="Comma-separated document counts")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query")
+    args = parser.parse_args()
+
+    print(f"{'documents':>10}  {'query':<12}  {'rows':>8}  {'LIKE ms':>9}  {'FTS ms':>9}  {'speedup':>8}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            conn = build_database(os.path.join(tmp, "bench.db"), size)
+            print(f"# built {size} documents in {time.perf_counter() - start:.1f}s")
+            for name, term in QUERIES.items():
+                like_ms, like_rows = time_query(conn, *search_sql(False, term), args.repeat)
+                fts_ms, fts_rows = time_query(conn, *search_sql(True, term), args.repeat)
+                print(f"{size:>10}  {name:<12}  {fts_rows:>8}  {like_ms:>9.2f}  {fts_ms:>9.2f}  "
+                      f"{like_ms / fts_ms:>7.1f}x")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
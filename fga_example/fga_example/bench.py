@@ -0,0 +1,268 @@
+"""
+Authorization benchmark harness.
+
+This module contains:
+1. StoreShape: parameters of a synthetic store built on model.fga
+2. generate_tuples: the tuples of such a store
+3. run_benchmark: drives the fga_client operations at a given concurrency
+   and reports throughput and latency percentiles
+
+Any object implementing the client interface used by fga_client.py can be
+benchmarked, including LocalFgaClient:
+
+    client = LocalFgaClient(load_model(model_path))
+    report = await run_benchmark(client, StoreShape(users=1000))
+    print(report.model_dump_json(indent=2))
+"""
+
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from openfga_sdk import OpenFgaClient
+from pydantic import BaseModel
+
+from fga_example.bulk_import import import_tuples
+from fga_example.client_pool import get_client_factory
+from fga_example.fga_client import (
+    batch_check_access,
+    check_access,
+    get_project_root,
+    initialize_authorization_model,
+    initialize_store,
+    list_documents_for_user,
+    list_users_for_document,
+)
+
+OPERATIONS = ("check", "batch_check", "list_objects", "list_users")
+
+
+class StoreShape(BaseModel):
+    """Pydantic model describing the size of a synthetic store."""
+    users: int = 100
+    teams: int = 10
+    folders: int = 50
+    documents_per_folder: int = 20
+    readers_per_folder: int = 5
+    seed: int = 42
+
+
+class OperationResult(BaseModel):
+    """Pydantic model holding the measurements for one operation."""
+    operation: str
+    requests: int
+    concurrency: int
+    errors: int
+    total_s: float
+    throughput: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class BenchmarkReport(BaseModel):
+    """Pydantic model for a complete benchmark run, as written to JSON."""
+    backend: str
+    started_at: str
+    shape: StoreShape
+    tuples: int
+    load_s: float
+    results: List[OperationResult]
+
+
+def generate_tuples(shape: StoreShape) -> List[dict]:
+    """
+    Generate the tuples of a synthetic store.
+
+    Users are spread round-robin over the editors teams, each folder is
+    edited by one team and read by readers_per_folder random users, and
+    each document is owned by a member of its folder's editing team.
+
+    Args:
+        shape: StoreShape describing the store
+
+    Returns:
+        List of dicts with user, relation, object keys
+    """
+    rng = random.Random(shape.seed)
+    tuples = []
+    members: Dict[int, List[int]] = {team: [] for team in range(shape.teams)}
+    for user in range(shape.users):
+        team = user % shape.teams
+        members[team].append(user)
+        tuples.append({"user": f"user:u{user}", "relation": "member", "object": f"editors:t{team}"})
+
+    for folder in range(shape.folders):
+        team = folder % shape.teams
+        tuples.append({"user": f"editors:t{team}#member", "relation": "editor",
+                       "object": f"folder:{folder}"})
+        for user in rng.sample(range(shape.users), min(shape.readers_per_folder, shape.users)):
+            tuples.append({"user": f"user:u{user}", "relation": "reader", "object": f"folder:{folder}"})
+        for i in range(shape.documents_per_folder):
+            document = folder * shape.documents_per_folder + i + 1
+            tuples.append({"user": f"folder:{folder}", "relation": "parent",
+                           "object": f"document:{document}"})
+            if members[team]:
+                tuples.append({"user": f"user:u{rng.choice(members[team])}", "relation": "owner",
+                               "object": f"document:{document}"})
+    return tuples
+
+
+async def load_tuples(client: OpenFgaClient, tuples: List[dict]) -> float:
+    """
+    Write tuples with the bulk import path.
+
+    Returns:
+        Seconds spent writing
+    """
+    progress = await import_tuples(client, tuples, on_progress=None)
+    return progress.elapsed_s
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Return the p-th percentile (0-100) of sorted values, nearest-rank method."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), round(p / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+async def measure(operation: str, call: Callable[[int], Awaitable], requests: int,
+                  concurrency: int) -> OperationResult:
+    """
+    Run call(i) for i in range(requests) with at most concurrency in flight.
+
+    Args:
+        operation: Name reported in the result
+        call: Coroutine function taking the request number
+        requests: Total number of requests
+        concurrency: Number of concurrent workers
+
+    Returns:
+        OperationResult with latencies in milliseconds
+    """
+    latencies: List[float] = []
+    errors = 0
+    next_request = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in next_request:
+            start = time.perf_counter()
+            try:
+                await call(i)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    total = time.perf_counter() - start
+
+    latencies.sort()
+    return OperationResult(
+        operation=operation,
+        requests=requests,
+        concurrency=concurrency,
+        errors=errors,
+        total_s=round(total, 6),
+        throughput=round(len(latencies) / total, 2) if total > 0 else 0.0,
+        mean_ms=round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+        p50_ms=round(percentile(latencies, 50), 4),
+        p95_ms=round(percentile(latencies, 95), 4),
+        p99_ms=round(percentile(latencies, 99), 4),
+        max_ms=round(latencies[-1], 4) if latencies else 0.0,
+    )
+
+
+async def run_benchmark(client: OpenFgaClient, shape: StoreShape, backend: str = "custom",
+                        operations: Optional[List[str]] = None, requests: int = 200,
+                        concurrency: int = 10, batch_size: int = 50,
+                        load: bool = True) -> BenchmarkReport:
+    """
+    Load a synthetic store into client and benchmark the fga_client operations.
+
+    Args:
+        client: OpenFgaClient or a compatible stand-in such as LocalFgaClient
+        shape: StoreShape of the store to generate
+        backend: Backend name recorded in the report
+        operations: Subset of OPERATIONS to run (all by default)
+        requests: Number of requests per operation
+        concurrency: Number of requests in flight at once
+        batch_size: Number of checks per batch_check request
+        load: Write the generated tuples first; disable when the store is already loaded
+
+    Returns:
+        BenchmarkReport with one OperationResult per operation
+    """
+    started_at = datetime.now(timezone.utc).isoformat()
+    tuples = generate_tuples(shape)
+    load_s = await load_tuples(client, tuples) if load else 0.0
+
+    rng = random.Random(shape.seed + 1)
+    documents = shape.folders * shape.documents_per_folder
+
+    def random_user() -> str:
+        return f"u{rng.randrange(shape.users)}"
+
+    def random_document() -> str:
+        return str(rng.randrange(documents) + 1)
+
+    calls = {
+        "check": lambda i: check_access(client, random_user(), "reader", f"document:{random_document()}"),
+        "batch_check": lambda i: batch_check_access(client, [
+            {"user": random_user(), "relation": "reader", "object": f"document:{random_document()}"}
+            for _ in range(batch_size)]),
+        "list_objects": lambda i: list_documents_for_user(client, random_user()),
+        "list_users": lambda i: list_users_for_document(client, random_document()),
+    }
+
+    results = []
+    for operation in operations or OPERATIONS:
+        if operation not in calls:
+            raise ValueError(f"Unknown operation {operation!r}, expected one of {', '.join(OPERATIONS)}")
+        results.append(await measure(operation, calls[operation], requests, concurrency))
+
+    return BenchmarkReport(backend=backend, started_at=started_at, shape=shape,
+                           tuples=len(tuples), load_s=round(load_s, 6), results=results)
+
+
+async def create_client(backend: str) -> OpenFgaClient:
+    """
+    Create an empty store for the benchmark.
+
+    Args:
+        backend: "local" for an in-process LocalFgaClient, "server" for a new
+            store on the OpenFGA server at OPENFGA_API_URL
+
+    Returns:
+        A client bound to the new store and model; server clients are pooled,
+        release them with client_pool.close_fga_clients()
+    """
+    model_path = get_project_root() / "fga_example" / "model.fga"
+    if backend == "local":
+        from fga_example.dsl import load_model
+        from fga_example.local_fga import LocalFgaClient
+        return LocalFgaClient(load_model(model_path))
+    if backend == "server":
+        api_url = os.environ.get("OPENFGA_API_URL", "http://localhost:8080")
+        store_id = await initialize_store(api_url=api_url, store_name="benchmark store")
+        model_id = await initialize_authorization_model(model_path=model_path, store_id=store_id,
+                                                        api_url=api_url)
+        return await get_client_factory().get(api_url, store_id, model_id)
+    raise ValueError(f"Unknown backend {backend!r}, expected 'local' or 'server'")
+
+
+def print_report(report: BenchmarkReport) -> None:
+    """Print a benchmark report as a table."""
+    print(f"{report.backend}: {report.tuples} tuples loaded in {report.load_s:.2f}s")
+    print(f"{'operation':<14}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for result in report.results:
+        print(f"{result.operation:<14}{result.throughput:>10.1f}{result.p50_ms:>10.2f}"
+              f"{result.p95_ms:>10.2f}{result.p99_ms:>10.2f}{result.errors:>8}")
@@ -0,0 +1,234 @@
+"""
+Bulk import of relationship tuples.
+
+This module contains:
+1. iter_tuples: streams tuples from a JSON array or JSONL file
+2. import_tuples: writes (or deletes) a tuple stream in limit-sized
+   transactions with bounded concurrency, retries and progress reporting
+
+Imports are idempotent: tuples that already exist in the store (or, when
+deleting, no longer exist) count as skipped rather than failing the
+import, so an interrupted import can simply be run again.
+"""
+
+import asyncio
+import json
+import random
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Set
+
+import aiohttp
+from openfga_sdk import OpenFgaClient
+from openfga_sdk.exceptions import (
+    FgaValidationException,
+    RateLimitExceededError,
+    ServiceException,
+    ValidationException,
+)
+from pydantic import BaseModel
+
+from fga_example import metrics
+from fga_example.cache import DecisionCache
+from fga_example.fga_client import WRITE_CHUNK_SIZE, delete_tuples, write_tuples
+
+IMPORT_CONCURRENCY = 8
+IMPORT_MAX_RETRIES = 5
+
+# Errors worth retrying: throttling, server errors and dropped connections
+RETRYABLE_ERRORS = (RateLimitExceededError, ServiceException, aiohttp.ClientError, asyncio.TimeoutError)
+
+
+class ImportProgress(BaseModel):
+    """Pydantic model with the running totals of a tuple import."""
+    written: int = 0
+    skipped: int = 0
+    retries: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Tuples written or skipped per second."""
+        return (self.written + self.skipped) / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+def iter_tuples(path, read_size: int = 1 << 16) -> Iterator[dict]:
+    """
+    Stream tuples from a file without loading it whole.
+
+    Args:
+        path: A .jsonl file with one tuple per line, or a .json file holding
+            an array of tuples (the sample_tuples.json format)
+        read_size: Number of characters read at a time from JSON files
+
+    Yields:
+        Dicts with user, relation, object keys
+    """
+    with open(path, 'r') as file:
+        if str(path).endswith(".jsonl"):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        decoder = json.JSONDecoder()
+        buffer = ""
+        pos = 0
+        started = False
+
+        def fill() -> bool:
+            nonlocal buffer, pos
+            data = file.read(read_size)
+            buffer = buffer[pos:] + data
+            pos = 0
+            return bool(data)
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                if not fill():
+                    raise ValueError(f"{path}: unexpected end of file, expected a JSON array of tuples")
+                continue
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError(f"{path}: expected a JSON array of tuples")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The element continues past the buffer
+                if not fill():
+                    raise
+                continue
+            pos = end
+            yield item
+
+
+def _already_applied(error: Exception, delete: bool) -> bool:
+    message = "does not exist" if delete else "already exists"
+    return isinstance(error, (ValidationException, FgaValidationException)) and message in str(error)
+
+
+async def _write_chunk(client: OpenFgaClient, chunk: List[dict], progress: ImportProgress,
+                       max_retries: int, backoff: float, cache: Optional[DecisionCache],
+                       delete: bool = False) -> None:
+    """Write (or delete) one transaction, retrying transient errors and splitting out no-op tuples."""
+    attempt = 0
+    while True:
+        try:
+            if delete:
+                await delete_tuples(client, chunk, cache=cache)
+            else:
+                await write_tuples(client, chunk, cache=cache)
+            progress.written += len(chunk)
+            return
+        except RETRYABLE_ERRORS:
+            if attempt >= max_retries:
+                raise
+            progress.retries += 1
+            metrics.record_retry("delete" if delete else "write")
+            # Exponential backoff with full jitter
+            await asyncio.sleep(random.uniform(0, backoff * 2 ** attempt))
+            attempt += 1
+        except Exception as e:
+            if not _already_applied(e, delete):
+                raise
+            if len(chunk) == 1:
+                progress.skipped += 1
+                return
+            # A transaction fails as a whole: bisect until the no-op tuples are isolated
+            middle = len(chunk) // 2
+            await _write_chunk(client, chunk[:middle], progress, max_retries, backoff, cache, delete)
+            await _write_chunk(client, chunk[middle:], progress, max_retries, backoff, cache, delete)
+            return
+
+
+def print_progress(progress: ImportProgress) -> None:
+    """Default progress reporter."""
+    print(f"{progress.written} written, {progress.skipped} already present, "
+          f"{progress.throughput:.0f} tuples/s")
+
+
+async def import_tuples(
+    client: OpenFgaClient,
+    tuples: Iterable[dict],
+    chunk_size: int = WRITE_CHUNK_SIZE,
+    max_concurrency: int = IMPORT_CONCURRENCY,
+    max_retries: int = IMPORT_MAX_RETRIES,
+    backoff: float = 0.1,
+    cache: Optional[DecisionCache] = None,
+    on_progress: Optional[Callable[[ImportProgress], None]] = print_progress,
+    progress_interval: float = 5.0,
+    delete: bool = False,
+) -> ImportProgress:
+    """
+    Write a stream of tuples in chunk_size transactions with bounded concurrency.
+
+    Tuples are consumed lazily, so at most max_concurrency chunks are held
+    in memory. Tuples that already exist are skipped; with delete=True the
+    tuples are deleted instead and tuples that do not exist are skipped.
+
+    Args:
+        client: OpenFgaClient instance
+        tuples: Iterable of dicts with user, relation, object keys (e.g. iter_tuples(path))
+        chunk_size: Tuples per write transaction, at most the server's limit
+            (OPENFGA_MAX_TUPLES_PER_WRITE, 100 by default)
+        max_concurrency: Maximum number of write requests in flight
+        max_retries: Retries per chunk for throttling and server errors
+        backoff: Base delay in seconds of the exponential backoff
+        cache: Optional DecisionCache to invalidate for the written tuples
+        on_progress: Called with the totals every progress_interval seconds
+            and once at the end; None disables reporting
+        progress_interval: Seconds between progress reports
+        delete: Delete the tuples instead of writing them
+
+    Returns:
+        The final ImportProgress
+    """
+    progress = ImportProgress()
+    start = time.perf_counter()
+    last_report = start
+    pending: Set[asyncio.Task] = set()
+
+    async def drain(return_when) -> None:
+        nonlocal last_report
+        done, _ = await asyncio.wait(pending, return_when=return_when)
+        pending.difference_update(done)
+        for task in done:
+            # Re-raise the first failure; the finally block cancels the rest
+            task.result()
+        progress.elapsed_s = time.perf_counter() - start
+        if on_progress is not None and time.perf_counter() - last_report >= progress_interval:
+            last_report = time.perf_counter()
+            on_progress(progress)
+
+    try:
+        chunk: List[dict] = []
+        for t in tuples:
+            chunk.append(t)
+            if len(chunk) < chunk_size:
+                continue
+            pending.add(asyncio.create_task(
+                _write_chunk(client, chunk, progress, max_retries, backoff, cache, delete)))
+            chunk = []
+            if len(pending) >= max_concurrency:
+                await drain(asyncio.FIRST_COMPLETED)
+        if chunk:
+            pending.add(asyncio.create_task(
+                _write_chunk(client, chunk, progress, max_retries, backoff, cache, delete)))
+        while pending:
+            await drain(asyncio.FIRST_COMPLETED)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    progress.elapsed_s = time.perf_counter() - start
+    if on_progress is not None:
+        on_progress(progress)
+    return progress
@@ -0,0 +1,286 @@
+"""
+Client-side caches for OpenFGA authorization decisions.
+
+This module contains:
+1. DecisionCache: a bounded TTL/LRU cache of check results keyed on
+   (authorization model, user, relation, object, check context)
+2. UsersetCache: a bounded TTL/LRU cache of resolved userset members keyed on
+   (authorization model, "object#relation")
+3. context_key: the hashable form of a check context used in keys
+
+Caches are opt-in: pass an instance to the functions in fga_client.py.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Hashable, Iterable, Optional, Set, Tuple
+
+CacheKey = Tuple[Optional[str], str, str, str, Optional[str]]
+UsersetKey = Tuple[Optional[str], str]
+
+
+def context_key(context: Optional[dict]) -> Optional[str]:
+    """
+    Return a hashable, order-independent form of a check context.
+
+    Conditions make a decision depend on the context values as well as on
+    the tuples, so keys of cached decisions and coalesced requests include
+    it. An empty context is the same as none.
+    """
+    if not context:
+        return None
+    return json.dumps(context, sort_keys=True, separators=(",", ":"))
+
+
+class DecisionCache:
+    """
+    Bounded cache of check decisions with TTL expiry and LRU eviction.
+
+    Allowed and denied decisions can have different TTLs, which lets callers
+    keep grants around longer than denials (or the other way around).
+
+    Decisions of conditional relations are cached per context value: the
+    same check made for a published and an unpublished document is two
+    entries, both dropped when the document or user is invalidated.
+
+    Invalidation: writing a tuple whose object type is in ``leaf_types``
+    (a type no other relation derives from, like ``document`` in model.fga)
+    only drops the entries for that object and user. Any other tuple may
+    change decisions through usersets or ``from parent`` rewrites, so the
+    whole cache is flushed.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 10.0,
+        max_size: int = 10000,
+        allow_ttl: Optional[float] = None,
+        deny_ttl: Optional[float] = None,
+        leaf_types: Iterable[str] = ("document",),
+    ):
+        """
+        Initialize the decision cache.
+
+        Args:
+            ttl: Default time-to-live in seconds for cached decisions
+            max_size: Maximum number of decisions kept before LRU eviction
+            allow_ttl: TTL for allowed decisions, defaults to ttl
+            deny_ttl: TTL for denied decisions, defaults to ttl
+            leaf_types: Object types that support targeted invalidation
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be a positive integer")
+        self.max_size = max_size
+        self.allow_ttl = ttl if allow_ttl is None else allow_ttl
+        self.deny_ttl = ttl if deny_ttl is None else deny_ttl
+        self.leaf_types = set(leaf_types)
+
+        self._entries: "OrderedDict[CacheKey, Tuple[bool, float]]" = OrderedDict()
+        self._by_object: Dict[str, Set[CacheKey]] = {}
+        self._by_user: Dict[str, Set[CacheKey]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(model_id: Optional[str], user: str, relation: str, object: str,
+                 context: Optional[dict] = None) -> CacheKey:
+        """Build the cache key for a check, made with the given check context."""
+        return (model_id, user, relation, object, context_key(context))
+
+    def get(self, key: CacheKey) -> Optional[bool]:
+        """
+        Look up a cached decision.
+
+        Args:
+            key: Key built with make_key
+
+        Returns:
+            The cached decision, or None on a miss or expired entry
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        allowed, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return allowed
+
+    def set(self, key: CacheKey, allowed: bool) -> None:
+        """
+        Store a decision, evicting the least recently used entries if full.
+
+        Args:
+            key: Key built with make_key
+            allowed: The check result
+        """
+        ttl = self.allow_ttl if allowed else self.deny_ttl
+        if ttl <= 0:
+            return
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self._entries[key] = (allowed, time.monotonic() + ttl)
+        _, user, _, object, _ = key
+        self._by_object.setdefault(object, set()).add(key)
+        self._by_user.setdefault(user, set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate_tuples(self, tuples: Iterable[dict]) -> None:
+        """
+        Drop every cached decision a tuple write may have changed.
+
+        Args:
+            tuples: List of dicts with user, relation, object keys
+        """
+        for t in tuples:
+            object_type = t["object"].split(":", 1)[0]
+            if object_type not in self.leaf_types:
+                self.clear()
+                self.invalidations += 1
+                return
+
+            keys = set(self._by_object.get(t["object"], ()))
+            keys |= self._by_user.get(t["user"], set())
+            for key in keys:
+                self._remove(key)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        """Remove all cached decisions."""
+        self._entries.clear()
+        self._by_object.clear()
+        self._by_user.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: CacheKey) -> None:
+        if self._entries.pop(key, None) is None:
+            return
+        _, user, _, object, _ = key
+        self._discard_index(self._by_object, object, key)
+        self._discard_index(self._by_user, user, key)
+
+    @staticmethod
+    def _discard_index(index: Dict[str, Set[CacheKey]], name: Hashable, key: CacheKey) -> None:
+        keys = index.get(name)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[name]
+
+
+class UsersetCache:
+    """
+    Bounded cache of resolved userset members with TTL expiry and LRU eviction.
+
+    Entries map a userset such as ``editors:team1#member`` or
+    ``folder:1#reader`` to the set of subjects it resolves to, so callers
+    resolving many objects that share folders and teams expand each one
+    once (see fga_client.list_users_for_documents).
+
+    Memberships are transitive, so any tuple write flushes the whole cache:
+    pass it as userset_cache to write_tuples and delete_tuples. Writes made
+    elsewhere (another process, the OpenFGA API) are only seen once entries
+    expire after ttl.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_size: int = 10000):
+        """
+        Initialize the userset cache.
+
+        Args:
+            ttl: Time-to-live in seconds for resolved usersets
+            max_size: Maximum number of usersets kept before LRU eviction
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be a positive integer")
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[UsersetKey, Tuple[FrozenSet[str], float]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(model_id: Optional[str], userset: str) -> UsersetKey:
+        """Build the cache key for a userset ("object#relation")."""
+        return (model_id, userset)
+
+    def get(self, key: UsersetKey) -> Optional[FrozenSet[str]]:
+        """Return the cached members, or None on a miss or expired entry."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        members, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return members
+
+    def set(self, key: UsersetKey, members: Iterable[str]) -> None:
+        """Store the members of a userset, evicting the least recently used entries if full."""
+        if self.ttl <= 0:
+            return
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self._entries[key] = (frozenset(members), time.monotonic() + self.ttl)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate_tuples(self, tuples: Iterable[dict]) -> None:
+        """Drop every resolved userset; any written tuple may change them transitively."""
+        if self._entries:
+            self.clear()
+        self.invalidations += 1
+
+    def clear(self) -> None:
+        """Remove all cached usersets."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -4,13 +4,110 @@ import argparse
 import sys
 import asyncio
 
-from fga_example.main import hello, main
 from fga_example.fga_init import project_init
 
 
-def fga_setup():
+def fga_setup(args=None):
     """Run the FGA setup process."""
-    asyncio.run(project_init())
+    if args is None:
+        # Invoked as the fga-setup script
+        parser = argparse.ArgumentParser(description="Set up the FGA store, model and sample data")
+        _add_setup_arguments(parser)
+        args = parser.parse_args()
+    asyncio.run(project_init(reconcile=args.reconcile, store_name=args.store_name,
+                             store_id=args.store_id, delete=not args.no_delete))
+    return 0
+
+
+def _add_setup_arguments(parser):
+    from fga_example.fga_init import STORE_NAME
+
+    parser.add_argument("--reconcile", action="store_true",
+                        help="Reuse the existing store and write/delete only the tuples that differ")
+    parser.add_argument("--store-name", default=STORE_NAME, help="Store to find or create")
+    parser.add_argument("--store-id", help="Existing store to reconcile (instead of --store-name)")
+    parser.add_argument("--no-delete", action="store_true",
+                        help="When reconciling, keep tuples that are not in the tuple file")
+
+
+def fga_bench(args):
+    """Run the authorization benchmark and optionally write the JSON report."""
+    from fga_example.bench import StoreShape, create_client, print_report, run_benchmark
+    from fga_example.client_pool import close_fga_clients
+
+    shape = StoreShape(
+        users=args.users,
+        teams=args.teams,
+        folders=args.folders,
+        documents_per_folder=args.documents_per_folder,
+        readers_per_folder=args.readers_per_folder,
+        seed=args.seed,
+    )
+
+    async def run():
+        client = await create_client(args.backend)
+        try:
+            return await run_benchmark(
+                client, shape, backend=args.backend,
+                operations=args.operations.split(","), requests=args.requests,
+                concurrency=args.concurrency, batch_size=args.batch_size,
+            )
+        finally:
+            await close_fga_clients()
+
+    report = asyncio.run(run())
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(report.model_dump_json(indent=2))
+        print(f"Results written to {args.output}")
+    return 0
+
+
+def fga_generate(args):
+    """Generate a synthetic dataset on disk."""
+    from fga_example.datagen import DatasetShape, generate_dataset
+
+    shape = DatasetShape(
+        users=args.users,
+        teams=args.teams,
+        folders=args.folders,
+        documents=args.documents,
+        teams_per_user=args.teams_per_user,
+        team_distribution=args.team_distribution,
+        editor_teams_per_folder=args.editor_teams_per_folder,
+        readers_per_folder=args.readers_per_folder,
+        folder_distribution=args.folder_distribution,
+        zipf_s=args.zipf_s,
+        published_ratio=args.published_ratio,
+        published_only_ratio=args.published_only_ratio,
+        seed=args.seed,
+    )
+    counts = generate_dataset(args.out, shape)
+    print(", ".join(f"{count} {name}" for name, count in counts.items()) + f" written to {args.out}")
+    return 0
+
+
+def fga_load(args):
+    """Bulk load CSV files into the document database."""
+    import sqlite3
+    from fga_example.csv_loader import load_csv_files
+    from fga_example.document_service import create_tables
+
+    paths = {table: getattr(args, table) for table in ("documents", "folders", "users")
+             if getattr(args, table)}
+    if not paths:
+        print("Nothing to load: pass --documents, --folders and/or --users")
+        return 1
+
+    conn = sqlite3.connect(args.db)
+    try:
+        create_tables(conn)
+        for result in load_csv_files(conn, paths, replace=not args.append):
+            print(f"{result.table}: {result.rows} rows in {result.seconds:.2f}s "
+                  f"({result.rows_per_second:.0f} rows/s)")
+    finally:
+        conn.close()
     return 0
 
 
@@ -22,6 +119,56 @@ def cli():
     
     # Add fga_setup command
     setup_parser = subparsers.add_parser("setup", help="Setup FGA store, model and sample data")
+    _add_setup_arguments(setup_parser)
+
+    # Add serve command
+    subparsers.add_parser("serve", help="Serve the document API (HOST, PORT, WEB_CONCURRENCY)")
+
+    # Add bench command
+    bench_parser = subparsers.add_parser("bench", help="Benchmark authorization calls on a synthetic store")
+    bench_parser.add_argument("--backend", choices=["local", "server"], default="local",
+                              help="In-process evaluator or a new store on OPENFGA_API_URL")
+    bench_parser.add_argument("--users", type=int, default=100)
+    bench_parser.add_argument("--teams", type=int, default=10)
+    bench_parser.add_argument("--folders", type=int, default=50)
+    bench_parser.add_argument("--documents-per-folder", type=int, default=20)
+    bench_parser.add_argument("--readers-per-folder", type=int, default=5)
+    bench_parser.add_argument("--seed", type=int, default=42)
+    bench_parser.add_argument("--operations", default="check,batch_check,list_objects,list_users",
+                              help="Comma-separated operations to run")
+    bench_parser.add_argument("--requests", type=int, default=200, help="Requests per operation")
+    bench_parser.add_argument("--concurrency", type=int, default=10)
+    bench_parser.add_argument("--batch-size", type=int, default=50, help="Checks per batch_check")
+    bench_parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    # Add generate command
+    from fga_example.datagen import DISTRIBUTIONS
+    generate_parser = subparsers.add_parser("generate", help="Generate a synthetic dataset and its tuples")
+    generate_parser.add_argument("--out", required=True, help="Output directory")
+    generate_parser.add_argument("--users", type=int, default=1000)
+    generate_parser.add_argument("--teams", type=int, default=50)
+    generate_parser.add_argument("--folders", type=int, default=200)
+    generate_parser.add_argument("--documents", type=int, default=10000)
+    generate_parser.add_argument("--teams-per-user", type=int, default=1)
+    generate_parser.add_argument("--team-distribution", choices=DISTRIBUTIONS, default="uniform")
+    generate_parser.add_argument("--editor-teams-per-folder", type=int, default=1)
+    generate_parser.add_argument("--readers-per-folder", type=int, default=5)
+    generate_parser.add_argument("--folder-distribution", choices=DISTRIBUTIONS, default="uniform",
+                                 help="Distribution of documents over folders")
+    generate_parser.add_argument("--zipf-s", type=float, default=1.1, help="Exponent of the zipf distribution")
+    generate_parser.add_argument("--published-ratio", type=float, default=0.5)
+    generate_parser.add_argument("--published-only-ratio", type=float, default=0.0,
+                                 help="Share of folder readers granted with the published_only condition")
+    generate_parser.add_argument("--seed", type=int, default=42)
+
+    # Add load command
+    load_parser = subparsers.add_parser("load", help="Bulk load CSV files into the document database")
+    load_parser.add_argument("--db", required=True, help="SQLite database path")
+    load_parser.add_argument("--documents", help="CSV file for the documents table")
+    load_parser.add_argument("--folders", help="CSV file for the folders table")
+    load_parser.add_argument("--users", help="CSV file for the users table")
+    load_parser.add_argument("--append", action="store_true",
+                             help="Keep existing rows instead of replacing the tables' contents")
 
     
     args = parser.parse_args()
@@ -31,4 +178,18 @@ def cli():
         print(f"fga_example version {__version__}")
         return 0
     if args.command == "setup":
-        return fga_setup()
\ No newline at end of file
+        return fga_setup(args)
+    if args.command == "serve":
+        # The API needs FastAPI and uvicorn, which the other commands do not
+        from fga_example.main import main
+        main()
+        return 0
+    if args.command == "bench":
+        return fga_bench(args)
+    if args.command == "generate":
+        return fga_generate(args)
+    if args.command == "load":
+        return fga_load(args)
+
+if __name__ == "__main__":
+    sys.exit(cli())
@@ -0,0 +1,151 @@
+"""
+Process-wide pool of OpenFgaClient instances.
+
+Every OpenFgaClient owns an aiohttp session and its keep-alive connection
+pool. Building one per service or per call pays TCP/TLS setup again each
+time, so code should borrow clients from here instead:
+
+    client = await get_fga_client()          # store/model from the environment
+    allowed = await check_access(client, "anne_smith", "reader", "document:1")
+    ...
+    await close_fga_clients()                # once, at shutdown
+
+Clients are keyed on (API URL, store ID, model ID). Borrowers must not
+close them.
+"""
+
+import asyncio
+import os
+from typing import Dict, Optional, Tuple
+
+from openfga_sdk import ClientConfiguration, OpenFgaClient
+from openfga_sdk.configuration import RetryParams
+from pydantic import BaseModel
+
+ClientKey = Tuple[str, Optional[str], Optional[str]]
+
+
+class ClientSettings(BaseModel):
+    """Pydantic model with the HTTP settings applied to pooled clients."""
+    max_connections: int = 100
+    timeout_ms: int = 10000
+    max_retry: int = 3
+    min_wait_ms: int = 100
+    warm_connections: int = 4
+
+
+class FgaClientFactory:
+    """Creates, warms, shares and closes OpenFgaClient instances."""
+
+    def __init__(self, settings: Optional[ClientSettings] = None):
+        """
+        Initialize the factory.
+
+        Args:
+            settings: HTTP settings for the clients; defaults to ClientSettings()
+        """
+        self.settings = settings or ClientSettings()
+        self._clients: Dict[ClientKey, Tuple[OpenFgaClient, asyncio.AbstractEventLoop]] = {}
+        self._locks: Dict[Tuple[ClientKey, asyncio.AbstractEventLoop], asyncio.Lock] = {}
+        self.created = 0
+
+    def _configuration(self, api_url: str, store_id: Optional[str],
+                       authorization_model_id: Optional[str]) -> ClientConfiguration:
+        configuration = ClientConfiguration(
+            api_url=api_url,
+            store_id=store_id,
+            authorization_model_id=authorization_model_id,
+            timeout_millisec=self.settings.timeout_ms,
+            retry_params=RetryParams(max_retry=self.settings.max_retry,
+                                     min_wait_in_ms=self.settings.min_wait_ms),
+        )
+        # Read by the SDK's REST client when it creates its aiohttp connector
+        configuration.connection_pool_maxsize = self.settings.max_connections
+        return configuration
+
+    async def get(self, api_url: Optional[str] = None, store_id: Optional[str] = None,
+                  authorization_model_id: Optional[str] = None, warm: bool = True) -> OpenFgaClient:
+        """
+        Return the shared client for an API URL, store and model, creating it if needed.
+
+        Args:
+            api_url: URL of the OpenFGA API, defaults to OPENFGA_API_URL or localhost
+            store_id: Store ID, or None for store-independent calls such as create_store
+            authorization_model_id: Model ID, or None for the store's latest model
+            warm: Open settings.warm_connections connections before returning a new client
+
+        Returns:
+            The pooled OpenFgaClient
+        """
+        api_url = api_url or os.environ.get("OPENFGA_API_URL", "http://localhost:8080")
+        key = (api_url, store_id, authorization_model_id)
+        loop = asyncio.get_running_loop()
+
+        entry = self._clients.get(key)
+        if entry is not None and entry[1] is loop:
+            return entry[0]
+
+        lock = self._locks.setdefault((key, loop), asyncio.Lock())
+        async with lock:
+            entry = self._clients.get(key)
+            if entry is not None and entry[1] is loop:
+                return entry[0]
+            # A client from an earlier event loop (e.g. a previous asyncio.run) cannot be reused
+            client = OpenFgaClient(self._configuration(api_url, store_id, authorization_model_id))
+            if warm:
+                await self.warm(client)
+            self._clients[key] = (client, loop)
+            self.created += 1
+            return client
+
+    async def warm(self, client: OpenFgaClient) -> None:
+        """Open keep-alive connections with concurrent lightweight requests; failures are ignored."""
+        if client.get_store_id():
+            requests = [client.get_store() for _ in range(self.settings.warm_connections)]
+        else:
+            requests = [client.list_stores({"page_size": 1}) for _ in range(self.settings.warm_connections)]
+        await asyncio.gather(*requests, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Close every client created on the running event loop and forget the rest."""
+        loop = asyncio.get_running_loop()
+        clients = [client for client, client_loop in self._clients.values() if client_loop is loop]
+        self._clients.clear()
+        self._locks.clear()
+        await asyncio.gather(*(client.close() for client in clients), return_exceptions=True)
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+_factory = FgaClientFactory()
+
+
+def get_client_factory() -> FgaClientFactory:
+    """Return the process-wide client factory."""
+    return _factory
+
+
+def configure_clients(settings: ClientSettings) -> None:
+    """Replace the settings used for clients created from now on."""
+    _factory.settings = settings
+
+
+async def get_fga_client(api_url: Optional[str] = None, store_id: Optional[str] = None,
+                         authorization_model_id: Optional[str] = None) -> OpenFgaClient:
+    """
+    Borrow the shared client, defaulting the store and model to FGA_STORE_ID and FGA_MODEL_ID.
+
+    Raises:
+        ValueError: If no store ID is given or set in the environment
+    """
+    store_id = store_id or os.environ.get("FGA_STORE_ID")
+    if not store_id:
+        raise ValueError("FGA_STORE_ID environment variable not set")
+    authorization_model_id = authorization_model_id or os.environ.get("FGA_MODEL_ID") or None
+    return await _factory.get(api_url, store_id, authorization_model_id)
+
+
+async def close_fga_clients() -> None:
+    """Close all pooled clients; call once at shutdown."""
+    await _factory.close()
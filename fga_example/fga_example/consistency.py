@@ -0,0 +1,129 @@
+"""
+Per-call consistency and read-your-writes for OpenFGA queries.
+
+OpenFGA answers queries with a consistency preference:
+MINIMIZE_LATENCY (the default) may serve results from the server's caches,
+HIGHER_CONSISTENCY always evaluates against the latest tuples. Every query
+helper in fga_client.py takes a consistency argument; HIGHER_CONSISTENCY
+also bypasses this package's caches (DecisionCache, SingleFlight and the
+planner's accessible sets), whose entries are refreshed with the result.
+
+This module contains:
+1. MINIMIZE_LATENCY / HIGHER_CONSISTENCY: the preference values
+2. RecentWrites: a session-scoped marker returned by write_tuples (in
+   fga_client.py and on AuthorizedDocumentService) that promotes the next
+   few reads touching the written objects or users to HIGHER_CONSISTENCY
+
+Keeping one RecentWrites per user session and passing it to the service
+methods gives read-your-writes after a sharing change, while every other
+read stays cheap:
+
+    session = await service.write_tuples([share])
+    await service.get_documents_by_ids("bob_jones", [1], recent_writes=session)
+"""
+
+import time
+from typing import Dict, Iterable, List, Optional
+
+from openfga_sdk.models.consistency_preference import ConsistencyPreference
+
+MINIMIZE_LATENCY = ConsistencyPreference.MINIMIZE_LATENCY
+HIGHER_CONSISTENCY = ConsistencyPreference.HIGHER_CONSISTENCY
+
+# Marks every read, for writes whose effect cannot be pinned to one object
+_ANY = "*"
+
+
+class RecentWrites:
+    """
+    Objects and users written recently in a session.
+
+    A written tuple marks its object and its user for the next ``reads``
+    reads or ``ttl`` seconds, whichever ends first. A tuple on a type other
+    relations derive from (a folder or team, see ``leaf_types``), or with a
+    userset, wildcard or non-user subject (``document:1#parent@folder:2``),
+    may change decisions of other users and objects, so it marks every read
+    instead.
+    """
+
+    def __init__(self, reads: int = 3, ttl: float = 10.0, leaf_types: Iterable[str] = ("document",),
+                 user_types: Iterable[str] = ("user",)):
+        """
+        Initialize an empty marker.
+
+        Args:
+            reads: Number of reads promoted per written object or user
+            ttl: Seconds after which a mark expires even if unused
+            leaf_types: Object types whose tuples only affect that object and user
+            user_types: Subject types that are users; a leaf tuple with another
+                subject type (a parent folder) changes the object for every user
+        """
+        if reads <= 0:
+            raise ValueError("reads must be a positive integer")
+        self.reads = reads
+        self.ttl = ttl
+        self.leaf_types = set(leaf_types)
+        self.user_types = set(user_types)
+        # key -> [reads remaining, expiry time]
+        self._marks: Dict[str, list] = {}
+        self.promoted = 0
+
+    def record(self, tuples: Iterable[dict]) -> None:
+        """Mark the objects and users of written or deleted tuples."""
+        expires_at = time.monotonic() + self.ttl
+        for t in tuples:
+            object_type = t["object"].split(":", 1)[0]
+            user_type = t["user"].split(":", 1)[0]
+            # Usersets (editors:team1#member), wildcards and parents stand for users we cannot name
+            if (object_type not in self.leaf_types or user_type not in self.user_types
+                    or "#" in t["user"] or t["user"].endswith(":*")):
+                keys = [_ANY]
+            else:
+                keys = [t["object"], t["user"]]
+            for key in keys:
+                self._marks[key] = [self.reads, expires_at]
+
+    def consistency_for(self, keys: Iterable[str]) -> Optional[str]:
+        """
+        Return HIGHER_CONSISTENCY if a read of keys must see the recent writes.
+
+        Each marked key consumes one of its promoted reads.
+
+        Args:
+            keys: Objects (``document:1``) and users (``user:anne_smith``) the read depends on
+
+        Returns:
+            HIGHER_CONSISTENCY, or None to keep the caller's preference
+        """
+        if not self._marks:
+            return None
+        now = time.monotonic()
+        hits: List[str] = []
+        for key in [_ANY, *keys]:
+            mark = self._marks.get(key)
+            if mark is None:
+                continue
+            if mark[1] <= now:
+                del self._marks[key]
+                continue
+            hits.append(key)
+        if not hits:
+            return None
+        for key in hits:
+            mark = self._marks[key]
+            mark[0] -= 1
+            if mark[0] <= 0:
+                del self._marks[key]
+        self.promoted += 1
+        return HIGHER_CONSISTENCY
+
+    def __len__(self) -> int:
+        return len(self._marks)
+
+
+def resolve_consistency(consistency: Optional[str], recent_writes: Optional[RecentWrites],
+                        keys: Iterable[str]) -> Optional[str]:
+    """Return the preference for a read: HIGHER_CONSISTENCY if recent_writes asks for it, else consistency."""
+    if recent_writes is not None and consistency != HIGHER_CONSISTENCY:
+        return recent_writes.consistency_for(keys) or consistency
+    return consistency
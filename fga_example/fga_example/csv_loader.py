@@ -0,0 +1,162 @@
+"""
+Bulk loading of the documents, folders and users tables from CSV files.
+
+load_csv_files streams each CSV through executemany inside one
+transaction. While loading it:
+1. turns synchronous off and enlarges the page cache, leaving the journal
+   mode alone: the service's database pool (db_pool.py) keeps it in WAL
+2. drops the tables' secondary indexes and triggers, recreating them afterwards
+3. rebuilds the documents_fts full-text index once at the end instead of
+   updating it row by row, and queues every document for the permission
+   index (see permission_index.py) whose triggers were dropped
+
+The CSV headers must name columns of the target table (see data/*.csv).
+"""
+
+import csv
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+
+from pydantic import BaseModel
+
+TABLES = ("documents", "folders", "users")
+
+# Per-column conversions from CSV text
+CONVERTERS: Dict[str, Dict[str, Callable[[str], object]]] = {
+    "documents": {"is_published": lambda value: value.strip().lower() == "true"},
+}
+
+EXECUTEMANY_BATCH = 10000
+
+
+class LoadResult(BaseModel):
+    """Pydantic model with the outcome of loading one CSV file."""
+    table: str
+    path: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+@contextmanager
+def load_pragmas(conn: sqlite3.Connection, cache_size_kib: int = 262144):
+    """
+    Trade durability for speed while loading; restore the settings afterwards.
+
+    The journal mode is left as is: switching a WAL database out of WAL fails
+    while other connections (the reader pool) have it open, and the load runs
+    in a single transaction anyway.
+    """
+    conn.commit()
+    cursor = conn.cursor()
+    synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+    cache_size = cursor.execute("PRAGMA cache_size").fetchone()[0]
+    # A crash mid-load leaves a half-loaded table either way; the load is simply rerun
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute(f"PRAGMA cache_size = {-cache_size_kib}")
+    try:
+        yield
+    finally:
+        cursor.execute(f"PRAGMA synchronous = {synchronous}")
+        cursor.execute(f"PRAGMA cache_size = {cache_size}")
+
+
+def _csv_columns(conn: sqlite3.Connection, table: str, path, header: List[str]) -> List[str]:
+    """Check a CSV header against the table; columns that are nullable or have a default may be omitted."""
+    info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    required = {row[1] for row in info if row[3] and row[4] is None and not row[5]}
+    missing = required - set(header)
+    unknown = set(header) - {row[1] for row in info}
+    if missing or unknown:
+        raise ValueError(f"{path}: header does not match table {table} "
+                         f"(missing: {sorted(missing)}, unknown: {sorted(unknown)})")
+    return header
+
+
+def _rows(reader, table: str, columns: List[str]) -> Iterator[tuple]:
+    convert = [CONVERTERS.get(table, {}).get(column) for column in columns]
+    if not any(convert):
+        yield from map(tuple, reader)
+        return
+    for row in reader:
+        yield tuple(fn(value) if fn else value for fn, value in zip(convert, row))
+
+
+def load_csv_files(conn: sqlite3.Connection, paths: Dict[str, str], replace: bool = True) -> List[LoadResult]:
+    """
+    Load CSV files into their tables in a single transaction.
+
+    Args:
+        conn: SQLite connection with the tables already created
+        paths: Mapping of table name (one of TABLES) to CSV path
+        replace: Delete the existing rows of each loaded table first;
+            otherwise rows are appended and duplicate IDs are an error
+
+    Returns:
+        One LoadResult per table
+    """
+    for table in paths:
+        if table not in TABLES:
+            raise ValueError(f"Unknown table {table!r}, expected one of {', '.join(TABLES)}")
+
+    results = []
+    with load_pragmas(conn):
+        cursor = conn.cursor()
+        # Defer index and trigger maintenance until the rows are in
+        deferred = cursor.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE type IN ('index', 'trigger') "
+            f"AND sql IS NOT NULL AND tbl_name IN ({', '.join('?' * len(paths))})",
+            tuple(paths)).fetchall()
+        has_fts = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'documents_fts'").fetchone()
+        has_permission_index = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'permission_index_pending'").fetchone()
+
+        cursor.execute("BEGIN")
+        try:
+            for object_type, name, _ in deferred:
+                cursor.execute(f"DROP {object_type.upper()} {name}")
+
+            for table, path in paths.items():
+                start = time.perf_counter()
+                if replace:
+                    cursor.execute(f"DELETE FROM {table}")
+                rows = 0
+                with open(path, 'r', newline='') as f:
+                    reader = csv.reader(f)
+                    columns = _csv_columns(conn, table, path, next(reader, []))
+                    insert = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                              f"VALUES ({', '.join('?' * len(columns))})")
+                    batch = []
+                    for row in _rows(reader, table, columns):
+                        batch.append(row)
+                        if len(batch) == EXECUTEMANY_BATCH:
+                            cursor.executemany(insert, batch)
+                            rows += len(batch)
+                            batch = []
+                    if batch:
+                        cursor.executemany(insert, batch)
+                        rows += len(batch)
+                results.append(LoadResult(table=table, path=str(path), rows=rows,
+                                          seconds=time.perf_counter() - start))
+
+            for _, _, sql in deferred:
+                cursor.execute(sql)
+            if has_fts and "documents" in paths:
+                start = time.perf_counter()
+                cursor.execute("INSERT INTO documents_fts(documents_fts) VALUES ('rebuild')")
+                for result in results:
+                    if result.table == "documents":
+                        result.seconds += time.perf_counter() - start
+            if has_permission_index and "documents" in paths:
+                cursor.execute("INSERT OR IGNORE INTO permission_index_pending SELECT id FROM documents")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return results
@@ -0,0 +1,171 @@
+"""
+Synthetic dataset generator.
+
+generate_dataset writes an internally consistent dataset in the layout of
+data/ plus the matching relationship tuples:
+
+    users.csv, folders.csv, documents.csv  same columns as data/*.csv
+    tuples.jsonl                           one {"user", "relation", "object"} per line, with
+                                           a "condition" for published_only folder readers
+
+Rows are streamed to disk as they are generated, so memory use depends on
+the number of teams and folders, not on the number of documents. The same
+seed always produces the same files.
+
+Fan-out distributions:
+- uniform: every bucket is equally likely
+- skewed: 20% of the buckets receive 80% of the draws
+- zipf: the k-th bucket has weight 1 / k**zipf_s
+"""
+
+import bisect
+import csv
+import itertools
+import pathlib
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+DISTRIBUTIONS = ("uniform", "skewed", "zipf")
+
+FIRST_NAMES = ["Anne", "Bob", "Clara", "David", "Emily", "Farid", "Grace", "Hiro", "Ines", "Jonas",
+               "Kofi", "Lena", "Mateo", "Nadia", "Omar", "Priya", "Quinn", "Rosa", "Sven", "Tara"]
+SURNAMES = ["Smith", "Jones", "Zhang", "Rodriguez", "Patel", "Okafor", "Muller", "Tanaka", "Silva",
+            "Kowalski", "Nguyen", "Haddad", "Larsen", "Moreau", "Rossi", "Kim", "Singh", "Cohen"]
+WORDS = ("study data analysis memory behavioral cognitive experiment results survey control group "
+         "response stimuli therapy methods review research model participants attention learning "
+         "perception decision emotion social development clinical trial protocol sample variance "
+         "regression hypothesis correlation baseline cohort longitudinal replication measurement "
+         "conditioning reinforcement bias heuristic recall recognition sleep stress motivation").split()
+
+BASE_DATE = datetime(2025, 1, 1)
+
+
+class DatasetShape(BaseModel):
+    """Pydantic model describing the size and fan-out of a generated dataset."""
+    users: int = 1000
+    teams: int = 50
+    folders: int = 200
+    documents: int = 10000
+    teams_per_user: int = 1
+    team_distribution: str = "uniform"
+    editor_teams_per_folder: int = 1
+    readers_per_folder: int = 5
+    folder_distribution: str = "uniform"
+    zipf_s: float = 1.1
+    published_ratio: float = 0.5
+    published_only_ratio: float = 0.0
+    seed: int = 42
+
+
+def cumulative_weights(size: int, distribution: str, zipf_s: float = 1.1) -> List[float]:
+    """
+    Return cumulative weights for drawing bucket indexes 0..size-1.
+
+    Args:
+        size: Number of buckets
+        distribution: One of DISTRIBUTIONS
+        zipf_s: Exponent of the zipf distribution
+    """
+    if distribution == "uniform":
+        weights = [1.0] * size
+    elif distribution == "skewed":
+        heavy = max(1, size // 5)
+        light = size - heavy
+        weights = [0.8 / heavy] * heavy + ([0.2 / light] * light if light else [])
+    elif distribution == "zipf":
+        weights = [1.0 / (k ** zipf_s) for k in range(1, size + 1)]
+    else:
+        raise ValueError(f"Unknown distribution {distribution!r}, expected one of {', '.join(DISTRIBUTIONS)}")
+    return list(itertools.accumulate(weights))
+
+
+def _draw(rng: random.Random, cum_weights: List[float]) -> int:
+    return bisect.bisect_right(cum_weights, rng.random() * cum_weights[-1])
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words))
+
+
+def user_name(i: int) -> Tuple[str, str, str]:
+    """Return (id, name, surname) of the i-th generated user; IDs are derived, never stored."""
+    name = FIRST_NAMES[i % len(FIRST_NAMES)]
+    surname = SURNAMES[(i // len(FIRST_NAMES)) % len(SURNAMES)]
+    return f"{name.lower()}_{surname.lower()}_{i}", name, surname
+
+
+def generate_dataset(out_dir, shape: DatasetShape) -> Dict[str, int]:
+    """
+    Write users.csv, folders.csv, documents.csv and tuples.jsonl into out_dir.
+
+    Every user is a member of up to teams_per_user distinct teams, every folder is edited
+    by editor_teams_per_folder teams and read by readers_per_folder users,
+    and every document has exactly one parent folder. A published_only_ratio
+    share of the folder readers is granted with the published_only condition.
+
+    Args:
+        out_dir: Directory to write to (created if missing)
+        shape: DatasetShape describing the dataset
+
+    Returns:
+        Dict with the number of rows written per file
+    """
+    rng = random.Random(shape.seed)
+    out_dir = pathlib.Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    counts = {"users": 0, "folders": 0, "documents": 0, "tuples": 0}
+    team_weights = cumulative_weights(shape.teams, shape.team_distribution, shape.zipf_s)
+    folder_weights = cumulative_weights(shape.folders, shape.folder_distribution, shape.zipf_s)
+
+    with open(out_dir / "tuples.jsonl", 'w') as tuples_file:
+        def write_tuple(user: str, relation: str, object: str, condition: Optional[str] = None) -> None:
+            # Generated identifiers never need escaping
+            condition = f', "condition": {{"name": "{condition}"}}' if condition else ""
+            tuples_file.write(f'{{"user": "{user}", "relation": "{relation}", "object": "{object}"'
+                              f'{condition}}}\n')
+            counts["tuples"] += 1
+
+        with open(out_dir / "users.csv", 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "name", "surname", "email"])
+            for i in range(shape.users):
+                user_id, name, surname = user_name(i)
+                writer.writerow([user_id, name, surname, f"{user_id}@example.com"])
+                counts["users"] += 1
+                teams = {_draw(rng, team_weights) for _ in range(min(shape.teams_per_user, shape.teams))}
+                for team in sorted(teams):
+                    write_tuple(f"user:{user_id}", "member", f"editors:team{team + 1}")
+
+        with open(out_dir / "folders.csv", 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "title", "description", "created_at"])
+            for folder in range(1, shape.folders + 1):
+                created_at = BASE_DATE + timedelta(hours=folder)
+                writer.writerow([folder, _sentence(rng, 2).title(), _sentence(rng, 8),
+                                 created_at.strftime("%Y-%m-%d %H:%M:%S")])
+                counts["folders"] += 1
+                for team in rng.sample(range(shape.teams), min(shape.editor_teams_per_folder, shape.teams)):
+                    write_tuple(f"editors:team{team + 1}#member", "editor", f"folder:{folder}")
+                for user in rng.sample(range(shape.users), min(shape.readers_per_folder, shape.users)):
+                    # No draw at the default ratio, so existing seeds keep producing the same files
+                    published_only = shape.published_only_ratio > 0 and rng.random() < shape.published_only_ratio
+                    write_tuple(f"user:{user_name(user)[0]}", "reader", f"folder:{folder}",
+                                "published_only" if published_only else None)
+
+        with open(out_dir / "documents.csv", 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "title", "data", "created_at", "is_published", "folder_id"])
+            for document in range(1, shape.documents + 1):
+                created_at = BASE_DATE + timedelta(minutes=document)
+                published = rng.random() < shape.published_ratio
+                title, data = _sentence(rng, 3).title(), _sentence(rng, 12)
+                folder = _draw(rng, folder_weights) + 1
+                writer.writerow([document, title, data, created_at.strftime("%Y-%m-%d %H:%M:%S"),
+                                 "true" if published else "false", folder])
+                counts["documents"] += 1
+                write_tuple(f"folder:{folder}", "parent", f"document:{document}")
+
+    return counts
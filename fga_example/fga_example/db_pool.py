@@ -0,0 +1,182 @@
+"""
+Non-blocking SQLite access for async code.
+
+DatabasePool runs queries off the event loop:
+1. reads go to a bounded thread pool, each thread with its own connection
+2. writes go to a single writer thread, so they are serialized
+
+Databases are switched to WAL mode so readers never wait for the writer
+and only ever see committed transactions. ':memory:' is served from a
+private temporary file, removed on close: SQLite in-memory databases can
+only be shared between connections through the shared cache, whose readers
+either block on table locks or, with read_uncommitted, see half-written
+transactions.
+
+Every call records how long it waited for a free thread; stats() reports
+those wait times so an undersized pool shows up before it shows up in p99.
+fetchall() and fetchone() also report statement durations to
+fga_example.metrics when metrics are enabled.
+"""
+
+import asyncio
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from fga_example import metrics
+
+
+def _timed_fetch(conn: sqlite3.Connection, sql: str, params: tuple, all_rows: bool) -> Any:
+    if not metrics.REGISTRY.enabled:
+        cursor = conn.execute(sql, params)
+        return cursor.fetchall() if all_rows else cursor.fetchone()
+    start = time.perf_counter()
+    cursor = conn.execute(sql, params)
+    result = cursor.fetchall() if all_rows else cursor.fetchone()
+    metrics.record_sql(sql, time.perf_counter() - start)
+    return result
+
+
+class DatabasePool:
+    """Thread pool of per-thread SQLite read connections plus one serialized writer."""
+
+    def __init__(self, db_path: str = ':memory:', max_readers: int = 4, busy_timeout: float = 5.0,
+                 wait_samples: int = 1000):
+        """
+        Initialize the pool and open the writer connection.
+
+        Args:
+            db_path: Path to the SQLite database file, or ':memory:'
+            max_readers: Number of reader threads (and read connections)
+            busy_timeout: Seconds a connection waits on a locked database
+            wait_samples: Number of recent wait times kept per kind for stats()
+        """
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self._temp_dir: Optional[str] = None
+        if db_path == ':memory:':
+            self._temp_dir = tempfile.mkdtemp(prefix="fga_example_db_")
+            self._path = os.path.join(self._temp_dir, "documents.db")
+        else:
+            self._path = db_path
+
+        self._readers = ThreadPoolExecutor(max_readers, thread_name_prefix="db-read")
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="db-write")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.reads = 0
+        self.writes = 0
+        self._read_waits: Deque[float] = deque(maxlen=wait_samples)
+        self._write_waits: Deque[float] = deque(maxlen=wait_samples)
+        self._read_queue = 0
+        self._write_queue = 0
+
+        self.writer_conn: sqlite3.Connection = self._writer.submit(self._open, True).result()
+
+    def _open(self, writer: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        if writer:
+            conn.execute("PRAGMA journal_mode = WAL")
+            # A temporary database does not need to survive a crash
+            conn.execute(f"PRAGMA synchronous = {'OFF' if self._temp_dir else 'NORMAL'}")
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def _reader_conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        return conn
+
+    def _run_read(self, submitted: float, fn: Callable, args: tuple) -> Any:
+        self._read_waits.append(time.perf_counter() - submitted)
+        with self._lock:
+            self._read_queue -= 1
+        return fn(self._reader_conn(), *args)
+
+    def _run_write(self, submitted: float, fn: Callable, args: tuple) -> Any:
+        self._write_waits.append(time.perf_counter() - submitted)
+        with self._lock:
+            self._write_queue -= 1
+        try:
+            result = fn(self.writer_conn, *args)
+            self.writer_conn.commit()
+            return result
+        except BaseException:
+            self.writer_conn.rollback()
+            raise
+
+    async def read(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run fn(conn, *args) on a reader thread.
+
+        fn must only read; use write() for anything that modifies the database.
+        """
+        with self._lock:
+            self.reads += 1
+            self._read_queue += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._run_read, time.perf_counter(), fn, args)
+
+    async def write(self, fn: Callable[..., Any], *args) -> Any:
+        """Run fn(conn, *args) on the writer thread and commit; roll back if it raises."""
+        with self._lock:
+            self.writes += 1
+            self._write_queue += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, self._run_write, time.perf_counter(), fn, args)
+
+    def write_sync(self, fn: Callable[..., Any], *args) -> Any:
+        """Run fn(conn, *args) on the writer thread and wait for it, from synchronous code."""
+        with self._lock:
+            self.writes += 1
+            self._write_queue += 1
+        return self._writer.submit(self._run_write, time.perf_counter(), fn, args).result()
+
+    async def fetchall(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """Execute a SELECT on a reader thread and return all rows."""
+        return await self.read(_timed_fetch, sql, params, True)
+
+    async def fetchone(self, sql: str, params: tuple = ()) -> Optional[sqlite3.Row]:
+        """Execute a SELECT on a reader thread and return the first row, if any."""
+        return await self.read(_timed_fetch, sql, params, False)
+
+    def stats(self) -> Dict[str, float]:
+        """Return call counters, queue lengths and recent wait times in milliseconds."""
+        result: Dict[str, float] = {
+            "reads": self.reads,
+            "writes": self.writes,
+            "read_queue": self._read_queue,
+            "write_queue": self._write_queue,
+        }
+        for kind, samples in (("read", self._read_waits), ("write", self._write_waits)):
+            waits = sorted(samples)
+            result[f"{kind}_wait_ms_p50"] = waits[len(waits) // 2] * 1000 if waits else 0.0
+            result[f"{kind}_wait_ms_p99"] = waits[int(len(waits) * 0.99)] * 1000 if waits else 0.0
+            result[f"{kind}_wait_ms_max"] = waits[-1] * 1000 if waits else 0.0
+        return result
+
+    def close(self) -> None:
+        """Wait for queued queries, then close every connection."""
+        if self._closed:
+            return
+        self._closed = True
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
@@ -1,11 +1,32 @@
 import sqlite3
 import os
-import csv
-from typing import List, Optional
+import re
+import time
+import json
+import base64
+import asyncio
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple, Union
 import pathlib
-from pydantic import BaseModel
-from openfga_sdk import OpenFgaClient, ClientConfiguration
-from fga_example.fga_client import check_access
+import pydantic_core
+from openfga_sdk.models.read_request_tuple_key import ReadRequestTupleKey
+from pydantic import BaseModel, TypeAdapter
+from fga_example.fga_client import (
+    check_access,
+    batch_check_access,
+    delete_tuples,
+    iter_documents_for_user,
+    list_documents_for_user,
+    write_tuples,
+)
+from fga_example.cache import DecisionCache
+from fga_example.consistency import HIGHER_CONSISTENCY, RecentWrites, resolve_consistency
+from fga_example.client_pool import get_fga_client
+from fga_example.singleflight import SingleFlight
+from fga_example.planner import SearchPlanner, SearchPlan, CHECK, LIST, INDEX
+from fga_example.permission_index import PermissionIndex, PermissionIndexSync
+from fga_example.csv_loader import TABLES, load_csv_files
+from fga_example.db_pool import DatabasePool
+from fga_example.hierarchy import HierarchyResolver
 
 class Document(BaseModel):
     """Pydantic model for a document."""
@@ -15,6 +36,78 @@ class Document(BaseModel):
     created_at: str
     is_published: bool
 
+# Columns of the documents table, in table order
+DOCUMENT_COLUMNS = ("id", "title", "data", "created_at", "is_published")
+
+_DOCUMENT_LIST = TypeAdapter(List[Document])
+
+
+def document_columns(include_data: bool = True, table: str = "documents") -> str:
+    """Column list selecting documents, optionally without the (large) data column."""
+    return ", ".join(f"{table}.{column}" for column in DOCUMENT_COLUMNS if include_data or column != "data")
+
+
+class DocumentRow:
+    """
+    Lightweight read-only view of one documents row.
+
+    Rows from our own database are trusted, so large results can skip
+    building a validated Document per row: a DocumentRow costs a few slot
+    assignments and documents_json() serializes rows straight to JSON.
+    data is None when the row was selected without the data column.
+    """
+    __slots__ = DOCUMENT_COLUMNS
+
+    def __init__(self, id: int, title: str, data: Optional[str], created_at: str, is_published: bool):
+        self.id = id
+        self.title = title
+        self.data = data
+        self.created_at = created_at
+        self.is_published = is_published
+
+    @classmethod
+    def from_rows(cls, rows: List[sqlite3.Row]) -> List["DocumentRow"]:
+        """Wrap documents rows; column positions are looked up once, not per row."""
+        if not rows:
+            return []
+        keys = rows[0].keys()
+        id_i, title_i, created_i, published_i = (
+            keys.index(column) for column in ("id", "title", "created_at", "is_published"))
+        if "data" not in keys:
+            return [cls(row[id_i], row[title_i], None, row[created_i], bool(row[published_i]))
+                    for row in rows]
+        data_i = keys.index("data")
+        return [cls(row[id_i], row[title_i], row[data_i], row[created_i], bool(row[published_i]))
+                for row in rows]
+
+    def to_dict(self) -> dict:
+        """Return the row as a dict, without data if it was not selected."""
+        if self.data is None:
+            return {"id": self.id, "title": self.title, "created_at": self.created_at,
+                    "is_published": self.is_published}
+        return {"id": self.id, "title": self.title, "data": self.data,
+                "created_at": self.created_at, "is_published": self.is_published}
+
+    def to_document(self) -> Document:
+        """Return the row as a Document; the row must include the data column."""
+        if self.data is None:
+            raise ValueError(f"Document {self.id} was fetched without its data column")
+        return Document.model_validate(self.to_dict())
+
+    def __repr__(self) -> str:
+        return f"DocumentRow(id={self.id!r}, title={self.title!r})"
+
+
+def documents_from_rows(rows: Iterable[sqlite3.Row]) -> List[Document]:
+    """Validate documents rows into Documents in one call, faster than Document(**dict(row)) each."""
+    return _DOCUMENT_LIST.validate_python([dict(row) for row in rows])
+
+
+def documents_json(documents: Iterable[DocumentRow]) -> bytes:
+    """Serialize DocumentRows to a JSON array without building Documents."""
+    return pydantic_core.to_json([document.to_dict() for document in documents])
+
+
 class Folder(BaseModel):
     """Pydantic model for a folder."""
     id: int
@@ -40,9 +133,16 @@ def create_tables(conn: sqlite3.Connection):
         title TEXT NOT NULL,
         data TEXT NOT NULL,
         created_at TEXT NOT NULL,
-        is_published BOOLEAN NOT NULL
+        is_published BOOLEAN NOT NULL,
+        folder_id INTEGER
     )
     ''')
+
+    # Databases created before documents had a folder column
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(documents)")}
+    if "folder_id" not in columns:
+        cursor.execute("ALTER TABLE documents ADD COLUMN folder_id INTEGER")
+    cursor.execute("CREATE INDEX IF NOT EXISTS documents_folder_id ON documents (folder_id, id)")
     
     # Create folders table
     cursor.execute('''
@@ -66,22 +166,152 @@ def create_tables(conn: sqlite3.Connection):
     
     conn.commit()
 
-def populate_tables(conn: sqlite3.Connection):
-    cursor = conn.cursor()
+    # Full-text index for search, when SQLite has FTS5 compiled in
+    create_fulltext_index(conn)
+
+def create_fulltext_index(conn: sqlite3.Connection) -> bool:
+    """
+    Create the FTS5 index over document titles and data.
     
-    # Populate documents table from CSV
-    csv_path = pathlib.Path(__file__).parent.parent / 'data' / 'documents.csv'
-    document_records_insert = "INSERT INTO documents (id, title, data, created_at, is_published) VALUES (:id, :title, :data, :created_at, :is_published)" 
+    The index is an external-content table over documents, kept in sync by
+    triggers. A newly created index is filled from the existing rows.
     
-    if os.path.exists(csv_path):
-        with open(csv_path, 'r') as f:
-            documents_reader = csv.DictReader(f)
-            for row in documents_reader:
-                # Convert is_published string to boolean
-                row['is_published'] = row['is_published'].lower() == 'true'
-                cursor.execute(document_records_insert, row)
+    Returns:
+        True if the index exists, False if FTS5 is not available
+    """
+    cursor = conn.cursor()
+    existed = has_fulltext_index(conn)
+    try:
+        cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+            title, data, content='documents', content_rowid='id'
+        )
+        ''')
+    except sqlite3.OperationalError:
+        # no such module: fts5
+        return False
 
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS documents_fts_insert AFTER INSERT ON documents BEGIN
+        INSERT INTO documents_fts(rowid, title, data) VALUES (new.id, new.title, new.data);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS documents_fts_delete AFTER DELETE ON documents BEGIN
+        INSERT INTO documents_fts(documents_fts, rowid, title, data) VALUES ('delete', old.id, old.title, old.data);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS documents_fts_update AFTER UPDATE OF title, data ON documents BEGIN
+        INSERT INTO documents_fts(documents_fts, rowid, title, data) VALUES ('delete', old.id, old.title, old.data);
+        INSERT INTO documents_fts(rowid, title, data) VALUES (new.id, new.title, new.data);
+    END
+    ''')
+
+    if not existed:
+        cursor.execute("INSERT INTO documents_fts(documents_fts) VALUES ('rebuild')")
     conn.commit()
+    return True
+
+def has_fulltext_index(conn: sqlite3.Connection) -> bool:
+    """Return True if the documents_fts index exists in the database."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'documents_fts'")
+    return cursor.fetchone() is not None
+
+def fulltext_query(search_term: str, prefix: bool = True) -> Optional[str]:
+    """
+    Turn a user search term into an FTS5 MATCH expression.
+    
+    Every word is quoted so FTS5 operators in user input are matched
+    literally, and all words must appear. With prefix, each word also
+    matches longer words starting with it (closest to the old LIKE search).
+    
+    Returns:
+        The MATCH expression, or None if the term contains no words
+    """
+    words = re.findall(r"\w+", search_term)
+    if not words:
+        return None
+    suffix = "*" if prefix else ""
+    return " ".join(f'"{word}"{suffix}' for word in words)
+
+def match_condition(use_fts: bool, search_term: str, prefix: bool = True) -> Tuple[str, tuple]:
+    """
+    Build the WHERE condition selecting documents that match a search term.
+    
+    Args:
+        use_fts: Whether the documents_fts index is available
+        search_term: The term to search for
+        prefix: Match word prefixes when using the full-text index
+        
+    Returns:
+        The SQL condition on the documents table and its parameters
+    """
+    query = fulltext_query(search_term, prefix) if use_fts else None
+    if query is None:
+        search_pattern = f"%{search_term}%"
+        return "(title LIKE ? OR data LIKE ?)", (search_pattern, search_pattern)
+    return "id IN (SELECT rowid FROM documents_fts WHERE documents_fts MATCH ?)", (query,)
+
+def search_sql(use_fts: bool, search_term: str, prefix: bool = True, rank: bool = False,
+               permission_user: Optional[str] = None, include_data: bool = True,
+               published_only: bool = False) -> Tuple[str, tuple]:
+    """
+    Build the SELECT returning documents that match a search term.
+    
+    Args:
+        use_fts: Whether the documents_fts index is available
+        search_term: The term to search for
+        prefix: Match word prefixes when using the full-text index
+        rank: Order by bm25 relevance (full-text index only) instead of id
+        permission_user: If set, join the local permission index and only
+            return documents this user can read (see permission_index.py)
+        include_data: Select the data column
+        published_only: Only return published documents
+        
+    Returns:
+        The SQL query and its parameters
+    """
+    joins, join_params = "", ()
+    if permission_user is not None:
+        joins = (" JOIN document_permissions ON document_permissions.document = documents.id"
+                 " AND document_permissions.user = ? AND document_permissions.relation = 'reader'")
+        join_params = (permission_user,)
+
+    columns = document_columns(include_data)
+    published = " AND documents.is_published = 1" if published_only else ""
+    query = fulltext_query(search_term, prefix) if use_fts else None
+    if rank and query is not None:
+        return (
+            f"SELECT {columns} FROM documents_fts "
+            f"JOIN documents ON documents.id = documents_fts.rowid{joins} "
+            f"WHERE documents_fts MATCH ?{published} ORDER BY bm25(documents_fts)",
+            join_params + (query,)
+        )
+    condition, params = match_condition(use_fts, search_term, prefix)
+    return (f"SELECT {columns} FROM documents{joins} WHERE {condition}{published} ORDER BY documents.id",
+            join_params + params)
+
+def populate_tables(conn: sqlite3.Connection):
+    """Load documents, folders and users from the CSV files in data/."""
+    data_dir = pathlib.Path(__file__).parent.parent / 'data'
+    paths = {table: data_dir / f"{table}.csv" for table in TABLES}
+    load_csv_files(conn, {table: path for table, path in paths.items() if os.path.exists(path)})
+
+def initialize_database(conn: sqlite3.Connection) -> bool:
+    """
+    Create the tables and load the CSV data if the documents table is empty.
+    
+    Returns:
+        True if the full-text index is available
+    """
+    create_tables(conn)
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM documents")
+    if cursor.fetchone()[0] == 0:
+        populate_tables(conn)
+    return has_fulltext_index(conn)
 
 class DocumentService:
     """Service for accessing document data using SQLite."""
@@ -100,15 +330,7 @@ class DocumentService:
     
     def _initialize_db(self) -> None:
         """Initialize the database with documents table and load data from CSV."""
-        create_tables(self.conn)
-        # Populate tables if empty  
-        # check if empty
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM documents")
-        count = cursor.fetchone()[0]
-        if count == 0:
-            populate_tables(self.conn)
-        
+        self.use_fts = initialize_database(self.conn)
     
     def get_document_by_id(self, document_id: int) -> Optional[Document]:
         """
@@ -128,26 +350,23 @@ class DocumentService:
             return Document(**dict(result))
         return None
     
-    def search_documents(self, search_term: str) -> List[Document]:
+    def search_documents(self, search_term: str, rank: bool = False, prefix: bool = True) -> List[Document]:
         """
         Search for documents containing the given term in title or data.
         
         Args:
             search_term: The term to search for
+            rank: Order results by bm25 relevance instead of id
+            prefix: Match words starting with each search word
             
         Returns:
             A list of matching documents as Document models
         """
         cursor = self.conn.cursor()
-        search_pattern = f"%{search_term}%"
-        
-        cursor.execute(
-            "SELECT * FROM documents WHERE title LIKE ? OR data LIKE ?",
-            (search_pattern, search_pattern)
-        )
+        cursor.execute(*search_sql(self.use_fts, search_term, prefix, rank))
         
         results = cursor.fetchall()
-        return [Document(**dict(row)) for row in results]
+        return documents_from_rows(results)
     
     def close(self) -> None:
         """Close the database connection."""
@@ -155,97 +374,810 @@ class DocumentService:
             self.conn.close()
 
 
+class DocumentPage(BaseModel):
+    """Pydantic model for one page of authorized search results."""
+    documents: List[Document]
+    next_cursor: Optional[str] = None
+
+
+# Upper bound on rows fetched and authorized per block while filling a page
+PAGE_MAX_BLOCK = 500
+
+# IDs per "id IN (...)" query, below SQLite's bound parameter limit
+FETCH_CHUNK_SIZE = 10000
+
+# Documents per batch yielded by iter_documents
+ITER_BATCH_SIZE = 100
+
+# document#parent in model.fga, mirrored by the documents table's folder_id column
+PARENT_RELATION = "parent"
+
+
+def _encode_cursor(after_id: int, search_term: str) -> str:
+    """Build the opaque continuation cursor for a search page."""
+    payload = json.dumps({"after": after_id, "term": search_term}).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def _decode_cursor(cursor: Optional[str], search_term: str) -> int:
+    """Return the last consumed document id encoded in a cursor (0 for the first page)."""
+    if cursor is None:
+        return 0
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        after_id = int(payload["after"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+    if payload.get("term") != search_term:
+        raise ValueError("Pagination cursor belongs to a different search")
+    return after_id
+
+
+def _check_materialize(raw: bool, include_data: bool) -> None:
+    if not include_data and not raw:
+        raise ValueError("include_data=False requires raw=True: a Document always has data")
+
+
+def _materialize(rows: List[sqlite3.Row], raw: bool) -> List[Union[Document, DocumentRow]]:
+    return DocumentRow.from_rows(rows) if raw else documents_from_rows(rows)
+
+
+def publication_context(is_published: bool) -> dict:
+    """Check context carrying a document's publication status (the published_only condition in model.fga)."""
+    return {"is_published": bool(is_published)}
+
+
+def _publication(rows: Iterable[sqlite3.Row]) -> Dict[int, bool]:
+    """Map each row's document ID to its publication status, in row order."""
+    return {row["id"]: bool(row["is_published"]) for row in rows}
+
+
 class AuthorizationError(Exception):
     """Exception raised when a user does not have permission to access a resource."""
     pass
 
 class AuthorizedDocumentService:
-    """Document service with OpenFGA authorization checks."""
+    """
+    Document service with OpenFGA authorization checks.
     
-    def __init__(self, db_path: str = ':memory:'):
+    Every method takes an optional consistency preference and a RecentWrites
+    session marker (see consistency.py). Reads that must see a recent write
+    use HIGHER_CONSISTENCY and skip the decision cache, the planner's
+    accessible sets and the permission index.
+
+    Every authorization passes the document's publication status as check
+    context (publication_context), so folder readers granted with the
+    published_only condition only see published documents. Published and
+    unpublished documents are checked in the same batch. For users who
+    cannot read any unpublished document (no owner or editor access), the
+    queries select published rows only and unpublished rows are never
+    authorized; see _published_only.
+
+    The planner's accessible sets decide authorization too: write and delete
+    tuples through write_tuples and delete_tuples, which drop the cached
+    decisions and sets the change affects, and keep the folder_id column and
+    the hierarchy's edges in step with parent tuples.
+    """
+    
+    def __init__(self, db_path: str = ':memory:', decision_cache: Optional[DecisionCache] = None,
+                 inflight: Optional[SingleFlight] = None, planner: Optional[SearchPlanner] = None,
+                 use_permission_index: bool = False, max_index_lag: float = 5.0,
+                 max_readers: int = 4, hierarchy: Optional[HierarchyResolver] = None):
         """
         Initialize the document service with a SQLite database.
         
         Args:
             db_path: Path to SQLite database file. Defaults to in-memory database.
+            decision_cache: Optional cache for check decisions shared across requests.
+            inflight: Optional table coalescing concurrent identical FGA requests.
+            planner: Strategy planner for search authorization. Defaults to SearchPlanner().
+            use_permission_index: Filter searches with a local permission index fed by
+                the change feed, falling back to live checks while it is stale.
+            max_index_lag: Seconds of sync lag after which the index is considered stale.
+            max_readers: Number of threads (and connections) running read queries;
+                queries never run on the event loop, see db_pool.py.
+            hierarchy: Optional resolver checking folder-inherited relations once per
+                folder instead of once per document, see hierarchy.py.
         """
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row 
-        self._initialize_db()
+        self.db = DatabasePool(db_path, max_readers=max_readers)
+        self.use_fts = self.db.write_sync(initialize_database)
         self.fga_client = None
-    
-    def _initialize_db(self) -> None:
-        """Initialize the database with documents table and load data from CSV."""
-        create_tables(self.conn)
-        # Populate tables if empty  
-        # check if empty
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM documents")
-        count = cursor.fetchone()[0]
-        if count == 0:
-            populate_tables(self.conn)
+        self.decision_cache = decision_cache
+        self.inflight = inflight
+        self.planner = planner or SearchPlanner()
+        self.permission_index = None
+        if use_permission_index:
+            self.permission_index = self.db.write_sync(lambda conn: PermissionIndex(conn, max_index_lag))
+        self.permission_sync = None
+        self.hierarchy = hierarchy
 
     async def initialize_fga_client(self) -> None:
-        """Initialize the OpenFGA client from environment variables."""
-        api_url = os.environ.get("OPENFGA_API_URL", "http://localhost:8080")
-        store_id = os.environ.get("FGA_STORE_ID")
-        auth_model_id = os.environ.get("FGA_MODEL_ID")
-        
-        if not store_id:
-            raise ValueError("FGA_STORE_ID environment variable not set")
-        
-        # Initialize OpenFGA client
-        self.fga_client = OpenFgaClient(ClientConfiguration(
-            api_url=api_url,
-            store_id=store_id,
-            authorization_model_id=auth_model_id
-        ))
+        """Borrow the shared OpenFGA client for the store and model in the environment."""
+        self.fga_client = await get_fga_client()
+
+    def start_permission_sync(self, interval: float = 1.0) -> None:
+        """Start tailing the change feed into the permission index in the background."""
+        if self.permission_index is None:
+            raise ValueError("The service was created without use_permission_index")
+        if self.permission_sync is None:
+            self.permission_sync = PermissionIndexSync(self.fga_client, self.permission_index, interval,
+                                                       db=self.db)
+        self.permission_sync.start()
+
+    async def stop_permission_sync(self) -> None:
+        """Stop the background permission index sync, if running."""
+        if self.permission_sync is not None:
+            await self.permission_sync.stop()
+
+    def _index_is_fresh(self, consistency: Optional[str] = None) -> bool:
+        # The index trails the change feed, so it cannot serve strongly consistent reads
+        return (consistency != HIGHER_CONSISTENCY and self.permission_index is not None
+                and self.permission_index.is_fresh())
+
+    @staticmethod
+    def _consistency(user_id: str, consistency: Optional[str], recent_writes: Optional[RecentWrites],
+                     document_ids: Iterable[int] = ()) -> Optional[str]:
+        # A recent write of a document tuple marks the document and its user; writes that
+        # may change other users' access (parents, teams, usersets) mark every read
+        keys = [f"user:{user_id}", *(f"document:{document_id}" for document_id in document_ids)]
+        return resolve_consistency(consistency, recent_writes, keys)
     
-    async def get_document_by_id(self, user_id:str, document_id: int) -> Optional[Document]:
+    async def get_document_by_id(self, user_id:str, document_id: int, consistency: Optional[str] = None,
+                                 recent_writes: Optional[RecentWrites] = None) -> Optional[Document]:
         """
         Get a document by its ID.
         
         Args:
+            user_id: The user requesting the document
             document_id: The ID of the document to retrieve
+            consistency: Optional consistency preference for the check
+            recent_writes: Optional session marker promoting reads after recent writes
             
         Returns:
             The document as a Document model, or None if not found
+
+        Raises:
+            AuthorizationError: If the user cannot read the document
         """
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM documents WHERE id = ?", (document_id,))
-        result = cursor.fetchone()
+        result = await self.db.fetchone("SELECT * FROM documents WHERE id = ?", (document_id,))
         
         if result:
-            ## TODO: Add authorization check here
+            allowed = await check_access(self.fga_client, user_id, "reader",
+                                         f"document:{document_id}", cache=self.decision_cache,
+                                         inflight=self.inflight,
+                                         consistency=self._consistency(user_id, consistency, recent_writes,
+                                                                       [document_id]),
+                                         context=publication_context(result["is_published"]))
+            if not allowed:
+                raise AuthorizationError(f"User {user_id} cannot read document {document_id}")
             return Document(**dict(result))
 
         return None
     
-    async def search_documents(self, user_id:str, search_term: str) -> List[Document]:
+    async def get_documents_by_ids(self, user_id: str, document_ids: List[int],
+                                   raw: bool = False, consistency: Optional[str] = None,
+                                   recent_writes: Optional[RecentWrites] = None
+                                   ) -> List[Union[Document, DocumentRow]]:
+        """
+        Get several documents with one query and one authorization round.
+        
+        Args:
+            user_id: The user requesting the documents
+            document_ids: IDs of the documents to retrieve
+            raw: Return DocumentRow views instead of validated Documents
+            consistency: Optional consistency preference for the checks
+            recent_writes: Optional session marker promoting reads after recent writes
+            
+        Returns:
+            The documents that exist and the user can read, in request order
+        """
+        rows = {row["id"]: row for row in await self._fetch_by_ids(list(dict.fromkeys(document_ids)))}
+        consistency = self._consistency(user_id, consistency, recent_writes, rows)
+        allowed_ids = (await self._authorize_block(user_id, _publication(rows.values()), consistency)
+                       if rows else set())
+        return _materialize([rows[doc_id] for doc_id in dict.fromkeys(document_ids)
+                             if doc_id in allowed_ids], raw)
+
+    async def list_documents(self, user_id: str, relation: str = "reader", raw: bool = False,
+                             include_data: bool = True, consistency: Optional[str] = None,
+                             recent_writes: Optional[RecentWrites] = None) -> List[Union[Document, DocumentRow]]:
+        """
+        List every document the user holds a relation on, ordered by ID.
+        
+        Uses the permission index when it is fresh, otherwise the planner's
+        cached accessible sets or list_objects calls: one listing evaluated
+        for published documents, and one for unpublished documents unless the
+        user is known to read published documents only.
+        
+        Args:
+            user_id: The user whose documents to list
+            relation: The relation required on each document
+            raw: Return DocumentRow views instead of validated Documents
+            include_data: Fetch the data column (requires raw when False)
+            consistency: Optional consistency preference for the listing
+            recent_writes: Optional session marker promoting reads after recent writes
+            
+        Returns:
+            The documents as Document models, or DocumentRows if raw
+        """
+        _check_materialize(raw, include_data)
+        consistency = self._consistency(user_id, consistency, recent_writes)
+        if relation == "reader" and self._index_is_fresh(consistency):
+            rows = await self.db.fetchall(
+                f"SELECT {document_columns(include_data)} FROM documents JOIN document_permissions "
+                "ON document_permissions.document = documents.id "
+                "WHERE document_permissions.user = ? AND document_permissions.relation = 'reader' "
+                "ORDER BY documents.id",
+                (user_id,)
+            )
+        else:
+            known = (None if consistency == HIGHER_CONSISTENCY
+                     else self.planner.get_published_only(user_id, relation))
+            statuses = [True] if known else [True, False]
+            listed = await asyncio.gather(*(self._accessible_ids(user_id, relation, consistency, published)
+                                            for published in statuses))
+            accessible = dict(zip(statuses, listed))
+            rows = await self._fetch_by_ids(sorted(set().union(*listed)), include_data,
+                                            published_only=bool(known))
+            rows = [row for row in rows if row["id"] in accessible.get(bool(row["is_published"]), ())]
+        return _materialize(rows, raw)
+
+    async def iter_documents(self, user_id: str, relation: str = "reader", batch_size: int = ITER_BATCH_SIZE,
+                             include_data: bool = True, consistency: Optional[str] = None,
+                             recent_writes: Optional[RecentWrites] = None) -> AsyncIterator[List[DocumentRow]]:
+        """
+        Stream the documents the user holds a relation on, in batches of DocumentRows.
+        
+        Unlike list_documents, nothing is collected up front: document IDs
+        come from the streamed list objects endpoint (or, when it is fresh,
+        the permission index read page by page) and are looked up in SQLite
+        batch_size at a time. The first batch arrives without waiting for the
+        user's whole accessible set, memory stays bounded by batch_size, and
+        closing the iterator (aclose(), or dropping it after breaking out of
+        the loop) stops the server's evaluation.
+        
+        Batches are ordered by ID within themselves only; the stream follows
+        the server's order.
+        
+        The stream is evaluated for published documents. Users reading
+        published documents only get published rows; for other users the
+        unpublished rows of each batch are checked again with their status,
+        in one batch check.
+        
+        Args:
+            user_id: The user whose documents to list
+            relation: The relation required on each document
+            batch_size: Maximum number of documents per yielded batch
+            include_data: Fetch the data column
+            consistency: Optional consistency preference for the listing
+            recent_writes: Optional session marker promoting reads after recent writes
+            
+        Yields:
+            Lists of at most batch_size DocumentRows
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer")
+        consistency = self._consistency(user_id, consistency, recent_writes)
+        columns = document_columns(include_data)
+
+        if relation == "reader" and self._index_is_fresh(consistency):
+            after_id = 0
+            while True:
+                rows = await self.db.fetchall(
+                    f"SELECT {columns} FROM documents JOIN document_permissions "
+                    "ON document_permissions.document = documents.id "
+                    "WHERE document_permissions.user = ? AND document_permissions.relation = 'reader' "
+                    "AND documents.id > ? ORDER BY documents.id LIMIT ?",
+                    (user_id, after_id, batch_size)
+                )
+                if rows:
+                    yield DocumentRow.from_rows(rows)
+                if len(rows) < batch_size:
+                    return
+                after_id = rows[-1]["id"]
+
+        published_only = await self._published_only(user_id, relation, consistency)
+
+        async def fetch(document_ids: List[int]) -> List[sqlite3.Row]:
+            rows = await self._fetch_by_ids(document_ids, include_data, published_only)
+            unpublished = {row["id"]: False for row in rows if not row["is_published"]}
+            if unpublished:
+                allowed = await self._authorize_by_check(user_id, relation, unpublished, consistency)
+                rows = [row for row in rows if row["is_published"] or row["id"] in allowed]
+            return rows
+
+        stream = iter_documents_for_user(self.fga_client, user_id, relation, consistency=consistency,
+                                         context=publication_context(True))
+        try:
+            batch: List[int] = []
+            async for doc_id in stream:
+                batch.append(int(doc_id))
+                if len(batch) == batch_size:
+                    rows = await fetch(batch)
+                    batch = []
+                    # IDs without a row (deleted documents) are skipped
+                    if rows:
+                        yield DocumentRow.from_rows(rows)
+            if batch:
+                rows = await fetch(batch)
+                if rows:
+                    yield DocumentRow.from_rows(rows)
+        finally:
+            await stream.aclose()
+
+    async def list_folder_documents(self, user_id: str, folder_id: int, relation: str = "reader",
+                                    raw: bool = False, include_data: bool = True,
+                                    consistency: Optional[str] = None,
+                                    recent_writes: Optional[RecentWrites] = None
+                                    ) -> List[Union[Document, DocumentRow]]:
+        """
+        List the documents of a folder the user holds a relation on, ordered by ID.
+        
+        With a hierarchy resolver, folder-inherited relations cost one check
+        for the whole folder (two if it holds published and unpublished
+        documents); other relations are checked per document.
+        
+        Args:
+            user_id: The user listing the folder
+            folder_id: The folder whose documents to list
+            relation: The relation required on each document
+            raw: Return DocumentRow views instead of validated Documents
+            include_data: Fetch the data column (requires raw when False)
+            consistency: Optional consistency preference for the checks
+            recent_writes: Optional session marker promoting reads after recent writes
+            
+        Returns:
+            The documents as Document models, or DocumentRows if raw
+        """
+        _check_materialize(raw, include_data)
+        consistency = self._consistency(user_id, consistency, recent_writes)
+        published_only = await self._published_only(user_id, relation, consistency)
+        rows = await self.db.fetchall(
+            f"SELECT {document_columns(include_data)} FROM documents WHERE folder_id = ?"
+            f"{' AND is_published = 1' if published_only else ''} ORDER BY id",
+            (folder_id,)
+        )
+        if not rows:
+            return []
+        if self.hierarchy is not None:
+            self.hierarchy.learn({row["id"]: folder_id for row in rows})
+        allowed_ids = await self._authorize_by_check(user_id, relation, _publication(rows), consistency)
+        return _materialize([row for row in rows if row["id"] in allowed_ids], raw)
+
+    async def _fetch_by_ids(self, document_ids: List[int], include_data: bool = True,
+                            published_only: bool = False) -> List[sqlite3.Row]:
+        """Fetch document rows by ID, ordered by ID, in chunks below SQLite's parameter limit."""
+        rows = []
+        columns = document_columns(include_data)
+        published = " AND is_published = 1" if published_only else ""
+        for i in range(0, len(document_ids), FETCH_CHUNK_SIZE):
+            chunk = document_ids[i:i + FETCH_CHUNK_SIZE]
+            rows.extend(await self.db.fetchall(
+                f"SELECT {columns} FROM documents WHERE id IN ({','.join('?' * len(chunk))}){published} "
+                "ORDER BY id",
+                tuple(chunk)
+            ))
+        return rows
+    
+    async def search_documents(self, user_id:str, search_term: str, rank: bool = False,
+                               prefix: bool = True, raw: bool = False,
+                               include_data: bool = True, consistency: Optional[str] = None,
+                               recent_writes: Optional[RecentWrites] = None
+                               ) -> List[Union[Document, DocumentRow]]:
         """
         Search for documents containing the given term in title or data.
         
+        The way matches are authorized is chosen per query by the planner;
+        see planner.py. The plan used is available as planner.last_plan.
+        
         Args:
+            user_id: The user searching
             search_term: The term to search for
+            rank: Order results by bm25 relevance instead of id
+            prefix: Match words starting with each search word
+            raw: Return DocumentRow views instead of validated Documents; much
+                cheaper for large results (see benchmarks/row_materialization.py)
+            include_data: Fetch the data column (requires raw when False)
+            consistency: Optional consistency preference for the authorization
+            recent_writes: Optional session marker promoting reads after recent writes
             
         Returns:
-            A list of matching documents as Document models
+            A list of matching documents the user can read, as Document models
+            or DocumentRows if raw
         """
-        cursor = self.conn.cursor()
-        search_pattern = f"%{search_term}%"
+        _check_materialize(raw, include_data)
+        started = time.perf_counter()
+        consistency = self._consistency(user_id, consistency, recent_writes)
+        if self._index_is_fresh(consistency):
+            return await self._search_with_index(user_id, search_term, rank, prefix, started, raw,
+                                                 include_data)
+
+        published_only = await self._published_only(user_id, "reader", consistency)
+        results = await self.db.fetchall(*search_sql(self.use_fts, search_term, prefix, rank,
+                                                     include_data=include_data, published_only=published_only))
+        sql_done = time.perf_counter()
+
+        plan = self.planner.choose(user_id, "reader", len(results), published_only)
+        allowed_ids = await self._authorize_rows(plan, _publication(results), consistency)
+        authz_done = time.perf_counter()
+
+        documents = _materialize([row for row in results if row["id"] in allowed_ids], raw)
+
+        plan.result_count = len(documents)
+        plan.sql_ms = (sql_done - started) * 1000
+        plan.authz_ms = (authz_done - sql_done) * 1000
+        plan.total_ms = (time.perf_counter() - started) * 1000
+        self.planner.record(plan)
+        return documents
+
+    async def _search_with_index(self, user_id: str, search_term: str, rank: bool, prefix: bool,
+                                 started: float, raw: bool = False,
+                                 include_data: bool = True) -> List[Union[Document, DocumentRow]]:
+        """Search with authorization done by a JOIN on the local permission index."""
+        rows = await self.db.fetchall(*search_sql(self.use_fts, search_term, prefix, rank,
+                                                  permission_user=user_id, include_data=include_data))
+        documents = _materialize(rows, raw)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.planner.record(SearchPlan(
+            strategy=INDEX, winner=INDEX, user_id=user_id, relation="reader",
+            match_count=len(documents), result_count=len(documents),
+            sql_ms=elapsed_ms, total_ms=elapsed_ms,
+        ))
+        return documents
+
+    async def search_documents_page(self, user_id: str, search_term: str, limit: int = 20,
+                                    cursor: Optional[str] = None, consistency: Optional[str] = None,
+                                    recent_writes: Optional[RecentWrites] = None) -> DocumentPage:
+        """
+        Return the next page of matching documents the user can read.
         
-        cursor.execute(
-            "SELECT * FROM documents WHERE title LIKE ? OR data LIKE ?",
-            (search_pattern, search_pattern)
-        )
+        See search_document_rows_page for how pages are filled.
         
-        results = cursor.fetchall()
+        Args:
+            user_id: The user searching
+            search_term: The term to search for
+            limit: Maximum number of documents to return
+            cursor: next_cursor from the previous page, or None for the first page
+            consistency: Optional consistency preference for the authorization
+            recent_writes: Optional session marker promoting reads after recent writes
+            
+        Returns:
+            A DocumentPage with the documents and the cursor for the next page
+        """
+        rows, next_cursor = await self._search_page_rows(
+            user_id, search_term, limit, cursor, True,
+            self._consistency(user_id, consistency, recent_writes))
+        return DocumentPage(documents=documents_from_rows(rows), next_cursor=next_cursor)
 
-        ## TODO: Add authorization check here
-        return [Document(**dict(row)) for row in results]
+    async def search_document_rows_page(self, user_id: str, search_term: str, limit: int = 20,
+                                        cursor: Optional[str] = None, include_data: bool = True,
+                                        consistency: Optional[str] = None,
+                                        recent_writes: Optional[RecentWrites] = None
+                                        ) -> Tuple[List[DocumentRow], Optional[str]]:
+        """
+        Return the next page of matching documents the user can read, as DocumentRows.
+        
+        Candidate rows are read in id order, one block at a time, and each
+        block is authorized with a single batch check. Blocks are fetched until
+        the page is full, so the cost follows the page size rather than the
+        number of matches. The block size adapts to the share of rows the user
+        could read so far.
+        
+        Args:
+            user_id: The user searching
+            search_term: The term to search for
+            limit: Maximum number of documents to return
+            cursor: next_cursor from the previous page, or None for the first page
+            include_data: Fetch the data column
+            consistency: Optional consistency preference for the authorization
+            recent_writes: Optional session marker promoting reads after recent writes
+            
+        Returns:
+            The DocumentRows and the cursor for the next page (None on the last page)
+        """
+        rows, next_cursor = await self._search_page_rows(
+            user_id, search_term, limit, cursor, include_data,
+            self._consistency(user_id, consistency, recent_writes))
+        return DocumentRow.from_rows(rows), next_cursor
+
+    async def _search_page_rows(self, user_id: str, search_term: str, limit: int,
+                                cursor: Optional[str], include_data: bool,
+                                consistency: Optional[str] = None) -> Tuple[List[sqlite3.Row], Optional[str]]:
+        if limit <= 0:
+            raise ValueError("limit must be a positive integer")
+        after_id = _decode_cursor(cursor, search_term)
+        condition, params = match_condition(self.use_fts, search_term)
+        if await self._published_only(user_id, "reader", consistency):
+            condition += " AND is_published = 1"
+
+        columns = document_columns(include_data)
+        matched: List[sqlite3.Row] = []
+        scanned = allowed_count = 0
+        exhausted = False
+        while len(matched) < limit:
+            remaining = limit - len(matched)
+            ratio = allowed_count / scanned if scanned else 1.0
+            block_size = min(PAGE_MAX_BLOCK, max(remaining, int(remaining / max(ratio, 0.05))))
+
+            rows = await self.db.fetchall(
+                f"SELECT {columns} FROM documents WHERE {condition} AND id > ? ORDER BY id LIMIT ?",
+                params + (after_id, block_size)
+            )
+            if len(rows) < block_size:
+                exhausted = True
+            if not rows:
+                break
+
+            allowed_ids = await self._authorize_block(user_id, _publication(rows), consistency)
+            scanned += len(rows)
+            allowed_count += len(allowed_ids)
+            for row in rows:
+                after_id = row["id"]
+                if row["id"] in allowed_ids:
+                    matched.append(row)
+                    if len(matched) == limit:
+                        # Rows after this one were not consumed; the next page starts here
+                        exhausted = exhausted and row["id"] == rows[-1]["id"]
+                        break
+            if exhausted:
+                break
+
+        next_cursor = None if exhausted else _encode_cursor(after_id, search_term)
+        return matched, next_cursor
+
+    async def _authorize_block(self, user_id: str, published: Dict[int, bool],
+                               consistency: Optional[str] = None) -> Set[int]:
+        """Authorize one block of a page from the permission index or cached accessible sets if possible."""
+        if self._index_is_fresh(consistency):
+            placeholders = ",".join("?" * len(published))
+            rows = await self.db.fetchall(
+                "SELECT document FROM document_permissions WHERE user = ? AND relation = 'reader' "
+                f"AND document IN ({placeholders})",
+                (user_id, *published)
+            )
+            return {row[0] for row in rows}
+        if consistency != HIGHER_CONSISTENCY:
+            allowed = self._cached_accessible(user_id, "reader", published)
+            if allowed is not None:
+                return allowed
+        return await self._authorize_by_check(user_id, "reader", published, consistency)
+
+    async def _authorize_rows(self, plan: SearchPlan, published: Dict[int, bool],
+                              consistency: Optional[str] = None) -> Set[int]:
+        """Return the documents of published ({id: is_published}) the plan's user holds the relation on."""
+        if not published:
+            return set()
+
+        if plan.strategy == CHECK:
+            plan.winner = CHECK
+            return await self._authorize_by_check(plan.user_id, plan.relation, published, consistency)
+        if plan.strategy == LIST:
+            plan.winner = LIST
+            return await self._filter_accessible(plan.user_id, plan.relation, published, consistency)
+
+        # Hybrid: race both strategies and keep the first to finish
+        tasks = {
+            asyncio.ensure_future(self._authorize_by_check(plan.user_id, plan.relation, published,
+                                                           consistency)): CHECK,
+            asyncio.ensure_future(self._filter_accessible(plan.user_id, plan.relation, published,
+                                                          consistency)): LIST,
+        }
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        plan.winner = tasks[task]
+                        return task.result()
+            # Both failed: surface the first error
+            return next(iter(tasks)).result()
+        finally:
+            # Stop the loser and wait for it, so its FGA calls do not outlive the search
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _authorize_by_check(self, user_id: str, relation: str, published: Dict[int, bool],
+                                  consistency: Optional[str] = None) -> Set[int]:
+        """
+        Batch-check each document, or each folder for folder-inherited relations, and return the allowed IDs.
+
+        Each check carries its document's publication status as context, so
+        published and unpublished documents share one batch.
+        """
+        contexts = {doc_id: publication_context(is_published) for doc_id, is_published in published.items()}
+        if self.hierarchy is not None and self.hierarchy.can_fold(relation):
+            return await self.hierarchy.authorize(self.fga_client, user_id, relation, list(published),
+                                                  self._folder_ids, cache=self.decision_cache,
+                                                  consistency=consistency, contexts=contexts)
+        checks = [{"user": user_id, "relation": relation, "object": f"document:{doc_id}",
+                   "context": contexts[doc_id]}
+                  for doc_id in published]
+        results = await batch_check_access(self.fga_client, checks, cache=self.decision_cache,
+                                           consistency=consistency)
+        return {doc_id for doc_id, allowed in zip(published, results) if allowed}
+
+    async def _folder_ids(self, document_ids: List[int]) -> Dict[int, Optional[int]]:
+        """Return {document_id: folder_id} for the documents that exist."""
+        folders = {}
+        for i in range(0, len(document_ids), FETCH_CHUNK_SIZE):
+            chunk = document_ids[i:i + FETCH_CHUNK_SIZE]
+            rows = await self.db.fetchall(
+                f"SELECT id, folder_id FROM documents WHERE id IN ({','.join('?' * len(chunk))})",
+                tuple(chunk)
+            )
+            folders.update((row[0], row[1]) for row in rows)
+        return folders
+
+    async def _published_only(self, user_id: str, relation: str, consistency: Optional[str] = None) -> bool:
+        """
+        Return True if the user can hold the relation on published documents only.
+
+        The answer is kept by the planner and dropped with the user's
+        accessible sets on writes. When unknown, it is read off the planner's
+        accessible set for unpublished documents if one is cached, and
+        otherwise learned from a streamed listing evaluated for unpublished
+        documents, closed after its first result. Strongly consistent reads
+        never filter on it.
+        """
+        if consistency == HIGHER_CONSISTENCY:
+            return False
+        known = self.planner.get_published_only(user_id, relation)
+        if known is None:
+            accessible = self.planner.get_accessible(user_id, relation, False)
+            if accessible is not None:
+                known = not accessible
+            else:
+                stream = iter_documents_for_user(self.fga_client, user_id, relation, consistency=consistency,
+                                                 context=publication_context(False))
+                try:
+                    known = True
+                    async for _ in stream:
+                        known = False
+                        break
+                finally:
+                    await stream.aclose()
+            self.planner.set_published_only(user_id, relation, known)
+        return known
+
+    def _cached_accessible(self, user_id: str, relation: str, published: Dict[int, bool]) -> Optional[Set[int]]:
+        """Filter documents with the planner's accessible sets, or return None if one is not cached."""
+        allowed = set()
+        for status in set(published.values()):
+            accessible = self.planner.get_accessible(user_id, relation, status)
+            if accessible is None:
+                return None
+            allowed.update(doc_id for doc_id, is_published in published.items()
+                           if is_published == status and doc_id in accessible)
+        return allowed
+
+    async def _filter_accessible(self, user_id: str, relation: str, published: Dict[int, bool],
+                                 consistency: Optional[str] = None) -> Set[int]:
+        """Return the documents found in the accessible set listed for their publication status."""
+        statuses = list(set(published.values()))
+        listed = await asyncio.gather(*(self._accessible_ids(user_id, relation, consistency, status)
+                                        for status in statuses))
+        accessible = dict(zip(statuses, listed))
+        return {doc_id for doc_id, is_published in published.items() if doc_id in accessible[is_published]}
+
+    async def _accessible_ids(self, user_id: str, relation: str, consistency: Optional[str] = None,
+                              published: bool = True, refresh: bool = False) -> Set[int]:
+        """Return the IDs the user holds the relation on, evaluated as published or not (planner-cached)."""
+        ids = (None if consistency == HIGHER_CONSISTENCY or refresh
+               else self.planner.get_accessible(user_id, relation, published))
+        if ids is None:
+            listed = await list_documents_for_user(self.fga_client, user_id, relation, inflight=self.inflight,
+                                                   consistency=consistency,
+                                                   context=publication_context(published))
+            ids = {int(doc_id) for doc_id in listed}
+            self.planner.set_accessible(user_id, relation, ids, published)
+            if not published:
+                # Listing for unpublished documents answers _published_only for free
+                self.planner.set_published_only(user_id, relation, not ids)
+        return ids
     
+    async def prefetch_accessible(self, user_id: str, relations: Iterable[str] = ("reader", "writer"),
+                                  refresh: bool = True) -> int:
+        """
+        List the user's accessible documents ahead of requests and keep them in the planner.
+
+        Both publication statuses are listed for each relation, which also
+        refreshes what the planner knows for _published_only. With refresh,
+        cached sets are replaced, so calling this shortly before they expire
+        keeps them warm; without it only missing sets are listed.
+        Used by warmup.WarmupScheduler.
+
+        Args:
+            user_id: The user whose accessible sets to list
+            relations: Relations to list documents for
+            refresh: Whether to list sets the planner already holds
+
+        Returns:
+            Number of list objects calls made
+        """
+        listings = [(relation, published) for relation in relations for published in (True, False)
+                    if refresh or self.planner.get_accessible(user_id, relation, published) is None]
+        await asyncio.gather(*(self._accessible_ids(user_id, relation, published=published, refresh=True)
+                               for relation, published in listings))
+        return len(listings)
+
+    async def write_tuples(self, to_write: List[dict],
+                           recent_writes: Optional[RecentWrites] = None) -> RecentWrites:
+        """
+        Write tuples and drop the cached decisions and accessible sets they may change.
+
+        Args:
+            to_write: Tuple dicts as for fga_client.write_tuples
+            recent_writes: Session marker to record the write in; a new one is
+                created if not given
+
+        Returns:
+            The RecentWrites marker; pass it to later reads for read-your-writes
+        """
+        recent_writes = await write_tuples(self.fga_client, to_write, cache=self.decision_cache,
+                                           recent_writes=recent_writes)
+        self.planner.invalidate_tuples(to_write)
+        await self._follow_parent_tuples(to_write)
+        return recent_writes
+
+    async def delete_tuples(self, to_delete: List[dict],
+                            recent_writes: Optional[RecentWrites] = None) -> RecentWrites:
+        """
+        Delete tuples and drop the cached decisions and accessible sets they may change.
+
+        Args:
+            to_delete: Tuple dicts as for fga_client.delete_tuples
+            recent_writes: Session marker to record the delete in; a new one is
+                created if not given
+
+        Returns:
+            The RecentWrites marker; pass it to later reads for read-your-writes
+        """
+        recent_writes = await delete_tuples(self.fga_client, to_delete, cache=self.decision_cache,
+                                            recent_writes=recent_writes)
+        self.planner.invalidate_tuples(to_delete)
+        await self._follow_parent_tuples(to_delete)
+        return recent_writes
+
+    async def _follow_parent_tuples(self, tuples: List[dict]) -> None:
+        """
+        Re-derive folder_id for documents whose parent tuples were written or deleted.
+
+        The model allows several parents per document while folder_id holds
+        one, so each affected document's parents are read back from OpenFGA:
+        folder_id is set to the only parent, or NULL when there are none or
+        several, which makes the hierarchy check the document individually.
+        """
+        document_ids = sorted({int(t["object"].split(":", 1)[1]) for t in tuples
+                               if t["relation"] == PARENT_RELATION and t["object"].startswith("document:")})
+        if not document_ids:
+            return
+        parents = await asyncio.gather(*(self._read_parents(document_id) for document_id in document_ids))
+        folder_ids = [(int(found[0].split(":", 1)[1]) if len(found) == 1 else None, document_id)
+                      for document_id, found in zip(document_ids, parents)]
+        await self.db.write(lambda conn: conn.executemany(
+            "UPDATE documents SET folder_id = ? WHERE id = ?", folder_ids))
+        if self.hierarchy is not None:
+            self.hierarchy.forget(document_ids)
+
+    async def _read_parents(self, document_id: int) -> List[str]:
+        """Return the folders (folder:<id>) a document's parent tuples point to, read with HIGHER_CONSISTENCY."""
+        parents: List[str] = []
+        continuation_token = None
+        while True:
+            options = {"consistency": HIGHER_CONSISTENCY}
+            if continuation_token:
+                options["continuation_token"] = continuation_token
+            response = await self.fga_client.read(
+                ReadRequestTupleKey(object=f"document:{document_id}", relation=PARENT_RELATION), options)
+            parents.extend(t.key.user for t in response.tuples if t.key.user.startswith("folder:"))
+            continuation_token = response.continuation_token
+            if not continuation_token:
+                return parents
+
     def close(self) -> None:
-        """Close the database connection."""
-        if self.conn:
-            self.conn.close()
\ No newline at end of file
+        """Close the database connections."""
+        self.db.close()
\ No newline at end of file
@@ -0,0 +1,312 @@
+"""
+Parser for the OpenFGA modeling language (schema 1.1).
+
+parse_model turns the text of a .fga file such as model.fga into the JSON
+form of an authorization model used by the OpenFGA API:
+
+    {"schema_version": "1.1",
+     "type_definitions": [{"type": ..., "relations": {...}, "metadata": {...}}],
+     "conditions": {...}}
+
+Supported: direct type restrictions (``[user, user:*, editors#member,
+folder with cond]``), computed relations, ``X from Y``, ``or``, ``and``,
+``but not``, parentheses and ``condition`` blocks. Modules are not.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+# OpenFGA condition parameter type names
+CONDITION_TYPES = {
+    "bool": "TYPE_NAME_BOOL",
+    "string": "TYPE_NAME_STRING",
+    "int": "TYPE_NAME_INT",
+    "uint": "TYPE_NAME_UINT",
+    "double": "TYPE_NAME_DOUBLE",
+    "timestamp": "TYPE_NAME_TIMESTAMP",
+    "duration": "TYPE_NAME_DURATION",
+    "ipaddress": "TYPE_NAME_IPADDRESS",
+    "any": "TYPE_NAME_ANY",
+    "list": "TYPE_NAME_LIST",
+    "map": "TYPE_NAME_MAP",
+}
+
+_TOKEN_RE = re.compile(r"\s*(\[|\]|\(|\)|,|[A-Za-z0-9_\-.:*#]+)")
+
+
+class ModelParseError(ValueError):
+    """Exception raised when a model file cannot be parsed."""
+
+    def __init__(self, message: str, line: Optional[int] = None):
+        if line is not None:
+            message = f"line {line}: {message}"
+        super().__init__(message)
+
+
+def _strip_comment(line: str) -> str:
+    # '#' also separates a userset relation (editors#member), so only a '#'
+    # at the start of the line or after whitespace starts a comment
+    return re.sub(r"(^|\s)#.*$", "", line).rstrip()
+
+
+def _tokenize(text: str, line: int) -> List[str]:
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if match is None:
+            raise ModelParseError(f"unexpected character {text[pos:].strip()[:1]!r}", line)
+        tokens.append(match.group(1))
+        pos = match.end()
+    return tokens
+
+
+class _RelationParser:
+    """Recursive-descent parser for one relation definition."""
+
+    def __init__(self, tokens: List[str], line: int):
+        self.tokens = tokens
+        self.pos = 0
+        self.line = line
+        self.direct_types: List[dict] = []
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self, expected: Optional[str] = None) -> str:
+        token = self.peek()
+        if token is None or (expected is not None and token != expected):
+            raise ModelParseError(f"expected {expected or 'a token'}, got {token!r}", self.line)
+        self.pos += 1
+        return token
+
+    def parse(self) -> dict:
+        rewrite = self.expression()
+        if self.peek() is not None:
+            raise ModelParseError(f"unexpected {self.peek()!r}", self.line)
+        return rewrite
+
+    def expression(self) -> dict:
+        children = [self.term()]
+        operator = None
+        while self.peek() in ("or", "and"):
+            token = self.take()
+            if operator is not None and token != operator:
+                raise ModelParseError("mixing 'or' and 'and' requires parentheses", self.line)
+            operator = token
+            children.append(self.term())
+
+        rewrite = children[0]
+        if operator == "or":
+            rewrite = {"union": {"child": children}}
+        elif operator == "and":
+            rewrite = {"intersection": {"child": children}}
+
+        if self.peek() == "but":
+            self.take("but")
+            self.take("not")
+            rewrite = {"difference": {"base": rewrite, "subtract": self.term()}}
+        return rewrite
+
+    def term(self) -> dict:
+        token = self.peek()
+        if token == "(":
+            self.take("(")
+            rewrite = self.expression()
+            self.take(")")
+            return rewrite
+        if token == "[":
+            self.direct_types.extend(self.type_restrictions())
+            return {"this": {}}
+
+        relation = self.take()
+        if self.peek() == "from":
+            self.take("from")
+            tupleset = self.take()
+            return {"tupleToUserset": {"tupleset": {"object": "", "relation": tupleset},
+                                       "computedUserset": {"object": "", "relation": relation}}}
+        return {"computedUserset": {"object": "", "relation": relation}}
+
+    def type_restrictions(self) -> List[dict]:
+        self.take("[")
+        restrictions = []
+        while True:
+            restrictions.append(self.type_restriction())
+            if self.peek() == ",":
+                self.take(",")
+                continue
+            self.take("]")
+            return restrictions
+
+    def type_restriction(self) -> dict:
+        token = self.take()
+        restriction: dict = {}
+        if token.endswith(":*"):
+            restriction["type"] = token[:-2]
+            restriction["wildcard"] = {}
+        elif "#" in token:
+            type_name, relation = token.split("#", 1)
+            restriction["type"] = type_name
+            restriction["relation"] = relation
+        else:
+            restriction["type"] = token
+        if self.peek() == "with":
+            self.take("with")
+            restriction["condition"] = self.take()
+        return restriction
+
+
+def _parse_condition(lines: List[Tuple[int, str]], index: int) -> Tuple[str, dict, int]:
+    """Parse a condition block starting at lines[index]; return (name, definition, next index)."""
+    number, header = lines[index]
+    match = re.match(r"condition\s+(\w+)\s*\((.*?)\)\s*\{(.*)$", header.strip())
+    if match is None:
+        raise ModelParseError("invalid condition header", number)
+    name, params_text, body = match.groups()
+
+    parameters = {}
+    for param in filter(None, (p.strip() for p in params_text.split(","))):
+        param_name, _, param_type = (part.strip() for part in param.partition(":"))
+        generic = re.match(r"(\w+)<(\w+)>$", param_type)
+        base_type = generic.group(1) if generic else param_type
+        if base_type not in CONDITION_TYPES:
+            raise ModelParseError(f"unknown condition parameter type {param_type!r}", number)
+        definition = {"type_name": CONDITION_TYPES[base_type]}
+        if generic:
+            definition["generic_types"] = [{"type_name": CONDITION_TYPES[generic.group(2)]}]
+        parameters[param_name] = definition
+
+    # Collect the expression up to the matching closing brace
+    depth = 1
+    expression = []
+    text = body
+    index += 1
+    while True:
+        for i, char in enumerate(text):
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    expression.append(text[:i])
+                    return name, {"name": name, "expression": " ".join(
+                        part.strip() for part in expression if part.strip()),
+                        "parameters": parameters}, index
+        expression.append(text)
+        if index >= len(lines):
+            raise ModelParseError(f"unterminated condition {name!r}", number)
+        text = lines[index][1]
+        index += 1
+
+
+def parse_model(text: str) -> dict:
+    """
+    Parse an OpenFGA DSL model into its JSON representation.
+
+    Args:
+        text: Contents of a .fga model file
+
+    Returns:
+        Dict with schema_version, type_definitions and conditions keys
+    """
+    lines = [(number, _strip_comment(line)) for number, line in enumerate(text.splitlines(), 1)]
+    lines = [(number, line) for number, line in lines if line.strip()]
+
+    schema_version = None
+    type_definitions: List[dict] = []
+    conditions: Dict[str, dict] = {}
+    current: Optional[dict] = None
+
+    index = 0
+    while index < len(lines):
+        number, line = lines[index]
+        stripped = line.strip()
+
+        if stripped == "model":
+            index += 1
+            continue
+        if stripped.startswith("schema "):
+            schema_version = stripped.split(None, 1)[1]
+            index += 1
+            continue
+        if stripped.startswith("type "):
+            current = {"type": stripped.split(None, 1)[1], "relations": {},
+                       "metadata": None}
+            type_definitions.append(current)
+            index += 1
+            continue
+        if stripped == "relations":
+            if current is None:
+                raise ModelParseError("'relations' outside of a type", number)
+            current["metadata"] = {"relations": {}}
+            index += 1
+            continue
+        if stripped.startswith("define "):
+            if current is None or current["metadata"] is None:
+                raise ModelParseError("'define' outside of a relations block", number)
+            match = re.match(r"define\s+(\w+)\s*:\s*(.+)$", stripped)
+            if match is None:
+                raise ModelParseError("invalid relation definition", number)
+            relation, definition = match.groups()
+            parser = _RelationParser(_tokenize(definition, number), number)
+            current["relations"][relation] = parser.parse()
+            current["metadata"]["relations"][relation] = {
+                "directly_related_user_types": parser.direct_types}
+            index += 1
+            continue
+        if stripped.startswith("condition "):
+            name, condition, index = _parse_condition(lines, index)
+            conditions[name] = condition
+            continue
+        raise ModelParseError(f"unexpected {stripped!r}", number)
+
+    if schema_version != "1.1":
+        raise ModelParseError(f"unsupported schema version {schema_version!r}, expected 1.1")
+
+    model = {"schema_version": schema_version, "type_definitions": type_definitions}
+    if conditions:
+        model["conditions"] = conditions
+    _validate(model)
+    return model
+
+
+def _validate(model: dict) -> None:
+    """Check that every referenced type and relation exists."""
+    relations = {t["type"]: set(t["relations"]) for t in model["type_definitions"]}
+    conditions = set(model.get("conditions", {}))
+
+    def check_rewrite(type_name: str, rewrite: dict) -> None:
+        if "computedUserset" in rewrite:
+            name = rewrite["computedUserset"]["relation"]
+            if name not in relations[type_name]:
+                raise ModelParseError(f"type {type_name!r} has no relation {name!r}")
+        elif "tupleToUserset" in rewrite:
+            tupleset = rewrite["tupleToUserset"]["tupleset"]["relation"]
+            if tupleset not in relations[type_name]:
+                raise ModelParseError(f"type {type_name!r} has no relation {tupleset!r}")
+        elif "union" in rewrite or "intersection" in rewrite:
+            for child in (rewrite.get("union") or rewrite["intersection"])["child"]:
+                check_rewrite(type_name, child)
+        elif "difference" in rewrite:
+            check_rewrite(type_name, rewrite["difference"]["base"])
+            check_rewrite(type_name, rewrite["difference"]["subtract"])
+
+    for type_def in model["type_definitions"]:
+        metadata = (type_def["metadata"] or {}).get("relations", {})
+        for relation, rewrite in type_def["relations"].items():
+            check_rewrite(type_def["type"], rewrite)
+            for restriction in metadata[relation]["directly_related_user_types"]:
+                if restriction["type"] not in relations:
+                    raise ModelParseError(f"unknown type {restriction['type']!r}")
+                if "relation" in restriction and restriction["relation"] not in relations[restriction["type"]]:
+                    raise ModelParseError(
+                        f"type {restriction['type']!r} has no relation {restriction['relation']!r}")
+                if "condition" in restriction and restriction["condition"] not in conditions:
+                    raise ModelParseError(f"unknown condition {restriction['condition']!r}")
+
+
+def load_model(path) -> dict:
+    """Read and parse a .fga model file."""
+    with open(path, 'r') as file:
+        return parse_model(file.read())
@@ -4,20 +4,29 @@ OpenFGA client script to handle core OpenFGA communication operations.
 This script contains the core functions for:
 1. Reading the authorization model file
 2. Getting the project root path
-3. Initializing the authorization model
-4. Writing tuples to the authorization model
+3. Initializing the authorization model (compiled in-process, cached by content hash)
+4. Writing and deleting tuples
+5. Checking access, individually or in chunked batches
+6. Listing the documents a user can access (at once or streamed) and the
+   users of one or many documents
 
-All operations are performed asynchronously.
+All operations are performed asynchronously. Queries take an optional
+consistency preference (see consistency.py); HIGHER_CONSISTENCY skips the
+caches passed in and refreshes them with the result. Queries also take an
+optional context with the parameters of conditional relations (such as
+is_published for the published_only condition in model.fga); caches and
+coalesced requests are keyed on it.
 """
 
 import os
-import subprocess
-import re
+import asyncio
+import hashlib
+import json
+import time
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, Dict, FrozenSet, List, Optional, Set, Tuple
 from openfga_sdk import (
     OpenFgaClient,
-    ClientConfiguration,
     CreateStoreRequest)
 from openfga_sdk.client import ClientCheckRequest
 from openfga_sdk.client.models import (
@@ -25,11 +34,33 @@ from openfga_sdk.client.models import (
     ClientWriteRequest, 
     ClientBatchCheckItem,
     ClientBatchCheckRequest,
+    ClientExpandRequest,
     ClientListObjectsRequest)
+from openfga_sdk.exceptions import NotFoundException, ValidationException
 from openfga_sdk.models.fga_object import FgaObject
+from openfga_sdk.models.node import Node
+from openfga_sdk.models.relationship_condition import RelationshipCondition
 from openfga_sdk.client.models.list_users_request import ClientListUsersRequest
 from openfga_sdk.models.user_type_filter import UserTypeFilter
 
+from fga_example import metrics
+from fga_example.cache import DecisionCache, UsersetCache, context_key
+from fga_example.client_pool import get_client_factory
+from fga_example.consistency import HIGHER_CONSISTENCY, RecentWrites
+from fga_example.dsl import load_model
+from fga_example.singleflight import SingleFlight
+
+# OpenFGA rejects batch checks above OPENFGA_MAX_CHECKS_PER_BATCH_CHECK (50 by default)
+BATCH_CHECK_CHUNK_SIZE = 50
+BATCH_CHECK_CONCURRENCY = 10
+# Concurrent list users or expand requests of list_users_for_documents
+LIST_USERS_CONCURRENCY = 10
+# OpenFGA rejects writes above OPENFGA_MAX_TUPLES_PER_WRITE (100 by default);
+# use bulk_import.import_tuples for larger sets
+WRITE_CHUNK_SIZE = 100
+# Local cache of written model IDs, keyed by API URL, store and model hash
+MODEL_CACHE_FILE = ".fga_model_cache.json"
+
 
 
 
@@ -56,35 +87,70 @@ async def initialize_store(api_url=None, store_name="fga_store") -> str:
     Returns:
         store_id
     """
-    api_url = api_url or os.environ.get("OPENFGA_API_URL", "http://localhost:8080")
-    configuration = ClientConfiguration(
-        api_url=api_url,  # required
-    )
-    
     body = CreateStoreRequest(
         name = store_name,
     )
-    # Create a store
-    async with OpenFgaClient(configuration) as fga_client:
-        api_response = await fga_client.create_store(body)
+    # Create a store with the shared store-less client
+    fga_client = await get_client_factory().get(api_url)
+    api_response = await fga_client.create_store(body)
 
     store_id = api_response.id
     
     return store_id
 
 
-async def initialize_authorization_model(model_path=None, store_id=None, api_url=None):
+def model_content_hash(model: dict) -> str:
+    """
+    Hash a compiled authorization model.
+
+    The hash is taken over the JSON form rather than the file text, so
+    comment and whitespace edits to model.fga do not count as changes.
+    """
+    canonical = json.dumps(model, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _model_cache_path() -> Path:
+    return Path(os.environ.get("FGA_MODEL_CACHE", get_project_root() / MODEL_CACHE_FILE))
+
+
+def _load_model_cache(path: Path) -> Dict[str, str]:
+    try:
+        with open(path, 'r') as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_model_cache(path: Path, cache: Dict[str, str]) -> None:
+    # Write then rename, so a concurrent reader never sees a partial file
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w') as file:
+        json.dump(cache, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+async def initialize_authorization_model(model_path=None, store_id=None, api_url=None,
+                                         use_cache: bool = True):
     """
     Initialize the authorization model from a model.fga file asynchronously.
-    Uses the OpenFGA CLI 'fga model write' command to write the model directly.
+
+    The model is compiled to JSON in-process (fga_example.dsl) and written
+    through the SDK. Model IDs are cached locally (FGA_MODEL_CACHE, default
+    .fga_model_cache.json in the project root) by API URL, store and model
+    content hash, so an unchanged model is not written again.
     
     Args:
         model_path: Path to the model.fga file, defaults to the model.fga in the project
         store_id: Store ID
         api_url: API URL
+        use_cache: Reuse the cached model ID when the model has not changed
         
     Returns:
         str: Authorization model ID
+
+    Raises:
+        ModelParseError: If the model file is invalid
     """
     # If model_path is not provided, use the default path relative to project root
     if model_path is None:
@@ -99,35 +165,29 @@ async def initialize_authorization_model(model_path=None, store_id=None, api_url
     
     if api_url is None:
         api_url = os.environ.get("OPENFGA_API_URL", "http://localhost:8080")
-    
-    # Use the OpenFGA CLI to write the model directly
-    # Run 'fga model write' command to write the model directly
-    cmd = [
-        "fga", "model", "write",
-        "--store-id", store_id,
-        "--api-url", api_url,
-        "--file", model_path
-    ]
-    
-    print(f"Running command: {' '.join(cmd)}")
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        check=True
-    )
-    
-    # Extract the authorization model ID from the output
-    output = result.stdout
-    
-    # Try to parse the authorization model ID from the output
-    match = re.search(r'([0-9A-Z]{26})', output)
-    if match:
-        auth_model_id = match.group(1)
-    else:
-        auth_model_id = None 
-    
-    print(f"Successfully wrote authorization model with ID: {auth_model_id}")
+
+    model = load_model(model_path)
+    cache_path = _model_cache_path()
+    cache = _load_model_cache(cache_path) if use_cache else {}
+    cache_key = f"{api_url}|{store_id}|{model_content_hash(model)}"
+    fga_client = await get_client_factory().get(api_url, store_id)
+
+    auth_model_id = cache.get(cache_key)
+    if auth_model_id is not None:
+        try:
+            # The store may have been recreated since; make sure the model still exists
+            await fga_client.read_authorization_model({"authorization_model_id": auth_model_id})
+            print(f"Authorization model unchanged, reusing ID: {auth_model_id}")
+        except (NotFoundException, ValidationException):
+            auth_model_id = None
+
+    if auth_model_id is None:
+        response = await fga_client.write_authorization_model(model)
+        auth_model_id = response.authorization_model_id
+        print(f"Successfully wrote authorization model with ID: {auth_model_id}")
+        if use_cache:
+            cache[cache_key] = auth_model_id
+            _save_model_cache(cache_path, cache)
     
     print(f"Add the following to your .env file:")
     print(f"FGA_STORE_ID={store_id}")
@@ -135,7 +195,23 @@ async def initialize_authorization_model(model_path=None, store_id=None, api_url
     return auth_model_id
 
 
-async def check_access(client: OpenFgaClient, user: str, relation: str, object: str) -> bool:
+def _flight_key(client: OpenFgaClient, *parts) -> tuple:
+    """Identify a request for SingleFlight, including the store and model it targets."""
+    return (client.get_store_id(), client.get_authorization_model_id()) + parts
+
+
+def _query_options(consistency: Optional[str], **options) -> Optional[dict]:
+    """SDK options for a query, with the consistency preference if one is given."""
+    if consistency is not None:
+        options["consistency"] = consistency
+    return options or None
+
+
+async def check_access(client: OpenFgaClient, user: str, relation: str, object: str,
+                       cache: Optional[DecisionCache] = None,
+                       inflight: Optional[SingleFlight] = None,
+                       consistency: Optional[str] = None,
+                       context: Optional[dict] = None) -> bool:
     """
     Check if a user has a specific relation to an object.
     
@@ -144,24 +220,184 @@ async def check_access(client: OpenFgaClient, user: str, relation: str, object:
         user: The user to check
         relation: The relation to check (e.g., "viewer", "editor")
         object: The object to check against (e.g., "document:1")
+        cache: Optional DecisionCache consulted before calling the server
+        inflight: Optional SingleFlight shared by concurrent identical checks
+        consistency: Optional consistency preference; HIGHER_CONSISTENCY skips
+            the cache and inflight
+        context: Optional parameters for conditional relations
     """
-    raise NotImplementedError
+    fga_user = f"user:{user}"
+    strong = consistency == HIGHER_CONSISTENCY
+    if cache is not None:
+        key = cache.make_key(client.get_authorization_model_id(), fga_user, relation, object, context)
+        allowed = None if strong else cache.get(key)
+        if allowed is not None:
+            return allowed
 
-async def batch_check_access(client: OpenFgaClient, checks: List[dict]) -> List[bool]:
+    body = ClientCheckRequest(
+        user=fga_user,
+        relation=relation,
+        object=object,
+        context=context,
+    )
+    options = _query_options(consistency)
+    if inflight is not None and not strong:
+        response = await inflight.do(
+            _flight_key(client, "check", fga_user, relation, object, consistency, context_key(context)),
+            lambda: metrics.timed("check", relation, client.check(body, options)))
+    else:
+        response = await metrics.timed("check", relation, client.check(body, options))
+    metrics.record_decisions("check", relation, int(response.allowed), int(not response.allowed))
+
+    if cache is not None:
+        cache.set(key, response.allowed)
+    return response.allowed
+
+async def _batch_check_chunk(client: OpenFgaClient, items: List[ClientBatchCheckItem],
+                            consistency: Optional[str] = None) -> List[tuple]:
+    """Send one server-sized batch check and return (correlation_id, allowed) pairs."""
+    # The chunk is already server-sized, so stop the SDK from splitting it again
+    options = _query_options(consistency, max_batch_size=len(items), max_parallel_requests=1)
+    relation = _batch_relation(items) if metrics.is_enabled() else ""
+    metrics.record_batch_size("batch_check", relation, len(items))
+    response = await metrics.timed("batch_check", relation,
+                                   client.batch_check(ClientBatchCheckRequest(checks=items), options))
+
+    results = []
+    for result in response.result:
+        if result.error is not None:
+            raise RuntimeError(f"Batch check failed for {result.request}: {result.error}")
+        results.append((result.correlation_id, result.allowed))
+    allowed = sum(1 for _, is_allowed in results if is_allowed)
+    metrics.record_decisions("batch_check", relation, allowed, len(results) - allowed)
+    return results
+
+def _batch_relation(items: List[ClientBatchCheckItem]) -> str:
+    """Metrics label for a batch: its relation, or "mixed" if it checks several."""
+    relations = {item.relation for item in items}
+    return relations.pop() if len(relations) == 1 else "mixed"
+
+
+async def iter_batch_check_access(client: OpenFgaClient, checks: List[dict],
+                                  cache: Optional[DecisionCache] = None,
+                                  chunk_size: int = BATCH_CHECK_CHUNK_SIZE,
+                                  max_concurrency: int = BATCH_CHECK_CONCURRENCY,
+                                  consistency: Optional[str] = None
+                                  ) -> AsyncIterator[Tuple[int, bool]]:
+    """
+    Perform batch access checks, yielding results as each chunk completes.
+    
+    Identical checks (same context included) are sent once, and the unique
+    checks are split into chunks of at most chunk_size items that run with
+    at most max_concurrency requests in flight. Checks with different
+    contexts share chunks. Cached decisions are yielded first.
+    
+    Args:
+        client: OpenFgaClient instance
+        checks: List of dicts with user, relation, object keys, and an optional
+            context key with the parameters of conditional relations
+        cache: Optional DecisionCache; only cache misses are sent to the server
+        chunk_size: Maximum number of checks per server request
+        max_concurrency: Maximum number of chunks in flight at once
+        consistency: Optional consistency preference; HIGHER_CONSISTENCY skips
+            cache lookups
+        
+    Yields:
+        (index, allowed) tuples, where index is the position in checks
+    """
+    if chunk_size <= 0 or max_concurrency <= 0:
+        raise ValueError("chunk_size and max_concurrency must be positive integers")
+
+    model_id = client.get_authorization_model_id()
+    # Map each distinct (user, relation, object, context) to the input positions asking it
+    positions: Dict[tuple, List[int]] = {}
+    contexts: Dict[Optional[str], Optional[dict]] = {}
+    for i, check in enumerate(checks):
+        context = check.get("context")
+        contexts.setdefault(context_key(context), context)
+        key = (f"user:{check['user']}", check["relation"], check["object"], context_key(context))
+        positions.setdefault(key, []).append(i)
+
+    items = []
+    keys = []
+    for key, indexes in positions.items():
+        user, relation, object, context = key[0], key[1], key[2], contexts[key[3]]
+        if cache is not None and consistency != HIGHER_CONSISTENCY:
+            allowed = cache.get(cache.make_key(model_id, user, relation, object, context))
+            if allowed is not None:
+                for i in indexes:
+                    yield i, allowed
+                continue
+        items.append(ClientBatchCheckItem(
+            user=user,
+            relation=relation,
+            object=object,
+            correlation_id=str(len(items)),
+            context=context))
+        keys.append(key)
+
+    if not items:
+        return
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_chunk(chunk):
+        async with semaphore:
+            return await _batch_check_chunk(client, chunk, consistency)
+
+    tasks = [asyncio.ensure_future(run_chunk(items[start:start + chunk_size]))
+             for start in range(0, len(items), chunk_size)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            for correlation_id, allowed in await next_done:
+                item = items[int(correlation_id)]
+                key = keys[int(correlation_id)]
+                if cache is not None:
+                    cache.set(cache.make_key(model_id, item.user, item.relation, item.object, item.context),
+                              allowed)
+                for i in positions[key]:
+                    yield i, allowed
+    finally:
+        # Stop outstanding chunks if the consumer stops early or a chunk fails
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def batch_check_access(client: OpenFgaClient, checks: List[dict],
+                             cache: Optional[DecisionCache] = None,
+                             chunk_size: int = BATCH_CHECK_CHUNK_SIZE,
+                             max_concurrency: int = BATCH_CHECK_CONCURRENCY,
+                             consistency: Optional[str] = None) -> List[bool]:
     """
     Perform batch access checks asynchronously.
     
     Args:
         client: OpenFgaClient instance
-        checks: List of dicts with user, relation, object keys
+        checks: List of dicts with user, relation, object keys, and an optional
+            context key with the parameters of conditional relations
+        cache: Optional DecisionCache; only cache misses are sent to the server
+        chunk_size: Maximum number of checks per server request
+        max_concurrency: Maximum number of chunks in flight at once
+        consistency: Optional consistency preference; HIGHER_CONSISTENCY skips
+            cache lookups
         
     Returns:
-        List of booleans indicating access results
+        List of booleans indicating access results, in the order of checks
     """
-    raise NotImplementedError
+    results = [False] * len(checks)
+    async for i, allowed in iter_batch_check_access(client, checks, cache=cache,
+                                                    chunk_size=chunk_size,
+                                                    max_concurrency=max_concurrency,
+                                                    consistency=consistency):
+        results[i] = allowed
+    return results
 
 
-async def list_documents_for_user(client: OpenFgaClient, user: str, relation: str = "reader") -> List[str]:
+async def list_documents_for_user(client: OpenFgaClient, user: str, relation: str = "reader",
+                                  inflight: Optional[SingleFlight] = None,
+                                  consistency: Optional[str] = None,
+                                  context: Optional[dict] = None) -> List[str]:
     """
     List all documents a user has a specific relation to asynchronously.
     
@@ -169,13 +405,75 @@ async def list_documents_for_user(client: OpenFgaClient, user: str, relation: st
         client: OpenFgaClient instance
         user: The user to check
         relation: The relation to check (default is "reader")
+        inflight: Optional SingleFlight shared by concurrent identical calls
+        consistency: Optional consistency preference; HIGHER_CONSISTENCY skips inflight
+        context: Optional parameters for conditional relations, applied to every document
         
     Returns:
         List of document IDs the user has the specified relation to
     """
-    raise NotImplementedError
+    body = ClientListObjectsRequest(
+        user=f"user:{user}",
+        relation=relation,
+        type="document",
+        context=context,
+    )
+    options = _query_options(consistency)
+    if inflight is not None and consistency != HIGHER_CONSISTENCY:
+        response = await inflight.do(
+            _flight_key(client, "list_objects", body.user, relation, body.type, consistency,
+                        context_key(context)),
+            lambda: metrics.timed("list_objects", relation, client.list_objects(body, options)))
+    else:
+        response = await metrics.timed("list_objects", relation, client.list_objects(body, options))
+
+    # Strip the "document:" prefix to return plain document IDs
+    return [obj.split(":", 1)[1] for obj in response.objects]
 
-async def list_users_for_document(client: OpenFgaClient, document_id: str, relation: str = "reader") -> List[str]:
+async def iter_documents_for_user(client: OpenFgaClient, user: str, relation: str = "reader",
+                                  consistency: Optional[str] = None,
+                                  context: Optional[dict] = None) -> AsyncIterator[str]:
+    """
+    Stream the documents a user has a specific relation to.
+    
+    Built on the streamed list objects endpoint: document IDs are yielded as
+    the server finds them, in no particular order, and nothing is buffered.
+    Closing the generator early (aclose(), or dropping it after breaking out
+    of the ``async for``) closes the stream, so the server stops evaluating.
+    
+    Args:
+        client: OpenFgaClient instance
+        user: The user to check
+        relation: The relation to check (default is "reader")
+        consistency: Optional consistency preference
+        context: Optional parameters for conditional relations, applied to every document
+        
+    Yields:
+        Document IDs the user has the specified relation to
+    """
+    body = ClientListObjectsRequest(
+        user=f"user:{user}",
+        relation=relation,
+        type="document",
+        context=context,
+    )
+    stream = client.streamed_list_objects(body, _query_options(consistency))
+    started = time.perf_counter()
+    failed = False
+    try:
+        async for response in stream:
+            yield response.object.split(":", 1)[1]
+    except Exception:
+        failed = True
+        raise
+    finally:
+        await stream.aclose()
+        metrics.record_duration("streamed_list_objects", relation, time.perf_counter() - started, failed)
+
+async def list_users_for_document(client: OpenFgaClient, document_id: str, relation: str = "reader",
+                                  inflight: Optional[SingleFlight] = None,
+                                  consistency: Optional[str] = None,
+                                  context: Optional[dict] = None) -> List[str]:
     """
     List all users who have a specific relation to a document asynchronously.
     
@@ -183,34 +481,262 @@ async def list_users_for_document(client: OpenFgaClient, document_id: str, relat
         client: OpenFgaClient instance
         document_id: The document ID to check
         relation: The relation to check (default is "reader")
+        inflight: Optional SingleFlight shared by concurrent identical calls
+        consistency: Optional consistency preference; HIGHER_CONSISTENCY skips inflight
+        context: Optional parameters for conditional relations
         
     Returns:
         List of user IDs who have the specified relation to the document
     """
-    raise NotImplementedError 
+    body = ClientListUsersRequest(
+        object=FgaObject(type="document", id=document_id),
+        relation=relation,
+        user_filters=[UserTypeFilter(type="user")],
+        context=context,
+    )
+    options = _query_options(consistency)
+    if inflight is not None and consistency != HIGHER_CONSISTENCY:
+        response = await inflight.do(
+            _flight_key(client, "list_users", document_id, relation, "user", consistency,
+                        context_key(context)),
+            lambda: metrics.timed("list_users", relation, client.list_users(body, options)))
+    else:
+        response = await metrics.timed("list_users", relation, client.list_users(body, options))
+
+    # Extract just the user IDs from the user objects (remove the "user:" prefix)
+    return [user.object.id for user in response.users if user.object is not None]
+
+
+class _UsersetExpander:
+    """
+    Resolves usersets to their users with Expand, one level per request.
+
+    Each distinct userset ("folder:1#reader", "editors:team1#member") is
+    expanded at most once per expander, and resolved memberships are shared
+    across expanders through a UsersetCache. A cycle in the tuples is cut
+    where it closes; memberships resolved through a cut are not cached.
+    """
+
+    def __init__(self, client: OpenFgaClient, cache: UsersetCache, semaphore: asyncio.Semaphore,
+                 user_type: str = "user"):
+        self.client = client
+        self.cache = cache
+        self.semaphore = semaphore
+        self.prefix = f"{user_type}:"
+        self.model_id = client.get_authorization_model_id()
+        self._trees: Dict[str, asyncio.Task] = {}
+
+    async def _expand(self, userset: str) -> Node:
+        obj, relation = userset.rsplit("#", 1)
+        async with self.semaphore:
+            response = await metrics.timed("expand", relation, self.client.expand(
+                ClientExpandRequest(relation=relation, object=obj)))
+        return response.tree.root
+
+    async def resolve(self, userset: str, path: FrozenSet[str] = frozenset()) -> Tuple[Set[str], bool]:
+        """Return (user IDs of userset, whether the answer is complete)."""
+        key = self.cache.make_key(self.model_id, userset)
+        members = self.cache.get(key)
+        if members is not None:
+            return set(members), True
+        if userset in path:
+            return set(), False
+
+        task = self._trees.get(userset)
+        if task is None:
+            task = self._trees[userset] = asyncio.ensure_future(self._expand(userset))
+        users, complete = await self._node(await task, path | {userset})
+        if complete:
+            self.cache.set(key, users)
+        return users, complete
+
+    async def _union(self, usersets: List[str], path: FrozenSet[str]) -> Tuple[Set[str], bool]:
+        results = await asyncio.gather(*(self.resolve(userset, path) for userset in usersets))
+        return set().union(*(users for users, _ in results)), all(complete for _, complete in results)
+
+    async def _node(self, node: Node, path: FrozenSet[str]) -> Tuple[Set[str], bool]:
+        if node.leaf is not None:
+            leaf = node.leaf
+            if leaf.users is not None:
+                # Direct subjects: users (wildcards cannot be listed) and usersets to resolve
+                users = {subject[len(self.prefix):] for subject in leaf.users.users
+                         if subject.startswith(self.prefix) and "#" not in subject
+                         and subject != self.prefix + "*"}
+                nested, complete = await self._union(
+                    [subject for subject in leaf.users.users if "#" in subject], path)
+                return users | nested, complete
+            if leaf.computed is not None:
+                return await self.resolve(leaf.computed.userset, path)
+            if leaf.tuple_to_userset is not None:
+                return await self._union([computed.userset for computed in leaf.tuple_to_userset.computed],
+                                         path)
+            return set(), True
+        if node.union is not None or node.intersection is not None:
+            children = (node.union or node.intersection).nodes
+            results = await asyncio.gather(*(self._node(child, path) for child in children))
+            sets = [users for users, _ in results]
+            if node.union is not None:
+                users = set().union(*sets)
+            else:
+                users = set.intersection(*sets) if sets else set()
+            return users, all(complete for _, complete in results)
+        if node.difference is not None:
+            (base, base_complete), (subtract, subtract_complete) = await asyncio.gather(
+                self._node(node.difference.base, path), self._node(node.difference.subtract, path))
+            return base - subtract, base_complete and subtract_complete
+        return set(), True
+
+
+async def list_users_for_documents(client: OpenFgaClient, document_ids: List[str],
+                                   relation: str = "reader",
+                                   userset_cache: Optional[UsersetCache] = None,
+                                   inflight: Optional[SingleFlight] = None,
+                                   max_concurrency: int = LIST_USERS_CONCURRENCY,
+                                   consistency: Optional[str] = None,
+                                   context: Optional[dict] = None) -> Dict[str, List[str]]:
+    """
+    List the users who have a relation to each of many documents asynchronously.
+
+    Without a userset_cache, one list users request is sent per document,
+    at most max_concurrency at a time. With one, documents are resolved
+    with Expand instead: every distinct userset (a folder's readers, a
+    team's members) is expanded once and its members are cached, so
+    documents sharing folders and teams cost few requests, and later calls
+    within the cache TTL fewer still. Expand does not evaluate conditions,
+    so conditional grants (the published_only folder readers in model.fga)
+    are reported as if unconditional; with a context, documents are always
+    resolved with list users, which evaluates it.
+
+    Args:
+        client: OpenFgaClient instance
+        document_ids: The document IDs to list users for
+        relation: The relation to check (default is "reader")
+        userset_cache: Optional UsersetCache; enables resolution by Expand
+        inflight: Optional SingleFlight shared by concurrent identical list users calls
+        max_concurrency: Maximum number of requests in flight at once
+        consistency: Optional consistency preference; HIGHER_CONSISTENCY
+            skips the userset cache and sends list users requests
+        context: Optional parameters for conditional relations, applied to every document
+
+    Returns:
+        Dict mapping each document ID to the sorted IDs of its users
+    """
+    if max_concurrency <= 0:
+        raise ValueError("max_concurrency must be a positive integer")
+    document_ids = list(dict.fromkeys(document_ids))
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    if userset_cache is None or consistency == HIGHER_CONSISTENCY or context:
+        async def list_one(document_id: str) -> List[str]:
+            async with semaphore:
+                return await list_users_for_document(client, document_id, relation, inflight=inflight,
+                                                     consistency=consistency, context=context)
+
+        results = await asyncio.gather(*(list_one(document_id) for document_id in document_ids))
+        return {document_id: sorted(users) for document_id, users in zip(document_ids, results)}
+
+    expander = _UsersetExpander(client, userset_cache, semaphore)
+    tasks = [asyncio.ensure_future(expander.resolve(f"document:{document_id}#{relation}"))
+             for document_id in document_ids]
+    try:
+        results = await asyncio.gather(*tasks)
+    finally:
+        # Stop outstanding expansions if one of them fails
+        pending = tasks + list(expander._trees.values())
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    return {document_id: sorted(users) for document_id, (users, _) in zip(document_ids, results)}
+
+def _relationship_condition(condition: Optional[dict]) -> Optional[RelationshipCondition]:
+    """SDK form of a tuple dict's condition entry."""
+    if condition is None:
+        return None
+    return RelationshipCondition(name=condition["name"], context=condition.get("context"))
 
-async def write_tuples(client: OpenFgaClient, to_write: List[dict]):
+
+async def write_tuples(client: OpenFgaClient, to_write: List[dict],
+                       cache: Optional[DecisionCache] = None,
+                       recent_writes: Optional[RecentWrites] = None,
+                       userset_cache: Optional[UsersetCache] = None) -> RecentWrites:
     """
-    Write a tuple to the authorization model asynchronously.
+    Write tuples to the authorization model asynchronously, in one transaction.
     
     Args:
         client: OpenFgaClient instance
-        to_write: List of dicts with user, relation, object keys
+        to_write: List of dicts with user, relation, object keys and an optional
+            condition ({"name": ..., "context": {...}}), at most WRITE_CHUNK_SIZE of them
+        cache: Optional DecisionCache to invalidate for the written tuples
+        recent_writes: Session marker to record the write in; a new one is
+            created if not given
+        userset_cache: Optional UsersetCache to flush
         
     Returns:
-        The write response
+        The RecentWrites marker; pass it to later reads for read-your-writes
     """
     # Create the tuple key
     _tuples = [ClientTuple(user=t["user"],
                            relation=t["relation"],
-                           object=t["object"])
+                           object=t["object"],
+                           condition=_relationship_condition(t.get("condition")))
                 for t in to_write]
  
     options = { "authorization_model_id": client.get_authorization_model_id()}
     
     # Use the client directly - the SDK handles session management internally
-    write_response = await client.write(
+    metrics.record_batch_size("write", "", len(_tuples))
+    await metrics.timed("write", "", client.write(
         ClientWriteRequest(writes=_tuples), options
-    )
+    ))
+
+    if cache is not None:
+        cache.invalidate_tuples(to_write)
+    if userset_cache is not None:
+        userset_cache.invalidate_tuples(to_write)
+
+    if recent_writes is None:
+        recent_writes = RecentWrites()
+    recent_writes.record(to_write)
+    return recent_writes
+
+
+async def delete_tuples(client: OpenFgaClient, to_delete: List[dict],
+                        cache: Optional[DecisionCache] = None,
+                        recent_writes: Optional[RecentWrites] = None,
+                        userset_cache: Optional[UsersetCache] = None) -> RecentWrites:
+    """
+    Delete tuples from the store asynchronously, in one transaction.
+    
+    Args:
+        client: OpenFgaClient instance
+        to_delete: List of dicts with user, relation, object keys, at most
+            WRITE_CHUNK_SIZE of them
+        cache: Optional DecisionCache to invalidate for the deleted tuples
+        recent_writes: Session marker to record the delete in; a new one is
+            created if not given
+        userset_cache: Optional UsersetCache to flush
+        
+    Returns:
+        The RecentWrites marker; pass it to later reads for read-your-writes
+    """
+    _tuples = [ClientTuple(user=t["user"],
+                           relation=t["relation"],
+                           object=t["object"])
+                for t in to_delete]
+
+    options = { "authorization_model_id": client.get_authorization_model_id()}
+
+    metrics.record_batch_size("delete", "", len(_tuples))
+    await metrics.timed("delete", "", client.write(
+        ClientWriteRequest(deletes=_tuples), options
+    ))
+
+    if cache is not None:
+        cache.invalidate_tuples(to_delete)
+    if userset_cache is not None:
+        userset_cache.invalidate_tuples(to_delete)
 
-    return write_response
\ No newline at end of file
+    if recent_writes is None:
+        recent_writes = RecentWrites()
+    recent_writes.record(to_delete)
+    return recent_writes
@@ -3,50 +3,72 @@ OpenFGA initialization script for project setup.
 
 This script contains functions for initializing an OpenFGA project:
 1. Project initialization with store creation, model setup, and sample data
+2. Reconciling an existing store instead, writing and deleting only the difference
 
 All operations are performed asynchronously.
 """
 
 import os
 import asyncio
-import json
-from openfga_sdk import OpenFgaClient, ClientConfiguration
-
+from .bulk_import import import_tuples, iter_tuples
+from .client_pool import close_fga_clients, get_client_factory
 from .fga_client import (
     get_project_root, 
     initialize_store, 
-    initialize_authorization_model, 
-    write_tuples
+    initialize_authorization_model
 )
+from .reconcile import reconcile_project
+
+STORE_NAME = "Nice model store 123"
+
 
+def _tuples_path():
+    # sample_tuples.json, or FGA_TUPLES_FILE (JSON or JSONL, streamed)
+    return os.environ.get(
+        "FGA_TUPLES_FILE", get_project_root() / "fga_example" / "sample_tuples.json")
 
-async def project_init():
-    """Set up the project with a new store, authorization model and example tuples."""
+
+async def project_init(reconcile: bool = False, store_name: str = STORE_NAME,
+                       store_id: str = None, delete: bool = True):
+    """
+    Set up the project with a store, authorization model and example tuples.
+
+    Args:
+        reconcile: Reuse the existing store (found by store_id or store_name)
+            and write or delete only what differs, instead of creating a new store
+        store_name: Name of the store
+        store_id: ID of an existing store to reconcile
+        delete: When reconciling, delete tuples missing from the tuple file
+    """
     api_url = os.environ.get("OPENFGA_API_URL", "http://localhost:8080")
+
+    if reconcile:
+        try:
+            result = await reconcile_project(iter_tuples(_tuples_path()), store_name, store_id=store_id,
+                                             api_url=api_url, delete=delete)
+        finally:
+            await close_fga_clients()
+        print(f"{result.written} tuples written, {result.deleted} deleted, {result.unchanged} unchanged")
+        print(f"Add the following to your .env file:")
+        print(f"FGA_STORE_ID={result.store_id}")
+        print(f"FGA_MODEL_ID={result.authorization_model_id}")
+        return
     
     # Step 1: Initialize store
-    store_id = await initialize_store(api_url=api_url, store_name="Nice model store 123")
+    store_id = await initialize_store(api_url=api_url, store_name=store_name)
     print(f"Store initialized with ID: {store_id}")
     
     # Step 2: Initialize authorization model
     auth_model_id = await initialize_authorization_model(store_id=store_id, api_url=api_url)
     print(f"Authorization model initialized with ID: {auth_model_id}")
     
-    client = OpenFgaClient(ClientConfiguration(api_url=api_url, store_id=store_id, authorization_model_id=auth_model_id))
+    client = await get_client_factory().get(api_url, store_id, auth_model_id)
     # Step 3: Add tuples
-    # Read tuples from the sample_tuples.json file
-    sample_tuples_path = get_project_root() / "fga_example" / "sample_tuples.json"
-    with open(sample_tuples_path, 'r') as file:
-        sample_tuples = json.load(file) 
-
-    write_response = await write_tuples(
-        client=client,
-        to_write=sample_tuples
-    )
+    await import_tuples(client, iter_tuples(_tuples_path()))
     
     print("All operations completed successfully!")
 
-    await client.close()  # Close the client session when done
+    await close_fga_clients()  # Close the pooled client sessions when done
 
 
 def main():
@@ -0,0 +1,215 @@
+"""
+Folding of document checks into checks on their parent folders.
+
+In model.fga a document's reader and writer relations come entirely from
+its parent folder (``reader from parent``, ``editor from parent``), so
+checking 1,000 documents of one folder asks the same question 1,000 times.
+
+This module contains:
+1. foldable_relations: finds the relations of a type defined only by
+   ``<relation> from <parent>``, read from the compiled model
+2. HierarchyResolver: learns document-to-folder edges (kept in a bounded
+   local cache, loaded from the documents table's folder_id column) and
+   authorizes documents with one check per distinct folder
+
+Relations that need the document's own tuples, like ``owner`` (``[user]
+and editor from parent``), are never folded and are checked per document.
+
+The folder_id column must hold the document's only parent, or NULL when
+the document has no parent or several (the model allows more than one), in
+which case the document is checked individually. Parent tuples written or
+deleted through AuthorizedDocumentService.write_tuples and delete_tuples
+re-derive the column from OpenFGA and forget() the cached edges; parent
+tuples written any other way need the same by hand.
+
+Checks may carry a per-document context (the document's publication status
+for the conditional folder readers in model.fga). The folder check is made
+with the document's context, so documents are folded per (folder, context):
+a folder holding published and unpublished documents costs two checks.
+"""
+
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from openfga_sdk import OpenFgaClient
+
+from fga_example.cache import DecisionCache, context_key
+from fga_example.dsl import load_model
+from fga_example.fga_client import batch_check_access, get_project_root
+
+# (parent type, relation on the parent)
+ParentRelation = Tuple[str, str]
+
+
+def foldable_relations(model: dict, object_type: str = "document") -> Dict[str, ParentRelation]:
+    """
+    Find the relations of object_type that are fully decided by a single parent.
+
+    A relation is foldable when its rewrite is exactly ``<relation> from
+    <tupleset>`` and the tupleset relation is directly assignable to a
+    single object type only (no usersets, wildcards or conditions).
+
+    Args:
+        model: Compiled authorization model (dsl.load_model)
+        object_type: Type whose relations to inspect
+
+    Returns:
+        Dict mapping each foldable relation to (parent type, parent relation)
+    """
+    types = {type_def["type"]: type_def for type_def in model["type_definitions"]}
+    type_def = types.get(object_type)
+    if type_def is None:
+        return {}
+    relations = type_def.get("relations") or {}
+    metadata = (type_def.get("metadata") or {}).get("relations") or {}
+
+    foldable = {}
+    for relation, rewrite in relations.items():
+        if set(rewrite) != {"tupleToUserset"}:
+            continue
+        tupleset = rewrite["tupleToUserset"]["tupleset"]["relation"]
+        computed = rewrite["tupleToUserset"]["computedUserset"]["relation"]
+        if set(relations.get(tupleset, {})) != {"this"}:
+            continue
+        allowed = metadata.get(tupleset, {}).get("directly_related_user_types") or []
+        if len(allowed) != 1 or set(allowed[0]) != {"type"}:
+            continue
+        parent_type = allowed[0]["type"]
+        if computed in (types.get(parent_type, {}).get("relations") or {}):
+            foldable[relation] = (parent_type, computed)
+    return foldable
+
+
+class HierarchyResolver:
+    """
+    Authorizes documents through their parent folders where the model allows it.
+
+    Parent edges are kept in an LRU cache of at most max_edges documents;
+    missing ones are read with the load_parents callable passed to authorize.
+    """
+
+    def __init__(self, model: dict, object_type: str = "document", max_edges: int = 100000):
+        """
+        Initialize the resolver.
+
+        Args:
+            model: Compiled authorization model (dsl.load_model)
+            object_type: Type of the objects being authorized
+            max_edges: Maximum number of document-to-folder edges kept
+        """
+        if max_edges <= 0:
+            raise ValueError("max_edges must be a positive integer")
+        self.object_type = object_type
+        self.foldable = foldable_relations(model, object_type)
+        self.max_edges = max_edges
+        self._parents: "OrderedDict[int, Optional[int]]" = OrderedDict()
+
+        self.folded = 0
+        self.parent_checks = 0
+        self.direct_checks = 0
+
+    @classmethod
+    def from_model_file(cls, model_path=None, **kwargs) -> "HierarchyResolver":
+        """Build a resolver for model.fga (the project's model by default)."""
+        if model_path is None:
+            model_path = get_project_root() / "fga_example" / "model.fga"
+        return cls(load_model(model_path), **kwargs)
+
+    def can_fold(self, relation: str) -> bool:
+        return relation in self.foldable
+
+    def learn(self, parents: Dict[int, Optional[int]]) -> None:
+        """Record document-to-folder edges; None means the document has no known folder."""
+        for document_id, folder_id in parents.items():
+            self._parents[document_id] = folder_id
+            self._parents.move_to_end(document_id)
+        while len(self._parents) > self.max_edges:
+            self._parents.popitem(last=False)
+
+    def forget(self, document_ids: Iterable[int]) -> None:
+        """Drop the edges of documents that moved to another folder."""
+        for document_id in document_ids:
+            self._parents.pop(document_id, None)
+
+    async def _parents_of(self, document_ids: List[int],
+                          load_parents: Callable[[List[int]], Awaitable[Dict[int, Optional[int]]]]
+                          ) -> Dict[int, Optional[int]]:
+        missing = [document_id for document_id in document_ids if document_id not in self._parents]
+        if missing:
+            loaded = await load_parents(missing)
+            # Unknown documents have no folder to fold on
+            self.learn({document_id: loaded.get(document_id) for document_id in missing})
+        return {document_id: self._parents.get(document_id) for document_id in document_ids}
+
+    async def authorize(self, client: OpenFgaClient, user_id: str, relation: str, document_ids: List[int],
+                        load_parents: Callable[[List[int]], Awaitable[Dict[int, Optional[int]]]],
+                        cache: Optional[DecisionCache] = None,
+                        consistency: Optional[str] = None,
+                        contexts: Optional[Dict[int, dict]] = None) -> Set[int]:
+        """
+        Return the documents the user holds a foldable relation on.
+
+        Documents with a known folder are answered by one check on the
+        folder per distinct context; the others are checked individually,
+        in the same batch.
+
+        Args:
+            client: OpenFgaClient instance
+            user_id: The user to check
+            relation: A relation for which can_fold() is True
+            document_ids: IDs of the documents to authorize
+            load_parents: Async callable returning {document_id: folder_id} for IDs
+                missing from the edge cache
+            cache: Optional DecisionCache shared with the other checks
+            consistency: Optional consistency preference for the checks
+            contexts: Optional {document_id: check context} for conditional relations
+
+        Returns:
+            The set of allowed document IDs
+        """
+        parent_type, parent_relation = self.foldable[relation]
+        parents = await self._parents_of(document_ids, load_parents)
+        contexts = contexts or {}
+
+        # (folder_id, context key) -> documents answered by that folder check
+        by_folder: Dict[Tuple[int, Optional[str]], List[int]] = {}
+        folder_contexts: Dict[Tuple[int, Optional[str]], Optional[dict]] = {}
+        direct: List[int] = []
+        for document_id, folder_id in parents.items():
+            if folder_id is None:
+                direct.append(document_id)
+            else:
+                context = contexts.get(document_id)
+                group = (folder_id, context_key(context))
+                by_folder.setdefault(group, []).append(document_id)
+                folder_contexts[group] = context
+
+        folders = list(by_folder)
+        checks = [{"user": user_id, "relation": parent_relation, "object": f"{parent_type}:{folder_id}",
+                   "context": folder_contexts[(folder_id, key)]}
+                  for folder_id, key in folders]
+        checks += [{"user": user_id, "relation": relation, "object": f"{self.object_type}:{document_id}",
+                    "context": contexts.get(document_id)}
+                   for document_id in direct]
+        results = await batch_check_access(client, checks, cache=cache, consistency=consistency)
+
+        self.parent_checks += len(folders)
+        self.direct_checks += len(direct)
+        self.folded += len(document_ids) - len(direct)
+
+        allowed = set()
+        for group, folder_allowed in zip(folders, results):
+            if folder_allowed:
+                allowed.update(by_folder[group])
+        allowed.update(document_id for document_id, is_allowed in zip(direct, results[len(folders):])
+                       if is_allowed)
+        return allowed
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many documents were folded and how many checks were sent."""
+        return {
+            "folded": self.folded,
+            "parent_checks": self.parent_checks,
+            "direct_checks": self.direct_checks,
+            "edges": len(self._parents),
+        }
@@ -0,0 +1,684 @@
+"""
+Embedded in-process OpenFGA evaluator.
+
+LocalFgaClient answers check, batch check, list objects (also streamed),
+list users and expand for a schema 1.1 model (parsed by dsl.py) and a set of tuples held in
+memory. It
+implements the subset of the OpenFGA SDK client used in this project and
+returns the same SDK response types, so every function in fga_client.py
+works unchanged against it:
+
+    client = LocalFgaClient.from_files()
+    await check_access(client, "anne_smith", "reader", "document:1")
+
+This is meant for tests, offline benchmarks and local runs without a
+Docker OpenFGA server. Conditional tuples are evaluated against the
+request context merged with the tuple's own context, only for tuples
+that would grant the checked user access; listings leave out tuples whose
+condition lacks parameters. Condition expressions may use the common
+subset of CEL (literals, parameters, comparisons, arithmetic, ``&&``,
+``||``, ``!`` and ``in``).
+"""
+
+import ast
+import hashlib
+import json
+import operator
+import re
+from functools import lru_cache
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from openfga_sdk.client.models import (
+    ClientBatchCheckRequest,
+    ClientBatchCheckResponse,
+    ClientBatchCheckSingleResponse,
+    ClientCheckRequest,
+    ClientExpandRequest,
+    ClientListObjectsRequest,
+    ClientReadChangesRequest,
+    ClientWriteRequest,
+    ClientWriteResponse,
+)
+from openfga_sdk.client.models.list_users_request import ClientListUsersRequest
+from openfga_sdk.exceptions import FgaValidationException
+from openfga_sdk.models.check_response import CheckResponse
+from openfga_sdk.models.computed import Computed
+from openfga_sdk.models.expand_response import ExpandResponse
+from openfga_sdk.models.fga_object import FgaObject
+from openfga_sdk.models.leaf import Leaf
+from openfga_sdk.models.list_objects_response import ListObjectsResponse
+from openfga_sdk.models.list_users_response import ListUsersResponse
+from openfga_sdk.models.node import Node
+from openfga_sdk.models.nodes import Nodes
+from openfga_sdk.models.read_changes_response import ReadChangesResponse
+from openfga_sdk.models.read_request_tuple_key import ReadRequestTupleKey
+from openfga_sdk.models.read_response import ReadResponse
+from openfga_sdk.models.relationship_condition import RelationshipCondition
+from openfga_sdk.models.streamed_list_objects_response import StreamedListObjectsResponse
+from openfga_sdk.models.tuple import Tuple as FgaTuple
+from openfga_sdk.models.tuple_change import TupleChange
+from openfga_sdk.models.tuple_key import TupleKey
+from openfga_sdk.models.tuple_operation import TupleOperation
+from openfga_sdk.models.typed_wildcard import TypedWildcard
+from openfga_sdk.models.user import User
+from openfga_sdk.models.users import Users
+from openfga_sdk.models.userset_tree import UsersetTree
+from openfga_sdk.models.userset_tree_difference import UsersetTreeDifference
+from openfga_sdk.models.userset_tree_tuple_to_userset import UsersetTreeTupleToUserset
+from openfga_sdk.models.userset_user import UsersetUser
+
+from fga_example.dsl import load_model
+from fga_example.fga_client import get_project_root
+
+# Object key for the tuple store: (object, relation) -> {user: condition}
+TupleIndex = Dict[Tuple[str, str], Dict[str, Optional[dict]]]
+
+
+def _type_of(subject: str) -> str:
+    return subject.split(":", 1)[0]
+
+
+# CEL tokens with a different Python spelling; string literals are matched so they pass through untouched
+_CEL_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|&&|\|\||!=|!|\b(?:true|false|null)\b')
+_CEL_SPELLING = {"&&": " and ", "||": " or ", "!=": "!=", "!": " not ",
+                 "true": "True", "false": "False", "null": "None"}
+
+_BINARY_OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+                     ast.Div: operator.truediv, ast.Mod: operator.mod}
+_COMPARISONS = {ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt, ast.LtE: operator.le,
+                ast.Gt: operator.gt, ast.GtE: operator.ge,
+                ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b}
+
+
+@lru_cache(maxsize=256)
+def _compile_condition(expression: str) -> ast.Expression:
+    """Parse a CEL condition expression into a Python AST evaluated by _evaluate."""
+    source = _CEL_TOKENS.sub(lambda m: _CEL_SPELLING.get(m.group(0), m.group(0)), expression)
+    try:
+        return ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise FgaValidationException(f"unsupported condition expression: {expression!r}") from e
+
+
+def _evaluate(node: ast.AST, params: dict):
+    """Evaluate a compiled condition; only the node types below are accepted."""
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body, params)
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        if node.id not in params:
+            raise FgaValidationException(f"undeclared condition parameter '{node.id}'")
+        return params[node.id]
+    if isinstance(node, ast.BoolOp):
+        if isinstance(node.op, ast.And):
+            return all(_evaluate(value, params) for value in node.values)
+        return any(_evaluate(value, params) for value in node.values)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+        value = _evaluate(node.operand, params)
+        return not value if isinstance(node.op, ast.Not) else -value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        return _BINARY_OPERATORS[type(node.op)](_evaluate(node.left, params), _evaluate(node.right, params))
+    if isinstance(node, ast.Compare) and all(type(op) in _COMPARISONS for op in node.ops):
+        left = _evaluate(node.left, params)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = _evaluate(comparator, params)
+            if not _COMPARISONS[type(op)](left, right):
+                return False
+            left = right
+        return True
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [_evaluate(item, params) for item in node.elts]
+    raise FgaValidationException(f"unsupported condition expression: {ast.dump(node)}")
+
+
+def _page(items: list, options: Optional[dict], default_size: int = 50) -> Tuple[list, str]:
+    """Slice items with the page_size/continuation_token options; tokens are offsets."""
+    options = options or {}
+    start = int(options.get("continuation_token") or 0)
+    size = int(options.get("page_size") or default_size)
+    page = items[start:start + size]
+    end = start + len(page)
+    return page, str(end) if end < len(items) else ""
+
+
+class _CheckMemo(dict):
+    """Finished check results of one evaluation, plus the keys still being evaluated."""
+
+    def __init__(self):
+        super().__init__()
+        self.in_progress: Set[tuple] = set()
+        # In-progress keys met again (cycles) by the evaluation under way
+        self.cycle_hits: Set[tuple] = set()
+
+
+class LocalFgaClient:
+    """In-memory stand-in for OpenFgaClient backed by a pure-Python evaluator."""
+
+    def __init__(self, model: dict, tuples: Iterable[dict] = (),
+                 store_id: str = "local", authorization_model_id: Optional[str] = None):
+        """
+        Initialize the evaluator.
+
+        Args:
+            model: Authorization model in JSON form (see dsl.parse_model)
+            tuples: Initial tuples as dicts with user, relation, object keys
+            store_id: Value returned by get_store_id()
+            authorization_model_id: Value returned by get_authorization_model_id();
+                defaults to an ID derived from the model contents
+        """
+        self.model = model
+        self._types = {t["type"]: t for t in model["type_definitions"]}
+        self._store_id = store_id
+        self._model_id = authorization_model_id or hashlib.sha256(
+            json.dumps(model, sort_keys=True).encode()).hexdigest()[:26].upper()
+
+        # Forward adjacency: (object, relation) -> {user: condition}
+        self._forward: TupleIndex = {}
+        # Reverse adjacency: (user, relation, object type) -> {objects}
+        self._reverse: Dict[Tuple[str, str, str], Set[str]] = {}
+        self._changes: List[TupleChange] = []
+        self._seed: Dict[tuple, Set[str]] = {}
+        self._cycle_hit = False
+
+        self._apply(list(tuples), [], validate=True)
+
+    @classmethod
+    def from_files(cls, model_path=None, tuples_path=None, **kwargs) -> "LocalFgaClient":
+        """
+        Build a client from a .fga model file and a JSON array of tuples.
+
+        Both default to the model.fga and sample_tuples.json shipped with the project.
+        """
+        package_dir = get_project_root() / "fga_example"
+        model = load_model(model_path or package_dir / "model.fga")
+        with open(tuples_path or package_dir / "sample_tuples.json", 'r') as file:
+            tuples = json.load(file)
+        return cls(model, tuples, **kwargs)
+
+    # SDK client surface
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        pass
+
+    def get_store_id(self):
+        return self._store_id
+
+    def set_store_id(self, value):
+        self._store_id = value
+
+    def get_authorization_model_id(self):
+        return self._model_id
+
+    def set_authorization_model_id(self, value):
+        self._model_id = value
+
+    async def check(self, body: ClientCheckRequest, options: Optional[dict] = None) -> CheckResponse:
+        return CheckResponse(allowed=self.check_sync(body.user, body.relation, body.object,
+                                                      body.context))
+
+    async def batch_check(self, body: ClientBatchCheckRequest,
+                          options: Optional[dict] = None) -> ClientBatchCheckResponse:
+        return ClientBatchCheckResponse([
+            ClientBatchCheckSingleResponse(
+                allowed=self.check_sync(item.user, item.relation, item.object, item.context),
+                request=item,
+                correlation_id=item.correlation_id,
+            )
+            for item in body.checks
+        ])
+
+    async def list_objects(self, body: ClientListObjectsRequest,
+                           options: Optional[dict] = None) -> ListObjectsResponse:
+        return ListObjectsResponse(objects=self.list_objects_sync(
+            body.user, body.relation, body.type, body.context))
+
+    async def streamed_list_objects(self, body: ClientListObjectsRequest,
+                                    options: Optional[dict] = None) -> AsyncIterator[StreamedListObjectsResponse]:
+        for obj in self.list_objects_sync(body.user, body.relation, body.type, body.context):
+            yield StreamedListObjectsResponse(object=obj)
+
+    async def list_users(self, body: ClientListUsersRequest,
+                         options: Optional[dict] = None) -> ListUsersResponse:
+        obj = f"{body.object.type}:{body.object.id}"
+        users = []
+        for user_filter in body.user_filters:
+            for subject in self.list_users_sync(obj, body.relation, user_filter.type,
+                                                user_filter.relation, body.context):
+                users.append(self._to_user(subject))
+        return ListUsersResponse(users=users)
+
+    async def expand(self, body: ClientExpandRequest, options: Optional[dict] = None) -> ExpandResponse:
+        rewrite = self._relations(_type_of(body.object)).get(body.relation)
+        if rewrite is None:
+            raise FgaValidationException(f"relation '{_type_of(body.object)}#{body.relation}' not found")
+        return ExpandResponse(tree=UsersetTree(root=self._expand_node(rewrite, body.object, body.relation)))
+
+    async def read(self, body: Optional[ReadRequestTupleKey] = None,
+                   options: Optional[dict] = None) -> ReadResponse:
+        if body is not None and body.object and body.object.endswith(":") and not body.user:
+            # Like the server: reading a whole type needs a user filter
+            raise FgaValidationException("the 'user' field is required when the 'object' field is a type only")
+        matches = []
+        for (obj, relation), users in self._forward.items():
+            if body is not None and body.object:
+                # "type:" alone matches every object of the type
+                if body.object.endswith(":") and not obj.startswith(body.object):
+                    continue
+                if not body.object.endswith(":") and obj != body.object:
+                    continue
+            if body is not None and body.relation and relation != body.relation:
+                continue
+            for user, condition in users.items():
+                if body is not None and body.user and user != body.user:
+                    continue
+                matches.append(FgaTuple(key=self._tuple_key(user, relation, obj, condition),
+                                        timestamp=datetime.now(timezone.utc)))
+        tuples, token = _page(matches, options)
+        return ReadResponse(tuples=tuples, continuation_token=token)
+
+    async def read_changes(self, body: ClientReadChangesRequest,
+                           options: Optional[dict] = None) -> ReadChangesResponse:
+        options = options or {}
+        start = int(options.get("continuation_token") or 0)
+        size = int(options.get("page_size") or 50)
+        changes = []
+        position = start
+        for change in self._changes[start:]:
+            if len(changes) == size:
+                break
+            position += 1
+            if body.type and _type_of(change.tuple_key.object) != body.type:
+                continue
+            changes.append(change)
+        return ReadChangesResponse(changes=changes, continuation_token=str(position))
+
+    async def write(self, body: ClientWriteRequest, options: Optional[dict] = None) -> ClientWriteResponse:
+        writes = [self._tuple_dict(t) for t in body.writes or []]
+        deletes = [self._tuple_dict(t) for t in body.deletes or []]
+        self._apply(writes, deletes, validate=True)
+        return ClientWriteResponse(writes=None, deletes=None)
+
+    # Evaluation
+
+    def check_sync(self, user: str, relation: str, obj: str, context: Optional[dict] = None) -> bool:
+        """Return True if user has relation on obj."""
+        if relation not in self._relations(_type_of(obj)):
+            raise FgaValidationException(f"relation '{_type_of(obj)}#{relation}' not found")
+        return self._check(user, relation, obj, context or {}, _CheckMemo())
+
+    def list_objects_sync(self, user: str, relation: str, type_name: str,
+                          context: Optional[dict] = None) -> List[str]:
+        """Return every object of type_name on which user has relation."""
+        if relation not in self._relations(type_name):
+            raise FgaValidationException(f"relation '{type_name}#{relation}' not found")
+        return sorted(self._fixed_point(lambda memo: self._objects(
+            user, relation, type_name, context or {}, memo)))
+
+    def list_users_sync(self, obj: str, relation: str, user_type: str,
+                        user_relation: Optional[str] = None, context: Optional[dict] = None) -> List[str]:
+        """
+        Return the subjects of type user_type with relation on obj.
+
+        Without user_relation these are objects ("user:anne") and typed
+        wildcards ("user:*"); with it, usersets ("editors:team1#member").
+        """
+        if relation not in self._relations(_type_of(obj)):
+            raise FgaValidationException(f"relation '{_type_of(obj)}#{relation}' not found")
+        subjects = self._fixed_point(lambda memo: self._users(
+            obj, relation, context or {}, memo))
+        if user_relation:
+            wanted = [s for s in subjects if "#" in s and _type_of(s) == user_type
+                      and s.split("#", 1)[1] == user_relation]
+        else:
+            wanted = [s for s in subjects if "#" not in s and _type_of(s) == user_type]
+        return sorted(wanted)
+
+    def _relations(self, type_name: str) -> dict:
+        type_def = self._types.get(type_name)
+        if type_def is None:
+            raise FgaValidationException(f"type '{type_name}' not found")
+        return type_def["relations"]
+
+    def _direct_types(self, type_name: str, relation: str) -> List[dict]:
+        metadata = self._types[type_name].get("metadata") or {}
+        return metadata.get("relations", {}).get(relation, {}).get("directly_related_user_types", [])
+
+    def _condition_ok(self, condition: Optional[dict], context: dict, listing: bool = False) -> bool:
+        """
+        Evaluate a tuple's condition against the request context.
+
+        Checks raise on missing parameters, as OpenFGA does for conditions on
+        the path it resolves; listings (listing=True) leave such tuples out.
+        """
+        if condition is None:
+            return True
+        name = condition["name"]
+        definition = (self.model.get("conditions") or {}).get(name)
+        if definition is None:
+            raise FgaValidationException(f"condition '{name}' not found")
+        # Values stored on the tuple take precedence over the request context
+        params = {**context, **(condition.get("context") or {})}
+        missing = sorted(set(definition.get("parameters") or {}) - set(params))
+        if missing:
+            if listing:
+                return False
+            raise FgaValidationException(
+                f"failed to evaluate relationship condition '{name}': "
+                f"context is missing parameters {missing}")
+        return bool(_evaluate(_compile_condition(definition["expression"]), params))
+
+    def _check(self, user: str, relation: str, obj: str, context: dict, memo: _CheckMemo) -> bool:
+        key = (user, relation, obj)
+        if key in memo:
+            return memo[key]
+        if key in memo.in_progress:
+            # A cycle resolves to False, as in OpenFGA
+            memo.cycle_hits.add(key)
+            return False
+        outer_hits, memo.cycle_hits = memo.cycle_hits, set()
+        memo.in_progress.add(key)
+        try:
+            rewrite = self._relations(_type_of(obj))[relation]
+            result = self._check_rewrite(rewrite, user, relation, obj, context, memo)
+        finally:
+            memo.in_progress.discard(key)
+            memo.cycle_hits.discard(key)
+            hits, memo.cycle_hits = memo.cycle_hits, outer_hits | memo.cycle_hits
+        # A result that saw a key still in progress further up may differ once that key is done
+        if not hits:
+            memo[key] = result
+        return result
+
+    def _check_rewrite(self, rewrite: dict, user: str, relation: str, obj: str,
+                       context: dict, memo: dict) -> bool:
+        if "this" in rewrite:
+            user_is_object = "#" not in user
+            # Conditions are only evaluated on tuples that would grant access, as in OpenFGA
+            for subject, condition in self._forward.get((obj, relation), {}).items():
+                if subject == user or (user_is_object and subject == f"{_type_of(user)}:*"):
+                    matched = True
+                elif "#" in subject:
+                    userset_obj, userset_relation = subject.split("#", 1)
+                    matched = self._check(user, userset_relation, userset_obj, context, memo)
+                else:
+                    matched = False
+                if matched and self._condition_ok(condition, context):
+                    return True
+            return False
+        if "computedUserset" in rewrite:
+            return self._check(user, rewrite["computedUserset"]["relation"], obj, context, memo)
+        if "tupleToUserset" in rewrite:
+            tupleset = rewrite["tupleToUserset"]["tupleset"]["relation"]
+            computed = rewrite["tupleToUserset"]["computedUserset"]["relation"]
+            for parent, condition in self._forward.get((obj, tupleset), {}).items():
+                if (computed in self._relations(_type_of(parent))
+                        and self._check(user, computed, parent, context, memo)
+                        and self._condition_ok(condition, context)):
+                    return True
+            return False
+        if "union" in rewrite:
+            return any(self._check_rewrite(child, user, relation, obj, context, memo)
+                       for child in rewrite["union"]["child"])
+        if "intersection" in rewrite:
+            return all(self._check_rewrite(child, user, relation, obj, context, memo)
+                       for child in rewrite["intersection"]["child"])
+        if "difference" in rewrite:
+            return (self._check_rewrite(rewrite["difference"]["base"], user, relation, obj, context, memo)
+                    and not self._check_rewrite(rewrite["difference"]["subtract"], user, relation,
+                                                obj, context, memo))
+        raise FgaValidationException(f"unsupported rewrite {rewrite}")
+
+    def _expand_node(self, rewrite: dict, obj: str, relation: str) -> Node:
+        """One level of the userset tree, as OpenFGA's Expand returns it (conditions are not evaluated)."""
+        name = f"{obj}#{relation}"
+        if "this" in rewrite:
+            return Node(name=name, leaf=Leaf(users=Users(users=sorted(self._forward.get((obj, relation), {})))))
+        if "computedUserset" in rewrite:
+            computed = rewrite["computedUserset"]["relation"]
+            return Node(name=name, leaf=Leaf(computed=Computed(userset=f"{obj}#{computed}")))
+        if "tupleToUserset" in rewrite:
+            tupleset = rewrite["tupleToUserset"]["tupleset"]["relation"]
+            computed = rewrite["tupleToUserset"]["computedUserset"]["relation"]
+            parents = [parent for parent in sorted(self._forward.get((obj, tupleset), {}))
+                       if computed in self._relations(_type_of(parent))]
+            return Node(name=name, leaf=Leaf(tuple_to_userset=UsersetTreeTupleToUserset(
+                tupleset=f"{obj}#{tupleset}",
+                computed=[Computed(userset=f"{parent}#{computed}") for parent in parents])))
+        if "union" in rewrite or "intersection" in rewrite:
+            operator = "union" if "union" in rewrite else "intersection"
+            nodes = Nodes(nodes=[self._expand_node(child, obj, relation)
+                                 for child in rewrite[operator]["child"]])
+            return Node(name=name, **{operator: nodes})
+        if "difference" in rewrite:
+            return Node(name=name, difference=UsersetTreeDifference(
+                base=self._expand_node(rewrite["difference"]["base"], obj, relation),
+                subtract=self._expand_node(rewrite["difference"]["subtract"], obj, relation)))
+        raise FgaValidationException(f"unsupported rewrite {rewrite}")
+
+    def _fixed_point(self, compute) -> Set[str]:
+        """
+        Run a memoized expansion until it stops changing.
+
+        A key met again while it is still being computed (a cycle in the
+        data) sees the previous round's result, starting from the empty set;
+        results only grow between rounds, so recursive models converge.
+        """
+        self._seed = {}
+        while True:
+            self._cycle_hit = False
+            memo: dict = {}
+            result = compute(memo)
+            if not self._cycle_hit or memo == self._seed:
+                return result
+            self._seed = memo
+
+    def _memoized(self, key: tuple, memo: dict, compute) -> Set[str]:
+        if key in memo:
+            if memo[key] is None:
+                self._cycle_hit = True
+                return self._seed.get(key, set())
+            return memo[key]
+        memo[key] = None
+        memo[key] = result = compute()
+        return result
+
+    def _objects(self, user: str, relation: str, type_name: str, context: dict, memo: dict) -> Set[str]:
+        return self._memoized(("objects", user, relation, type_name), memo, lambda: self._objects_rewrite(
+            self._relations(type_name)[relation], user, relation, type_name, context, memo))
+
+    def _objects_rewrite(self, rewrite: dict, user: str, relation: str, type_name: str,
+                         context: dict, memo: dict) -> Set[str]:
+        if "this" in rewrite:
+            subjects = [user]
+            if "#" not in user:
+                subjects.append(f"{_type_of(user)}:*")
+            for restriction in self._direct_types(type_name, relation):
+                if "relation" in restriction:
+                    subjects.extend(f"{s}#{restriction['relation']}" for s in self._objects(
+                        user, restriction["relation"], restriction["type"], context, memo))
+            objects = set()
+            for subject in subjects:
+                for obj in self._reverse.get((subject, relation, type_name), ()):
+                    if self._condition_ok(self._forward[(obj, relation)][subject], context, listing=True):
+                        objects.add(obj)
+            return objects
+        if "computedUserset" in rewrite:
+            return self._objects(user, rewrite["computedUserset"]["relation"], type_name, context, memo)
+        if "tupleToUserset" in rewrite:
+            tupleset = rewrite["tupleToUserset"]["tupleset"]["relation"]
+            computed = rewrite["tupleToUserset"]["computedUserset"]["relation"]
+            objects = set()
+            for restriction in self._direct_types(type_name, tupleset):
+                if computed not in self._relations(restriction["type"]):
+                    continue
+                for parent in self._objects(user, computed, restriction["type"], context, memo):
+                    for obj in self._reverse.get((parent, tupleset, type_name), ()):
+                        if self._condition_ok(self._forward[(obj, tupleset)][parent], context, listing=True):
+                            objects.add(obj)
+            return objects
+        if "union" in rewrite:
+            return set().union(*(self._objects_rewrite(child, user, relation, type_name, context, memo)
+                                 for child in rewrite["union"]["child"]))
+        if "intersection" in rewrite:
+            children = [self._objects_rewrite(child, user, relation, type_name, context, memo)
+                        for child in rewrite["intersection"]["child"]]
+            return set.intersection(*children)
+        if "difference" in rewrite:
+            base = self._objects_rewrite(rewrite["difference"]["base"], user, relation, type_name,
+                                         context, memo)
+            subtract = self._objects_rewrite(rewrite["difference"]["subtract"], user, relation,
+                                             type_name, context, memo)
+            return base - subtract
+        raise FgaValidationException(f"unsupported rewrite {rewrite}")
+
+    def _users(self, obj: str, relation: str, context: dict, memo: dict) -> Set[str]:
+        return self._memoized(("users", obj, relation), memo, lambda: self._users_rewrite(
+            self._relations(_type_of(obj))[relation], obj, relation, context, memo))
+
+    def _users_rewrite(self, rewrite: dict, obj: str, relation: str, context: dict, memo: dict) -> Set[str]:
+        if "this" in rewrite:
+            subjects = set()
+            for subject, condition in self._forward.get((obj, relation), {}).items():
+                if not self._condition_ok(condition, context, listing=True):
+                    continue
+                subjects.add(subject)
+                if "#" in subject:
+                    userset_obj, userset_relation = subject.split("#", 1)
+                    subjects |= self._users(userset_obj, userset_relation, context, memo)
+            return subjects
+        if "computedUserset" in rewrite:
+            return self._users(obj, rewrite["computedUserset"]["relation"], context, memo)
+        if "tupleToUserset" in rewrite:
+            tupleset = rewrite["tupleToUserset"]["tupleset"]["relation"]
+            computed = rewrite["tupleToUserset"]["computedUserset"]["relation"]
+            subjects = set()
+            for parent, condition in self._forward.get((obj, tupleset), {}).items():
+                if (self._condition_ok(condition, context, listing=True)
+                        and computed in self._relations(_type_of(parent))):
+                    subjects |= self._users(parent, computed, context, memo)
+            return subjects
+        if "union" in rewrite:
+            return set().union(*(self._users_rewrite(child, obj, relation, context, memo)
+                                 for child in rewrite["union"]["child"]))
+        if "intersection" in rewrite:
+            children = [self._users_rewrite(child, obj, relation, context, memo)
+                        for child in rewrite["intersection"]["child"]]
+            result = children[0]
+            for child in children[1:]:
+                result = self._intersect(result, child)
+            return result
+        if "difference" in rewrite:
+            base = self._users_rewrite(rewrite["difference"]["base"], obj, relation, context, memo)
+            subtract = self._users_rewrite(rewrite["difference"]["subtract"], obj, relation, context, memo)
+            wildcards = {_type_of(s) for s in subtract if s.endswith(":*")}
+            return {s for s in base - subtract if "#" in s or _type_of(s) not in wildcards}
+        raise FgaValidationException(f"unsupported rewrite {rewrite}")
+
+    @staticmethod
+    def _intersect(a: Set[str], b: Set[str]) -> Set[str]:
+        """Intersect subject sets, letting "type:*" in one side match any object of that type."""
+        wildcards_a = {_type_of(s) for s in a if s.endswith(":*")}
+        wildcards_b = {_type_of(s) for s in b if s.endswith(":*")}
+        result = a & b
+        result |= {s for s in b if "#" not in s and _type_of(s) in wildcards_a}
+        result |= {s for s in a if "#" not in s and _type_of(s) in wildcards_b}
+        return result
+
+    # Tuple store
+
+    @staticmethod
+    def _tuple_dict(t) -> dict:
+        if isinstance(t, dict):
+            return t
+        result = {"user": t.user, "relation": t.relation, "object": t.object}
+        if getattr(t, "condition", None) is not None:
+            result["condition"] = {"name": t.condition.name, "context": t.condition.context}
+        return result
+
+    def _validate_tuple(self, t: dict) -> None:
+        obj_type = _type_of(t["object"])
+        if t["relation"] not in self._relations(obj_type):
+            raise FgaValidationException(f"relation '{obj_type}#{t['relation']}' not found")
+        user = t["user"]
+        user_type = _type_of(user)
+        condition = (t.get("condition") or {}).get("name")
+        for restriction in self._direct_types(obj_type, t["relation"]):
+            if restriction["type"] != user_type or restriction.get("condition") != condition:
+                continue
+            if "relation" in restriction:
+                allowed = "#" in user and user.split("#", 1)[1] == restriction["relation"]
+            elif "wildcard" in restriction:
+                allowed = user.endswith(":*")
+            else:
+                allowed = "#" not in user and not user.endswith(":*")
+            if allowed:
+                return
+        restriction = f"{user_type} with {condition}" if condition else user_type
+        raise FgaValidationException(
+            f"type '{restriction}' is not an allowed type restriction for '{obj_type}#{t['relation']}'")
+
+    def _apply(self, writes: List[dict], deletes: List[dict], validate: bool) -> None:
+        """Apply writes and deletes as one transaction, failing before any change is made."""
+        if validate:
+            pending = set()
+            for t in writes:
+                self._validate_tuple(t)
+                key = (t["object"], t["relation"], t["user"])
+                if t["user"] in self._forward.get(key[:2], {}) or key in pending:
+                    raise FgaValidationException(
+                        f"cannot write a tuple which already exists: user: '{t['user']}', "
+                        f"relation: '{t['relation']}', object: '{t['object']}'")
+                pending.add(key)
+            for t in deletes:
+                if t["user"] not in self._forward.get((t["object"], t["relation"]), {}):
+                    raise FgaValidationException(
+                        f"cannot delete a tuple which does not exist: user: '{t['user']}', "
+                        f"relation: '{t['relation']}', object: '{t['object']}'")
+
+        now = datetime.now(timezone.utc)
+        for t in deletes:
+            users = self._forward[(t["object"], t["relation"])]
+            del users[t["user"]]
+            if not users:
+                del self._forward[(t["object"], t["relation"])]
+            reverse_key = (t["user"], t["relation"], _type_of(t["object"]))
+            self._reverse[reverse_key].discard(t["object"])
+            if not self._reverse[reverse_key]:
+                del self._reverse[reverse_key]
+            self._log(t, TupleOperation.DELETE, now)
+        for t in writes:
+            self._forward.setdefault((t["object"], t["relation"]), {})[t["user"]] = t.get("condition")
+            self._reverse.setdefault((t["user"], t["relation"], _type_of(t["object"])), set()).add(t["object"])
+            self._log(t, TupleOperation.WRITE, now)
+
+    @staticmethod
+    def _tuple_key(user: str, relation: str, obj: str, condition: Optional[dict]) -> TupleKey:
+        if condition is not None:
+            condition = RelationshipCondition(name=condition["name"], context=condition.get("context"))
+        return TupleKey(user=user, relation=relation, object=obj, condition=condition)
+
+    def _log(self, t: dict, operation: str, timestamp: datetime) -> None:
+        self._changes.append(TupleChange(
+            tuple_key=self._tuple_key(t["user"], t["relation"], t["object"], t.get("condition")),
+            operation=operation,
+            timestamp=timestamp,
+        ))
+
+    @staticmethod
+    def _to_user(subject: str) -> User:
+        if "#" in subject:
+            obj, relation = subject.split("#", 1)
+            type_name, obj_id = obj.split(":", 1)
+            return User(userset=UsersetUser(type=type_name, id=obj_id, relation=relation))
+        type_name, obj_id = subject.split(":", 1)
+        if obj_id == "*":
+            return User(wildcard=TypedWildcard(type=type_name))
+        return User(object=FgaObject(type=type_name, id=obj_id))
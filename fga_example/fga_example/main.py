@@ -0,0 +1,270 @@
+"""
+Authorized document API.
+
+FastAPI application serving AuthorizedDocumentService over HTTP:
+
+    GET  /documents/{id}       one document (403 if the user cannot read it)
+    POST /documents/batch      several documents, filtered to the readable ones
+    GET  /me/documents         every document the user can read (the first ``limit`` with limit)
+    GET  /me/documents/stream  the same documents as NDJSON, streamed as they are found
+    GET  /folders/{id}/documents  the documents of a folder the user can read
+    GET  /search               matching documents as JSON (paginated with limit/cursor)
+    GET  /search/stream        matching documents as NDJSON, streamed page by page
+    GET  /health               liveness and pool statistics
+    GET  /metrics              Prometheus metrics (FGA calls, SQL, caches)
+
+List endpoints serialize database rows straight to JSON (DocumentRow and
+documents_json) instead of validating a Document per row; /search,
+/me/documents and /folders/{id}/documents accept include_data=false to
+leave out the data column.
+
+Folder-inherited relations (reader, writer) are checked once per folder
+rather than once per document (see hierarchy.py).
+
+The user is identified by the X-User-Id header. The OpenFGA client and the
+database pool are created in the lifespan hook, once per worker process,
+so the app runs unchanged under ``uvicorn --workers N``.
+
+Configuration (environment):
+    FGA_BACKEND       "openfga" (default) or "local" for the in-process evaluator
+    FGA_TUPLES_FILE   tuples for the local backend (defaults to sample_tuples.json)
+    DOCUMENTS_DB      SQLite database path (defaults to an in-memory database)
+    DB_READERS        number of database reader threads per worker (default 4)
+    FGA_METRICS       set to 0 to turn metrics recording off (on by default here)
+    WARMUP_USERS      active users whose accessible sets are prefetched (default 250, 0 disables)
+    WARMUP_SNAPSHOT   JSON file the active users are saved to on shutdown and replayed from
+                      at startup (see warmup.py)
+"""
+
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+import pydantic_core
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel
+
+from fga_example import metrics
+from fga_example.bulk_import import iter_tuples
+from fga_example.cache import DecisionCache
+from fga_example.client_pool import close_fga_clients, get_fga_client
+from fga_example.document_service import (
+    AuthorizationError,
+    AuthorizedDocumentService,
+    Document,
+    documents_json,
+)
+from fga_example.hierarchy import HierarchyResolver
+from fga_example.planner import SearchPlanner
+from fga_example.singleflight import SingleFlight
+from fga_example.warmup import WarmupScheduler, planner_sets
+
+# Documents per page when streaming search results or accessible documents
+STREAM_PAGE_SIZE = 200
+# Maximum IDs accepted by the batch endpoint
+BATCH_MAX_IDS = 1000
+
+
+class BatchRequest(BaseModel):
+    """Pydantic model for the body of POST /documents/batch."""
+    ids: List[int]
+
+
+def _warmup_users() -> int:
+    return int(os.environ.get("WARMUP_USERS", "250"))
+
+
+async def create_service() -> AuthorizedDocumentService:
+    """Build the document service and its authorization backend from the environment."""
+    service = AuthorizedDocumentService(
+        os.environ.get("DOCUMENTS_DB", ":memory:"),
+        decision_cache=DecisionCache(),
+        inflight=SingleFlight(),
+        max_readers=int(os.environ.get("DB_READERS", "4")),
+        hierarchy=HierarchyResolver.from_model_file(),
+        # Room for every warmed user's sets, which WarmupScheduler requires
+        planner=SearchPlanner(max_users=max(1000, planner_sets(_warmup_users()))),
+    )
+    if os.environ.get("FGA_BACKEND", "openfga") == "local":
+        from fga_example.dsl import load_model
+        from fga_example.fga_client import get_project_root
+        from fga_example.local_fga import LocalFgaClient
+
+        package_dir = get_project_root() / "fga_example"
+        tuples_path = os.environ.get("FGA_TUPLES_FILE", package_dir / "sample_tuples.json")
+        service.fga_client = LocalFgaClient(load_model(package_dir / "model.fga"), iter_tuples(tuples_path))
+    else:
+        service.fga_client = await get_fga_client()
+    return service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    service = app.state.service = await create_service()
+    metrics.enable(os.environ.get("FGA_METRICS", "1") not in ("", "0", "false"))
+    metrics.REGISTRY.add_collector("decision_cache", service.decision_cache.stats)
+    metrics.REGISTRY.add_collector("singleflight", service.inflight.stats)
+    metrics.REGISTRY.add_collector("db_pool", service.db.stats)
+    metrics.REGISTRY.add_collector("hierarchy", service.hierarchy.stats)
+    warmup_users = _warmup_users()
+    warmer = app.state.warmer = None
+    if warmup_users > 0:
+        warmer = app.state.warmer = WarmupScheduler(service, max_users=warmup_users,
+                                                    snapshot_path=os.environ.get("WARMUP_SNAPSHOT"))
+        metrics.REGISTRY.add_collector("warmup", warmer.stats)
+        warmer.start()
+    try:
+        yield
+    finally:
+        if warmer is not None:
+            await warmer.stop()
+        app.state.service.close()
+        await close_fga_clients()
+
+
+app = FastAPI(title="FGA Example Documents", lifespan=lifespan)
+
+
+def _service(request: Request, user_id: Optional[str] = None) -> AuthorizedDocumentService:
+    # Requests of a user keep the user's accessible sets warm
+    warmer = request.app.state.warmer
+    if user_id is not None and warmer is not None:
+        warmer.touch(user_id)
+    return request.app.state.service
+
+
+@app.get("/health")
+async def health(request: Request) -> dict:
+    service = _service(request)
+    return {"status": "ok", "db": service.db.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint() -> PlainTextResponse:
+    exporter = metrics.PrometheusExporter(metrics.REGISTRY)
+    return PlainTextResponse(exporter.render(), media_type=exporter.content_type)
+
+
+@app.get("/documents/{document_id}", response_model=Document)
+async def get_document(document_id: int, request: Request, x_user_id: str = Header()) -> Document:
+    try:
+        document = await _service(request, x_user_id).get_document_by_id(x_user_id, document_id)
+    except AuthorizationError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    if document is None:
+        raise HTTPException(status_code=404, detail=f"Document {document_id} not found")
+    return document
+
+
+def _json(content: bytes) -> Response:
+    return Response(content, media_type="application/json")
+
+
+@app.post("/documents/batch", response_model=List[Document])
+async def get_documents(body: BatchRequest, request: Request, x_user_id: str = Header()) -> Response:
+    if len(body.ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {BATCH_MAX_IDS} ids per request")
+    service = _service(request, x_user_id)
+    return _json(documents_json(await service.get_documents_by_ids(x_user_id, body.ids, raw=True)))
+
+
+@app.get("/me/documents", response_model=List[Document])
+async def my_documents(request: Request, x_user_id: str = Header(),
+                       relation: str = Query("reader", pattern="^(reader|writer|owner)$"),
+                       include_data: bool = True,
+                       limit: Optional[int] = Query(None, gt=0, le=1000)) -> Response:
+    service = _service(request, x_user_id)
+    if limit is None:
+        documents = await service.list_documents(x_user_id, relation, raw=True, include_data=include_data)
+        return _json(documents_json(documents))
+
+    # Stop the listing once limit documents are found, in the order the server finds them
+    documents = []
+    batches = service.iter_documents(x_user_id, relation, batch_size=limit, include_data=include_data)
+    try:
+        async for batch in batches:
+            documents.extend(batch[:limit - len(documents)])
+            if len(documents) == limit:
+                break
+    finally:
+        await batches.aclose()
+    return _json(documents_json(documents))
+
+
+@app.get("/me/documents/stream")
+async def my_documents_stream(request: Request, x_user_id: str = Header(),
+                              relation: str = Query("reader", pattern="^(reader|writer|owner)$"),
+                              include_data: bool = True) -> StreamingResponse:
+    service = _service(request, x_user_id)
+
+    async def lines() -> AsyncIterator[bytes]:
+        batches = service.iter_documents(x_user_id, relation, batch_size=STREAM_PAGE_SIZE,
+                                         include_data=include_data)
+        try:
+            async for batch in batches:
+                yield b"".join(pydantic_core.to_json(document.to_dict()) + b"\n" for document in batch)
+        finally:
+            # Also runs when the client disconnects, which ends the listing on the server
+            await batches.aclose()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.get("/folders/{folder_id}/documents", response_model=List[Document])
+async def folder_documents(folder_id: int, request: Request, x_user_id: str = Header(),
+                           relation: str = Query("reader", pattern="^(reader|writer|owner)$"),
+                           include_data: bool = True) -> Response:
+    service = _service(request, x_user_id)
+    documents = await service.list_folder_documents(x_user_id, folder_id, relation, raw=True,
+                                                    include_data=include_data)
+    return _json(documents_json(documents))
+
+
+@app.get("/search")
+async def search(request: Request, q: str, x_user_id: str = Header(), rank: bool = False,
+                 limit: Optional[int] = Query(None, gt=0, le=1000),
+                 cursor: Optional[str] = None, include_data: bool = True) -> Response:
+    service = _service(request, x_user_id)
+    if limit is None and cursor is None:
+        documents = await service.search_documents(x_user_id, q, rank=rank, raw=True,
+                                                   include_data=include_data)
+        return _json(documents_json(documents))
+    try:
+        documents, next_cursor = await service.search_document_rows_page(
+            x_user_id, q, limit=limit or 20, cursor=cursor, include_data=include_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Same shape as DocumentPage
+    return _json(pydantic_core.to_json({"documents": [document.to_dict() for document in documents],
+                                        "next_cursor": next_cursor}))
+
+
+@app.get("/search/stream")
+async def search_stream(request: Request, q: str, x_user_id: str = Header()) -> StreamingResponse:
+    service = _service(request, x_user_id)
+
+    async def lines() -> AsyncIterator[bytes]:
+        # Authorized page by page, so the first documents go out before the last are checked
+        cursor = None
+        while True:
+            documents, cursor = await service.search_document_rows_page(x_user_id, q, limit=STREAM_PAGE_SIZE,
+                                                                        cursor=cursor)
+            if documents:
+                yield b"".join(pydantic_core.to_json(document.to_dict()) + b"\n" for document in documents)
+            if cursor is None:
+                return
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def main():
+    """Serve the API with uvicorn; HOST, PORT and WEB_CONCURRENCY set the address and workers."""
+    import uvicorn
+
+    uvicorn.run(
+        "fga_example.main:app",
+        host=os.environ.get("HOST", "127.0.0.1"),
+        port=int(os.environ.get("PORT", "8000")),
+        workers=int(os.environ.get("WEB_CONCURRENCY", "1")),
+    )
@@ -0,0 +1,286 @@
+"""
+Metrics for FGA calls, SQL queries and cache layers.
+
+This module contains:
+1. Counter and Histogram: labelled metrics kept in memory
+2. MetricsRegistry: the metrics of this package, and the enabled switch
+3. Exporters: Prometheus text format and an in-memory snapshot for tests
+
+Recording is off until enable() is called (or FGA_METRICS=1 is set).
+While off, instrumented code pays one attribute check per call and
+records nothing, so the instrumentation can stay in hot paths:
+
+    from fga_example import metrics
+
+    metrics.enable()
+    ...
+    print(metrics.PrometheusExporter(metrics.REGISTRY).render())
+
+Cache layers (DecisionCache, SingleFlight, DatabasePool) already count
+their own hits and waits; register their stats() with add_collector to
+export them at scrape time at no cost in the request path.
+"""
+
+import bisect
+import functools
+import os
+import re
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Seconds; covers in-process evaluation up to slow remote calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+LabelValues = Tuple[str, ...]
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str]):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def reset(self) -> None:
+        with self._lock:
+            self.values.clear()
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self.values: Dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self.values.get(label_values)
+            if entry is None:
+                entry = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.values.clear()
+
+
+class MetricsRegistry:
+    """The package's metrics plus scrape-time collectors."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.fga_duration = Histogram(
+            "fga_request_duration_seconds", "Latency of OpenFGA requests",
+            ("operation", "relation"), LATENCY_BUCKETS)
+        self.fga_decisions = Counter(
+            "fga_decisions_total", "Check results returned by OpenFGA",
+            ("operation", "relation", "result"))
+        self.fga_errors = Counter(
+            "fga_errors_total", "OpenFGA requests that raised", ("operation", "relation"))
+        self.fga_retries = Counter(
+            "fga_retries_total", "OpenFGA requests retried by this package", ("operation", "relation"))
+        self.fga_batch_size = Histogram(
+            "fga_batch_size", "Items per OpenFGA batch request", ("operation", "relation"),
+            BATCH_SIZE_BUCKETS)
+        self.sql_duration = Histogram(
+            "sql_query_duration_seconds", "Latency of SQLite statements", ("statement",),
+            LATENCY_BUCKETS)
+        self.metrics = [self.fga_duration, self.fga_decisions, self.fga_errors, self.fga_retries,
+                        self.fga_batch_size, self.sql_duration]
+        self._collectors: Dict[tuple, Tuple[str, Callable[[], Dict[str, float]], Dict[str, str]]] = {}
+
+    def add_collector(self, prefix: str, stats: Callable[[], Dict[str, float]], **labels: str) -> None:
+        """
+        Export a stats() function at scrape time as gauges named prefix_<key>.
+
+        Args:
+            prefix: Metric name prefix, e.g. "decision_cache"
+            stats: Callable returning numeric values by name
+            labels: Constant labels added to every value
+
+        Registering the same prefix and labels again replaces the earlier collector.
+        """
+        self._collectors[(prefix, tuple(sorted(labels.items())))] = (prefix, stats, labels)
+
+    def collect(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """Return (name, labels, value) for every collector value."""
+        samples = []
+        for prefix, stats, labels in self._collectors.values():
+            for key, value in stats().items():
+                if isinstance(value, (int, float)):
+                    samples.append((f"{prefix}_{key}", labels, float(value)))
+        return samples
+
+    def reset(self) -> None:
+        """Clear all recorded values (collectors are kept)."""
+        for metric in self.metrics:
+            metric.reset()
+
+
+REGISTRY = MetricsRegistry(enabled=os.environ.get("FGA_METRICS", "0") not in ("", "0", "false"))
+
+
+def enable(enabled: bool = True) -> None:
+    """Turn recording on or off."""
+    REGISTRY.enabled = enabled
+
+
+def is_enabled() -> bool:
+    return REGISTRY.enabled
+
+
+async def timed(operation: str, relation: str, awaitable: Awaitable[T]) -> T:
+    """Await an OpenFGA request, recording its latency and errors when enabled."""
+    if not REGISTRY.enabled:
+        return await awaitable
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    except Exception:
+        REGISTRY.fga_errors.inc(operation, relation)
+        raise
+    finally:
+        REGISTRY.fga_duration.observe(time.perf_counter() - start, operation, relation)
+
+
+def record_duration(operation: str, relation: str, seconds: float, error: bool = False) -> None:
+    """Record an OpenFGA request timed by the caller, e.g. a stream consumed over many awaits."""
+    if not REGISTRY.enabled:
+        return
+    if error:
+        REGISTRY.fga_errors.inc(operation, relation)
+    REGISTRY.fga_duration.observe(seconds, operation, relation)
+
+
+def record_decisions(operation: str, relation: str, allowed: int, denied: int) -> None:
+    """Count allowed and denied results of a check or batch check."""
+    if not REGISTRY.enabled:
+        return
+    if allowed:
+        REGISTRY.fga_decisions.inc(operation, relation, "allowed", amount=allowed)
+    if denied:
+        REGISTRY.fga_decisions.inc(operation, relation, "denied", amount=denied)
+
+
+def record_batch_size(operation: str, relation: str, size: int) -> None:
+    if REGISTRY.enabled:
+        REGISTRY.fga_batch_size.observe(size, operation, relation)
+
+
+def record_retry(operation: str, relation: str = "") -> None:
+    if REGISTRY.enabled:
+        REGISTRY.fga_retries.inc(operation, relation)
+
+
+@functools.lru_cache(maxsize=1024)
+def statement_label(sql: str) -> str:
+    """Normalize SQL into a bounded-cardinality label (whitespace and IN lists collapsed)."""
+    label = re.sub(r"\s+", " ", sql).strip()
+    label = re.sub(r"\(\s*\?(\s*,\s*\?)*\s*\)", "(?)", label)
+    return label[:160]
+
+
+def record_sql(sql: str, seconds: float) -> None:
+    if REGISTRY.enabled:
+        REGISTRY.sql_duration.observe(seconds, statement_label(sql))
+
+
+# Exporters
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{_escape(str(value))}"' for name, value in (extra or {}).items()]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class PrometheusExporter:
+    """Renders a registry in the Prometheus text exposition format."""
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY):
+        self.registry = registry
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.registry.metrics:
+            kind = "histogram" if isinstance(metric, Histogram) else "counter"
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {kind}")
+            with metric._lock:
+                items = sorted(metric.values.items())
+                if isinstance(metric, Histogram):
+                    items = [(key, ([*counts], total, count)) for key, (counts, total, count) in items]
+            for label_values, value in items:
+                if isinstance(metric, Counter):
+                    lines.append(f"{metric.name}{_labels(metric.labels, label_values)} {value}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(list(metric.buckets) + ["+Inf"], counts):
+                    cumulative += bucket_count
+                    le = {"le": str(bound)}
+                    lines.append(f"{metric.name}_bucket{_labels(metric.labels, label_values, le)} {cumulative}")
+                lines.append(f"{metric.name}_sum{_labels(metric.labels, label_values)} {total}")
+                lines.append(f"{metric.name}_count{_labels(metric.labels, label_values)} {count}")
+        seen = set()
+        for name, labels, value in self.registry.collect():
+            if name not in seen:
+                lines.append(f"# TYPE {name} gauge")
+                seen.add(name)
+            lines.append(f"{name}{_labels((), (), labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class InMemoryExporter:
+    """Returns the registry's current values as plain dicts, for tests and debugging."""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY):
+        self.registry = registry
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Return {metric name: {label values: value}}.
+
+        Counters map to numbers, histograms to {"count", "sum", "buckets"}
+        and collector values are listed under "collected".
+        """
+        result: Dict[str, dict] = {}
+        for metric in self.registry.metrics:
+            with metric._lock:
+                if isinstance(metric, Counter):
+                    result[metric.name] = dict(metric.values)
+                else:
+                    result[metric.name] = {
+                        key: {"count": count, "sum": total,
+                              "buckets": dict(zip(list(metric.buckets) + [float("inf")], counts))}
+                        for key, (counts, total, count) in metric.values.items()
+                    }
+        result["collected"] = {(name, tuple(sorted(labels.items()))): value
+                               for name, labels, value in self.registry.collect()}
+        return result
@@ -0,0 +1,355 @@
+"""
+Local materialized permission index fed by the OpenFGA change feed.
+
+This module contains:
+1. PermissionIndex: SQLite tables holding a copy of the store's tuples and
+   the (user, relation, document) rows derived from them
+2. PermissionIndexSync: a background task tailing ReadChanges into the index
+
+The derivation mirrors the rewrite rules in model.fga:
+
+    folder#editor   = [editors#member]
+    folder#reader   = [user, user with published_only] or editor
+    document#reader = reader from parent
+    document#writer = editor from parent
+    document#owner  = [user] and editor from parent
+
+so "which documents can user X read" becomes a join against
+document_permissions instead of a remote call. Update the SQL below
+together with model.fga.
+
+A reader tuple with the published_only condition only grants the folder's
+published documents, read from the documents table's is_published column;
+tuples with any other condition grant nothing here. Triggers on the
+documents table queue the documents whose is_published changes (or that
+are inserted) in permission_index_pending, and the next apply_changes,
+run on every sync poll, refreshes them with the feed's changes.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from openfga_sdk import OpenFgaClient
+from openfga_sdk.client.models import ClientReadChangesRequest
+from openfga_sdk.models.tuple_operation import TupleOperation
+
+from fga_example.db_pool import DatabasePool
+
+logger = logging.getLogger(__name__)
+
+# (operation, user, relation, object, condition name) with operation a TupleOperation value
+Change = Tuple[str, str, str, str, Optional[str]]
+
+# Rows of document_permissions for the documents listed in _affected_documents
+DERIVE_PERMISSIONS_SQL = '''
+WITH
+members(team, user) AS (
+    SELECT object, user FROM fga_tuples
+    WHERE relation = 'member' AND user LIKE 'user:%'
+),
+folder_editors(folder, user) AS (
+    SELECT t.object, m.user FROM fga_tuples t
+    JOIN members m ON t.user = m.team || '#member'
+    WHERE t.relation = 'editor'
+),
+folder_readers(folder, user, published_only) AS (
+    SELECT object, user, condition IS 'published_only' FROM fga_tuples
+    WHERE relation = 'reader' AND user LIKE 'user:%'
+    AND (condition IS NULL OR condition = 'published_only')
+    UNION
+    SELECT folder, user, 0 FROM folder_editors
+),
+parents(document, folder) AS (
+    SELECT object, user FROM fga_tuples
+    WHERE relation = 'parent' AND object IN (SELECT document FROM _affected_documents)
+)
+SELECT substr(r.user, 6), 'reader', CAST(substr(p.document, 10) AS INTEGER)
+FROM parents p JOIN folder_readers r ON r.folder = p.folder
+WHERE NOT r.published_only OR EXISTS (
+    SELECT 1 FROM documents d WHERE d.id = CAST(substr(p.document, 10) AS INTEGER) AND d.is_published
+)
+UNION
+SELECT substr(e.user, 6), 'writer', CAST(substr(p.document, 10) AS INTEGER)
+FROM parents p JOIN folder_editors e ON e.folder = p.folder
+UNION
+SELECT substr(o.user, 6), 'owner', CAST(substr(p.document, 10) AS INTEGER)
+FROM fga_tuples o
+JOIN parents p ON p.document = o.object
+JOIN folder_editors e ON e.folder = p.folder AND e.user = o.user
+WHERE o.relation = 'owner'
+'''
+
+
+class PermissionIndex:
+    """Materialized (user, relation, document) permissions stored next to the documents table."""
+
+    def __init__(self, conn: sqlite3.Connection, max_lag: float = 5.0):
+        """
+        Initialize the index, creating its tables if needed.
+
+        Args:
+            conn: SQLite connection holding the documents table
+            max_lag: Seconds since the last complete sync after which the
+                index is considered stale
+        """
+        self.conn = conn
+        self.max_lag = max_lag
+        self.last_synced_at: Optional[float] = None
+        self.last_change_at: Optional[str] = None
+        self.applied_changes = 0
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fga_tuples (
+            user TEXT NOT NULL,
+            relation TEXT NOT NULL,
+            object TEXT NOT NULL,
+            condition TEXT,
+            PRIMARY KEY (object, relation, user)
+        )
+        ''')
+        # Indexes created before tuples kept their condition name
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(fga_tuples)")}
+        if "condition" not in columns:
+            cursor.execute("ALTER TABLE fga_tuples ADD COLUMN condition TEXT")
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS fga_tuples_user ON fga_tuples (user, relation)
+        ''')
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS document_permissions (
+            user TEXT NOT NULL,
+            relation TEXT NOT NULL,
+            document INTEGER NOT NULL,
+            PRIMARY KEY (user, relation, document)
+        )
+        ''')
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS document_permissions_document ON document_permissions (document)
+        ''')
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS permission_index_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        ''')
+        # Documents whose published_only grants must be derived again
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS permission_index_pending (
+            document INTEGER PRIMARY KEY
+        )
+        ''')
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS permission_index_publication AFTER UPDATE OF is_published ON documents
+        WHEN old.is_published IS NOT new.is_published BEGIN
+            INSERT OR IGNORE INTO permission_index_pending VALUES (new.id);
+        END
+        ''')
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS permission_index_document AFTER INSERT ON documents BEGIN
+            INSERT OR IGNORE INTO permission_index_pending VALUES (new.id);
+        END
+        ''')
+        self.conn.commit()
+
+    @property
+    def continuation_token(self) -> Optional[str]:
+        """The ReadChanges continuation token of the last applied page."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT value FROM permission_index_state WHERE key = 'continuation_token'")
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def apply_changes(self, changes: Iterable[Change], continuation_token: Optional[str] = None) -> int:
+        """
+        Apply tuple changes and refresh the permissions of every affected document.
+
+        Documents queued by the documents triggers (publication changes) are
+        refreshed too, also when changes is empty. The tuple copy, the derived
+        rows and the continuation token are updated in one transaction, so a
+        crash never leaves them out of step.
+
+        Args:
+            changes: (operation, user, relation, object, condition name) tuples in feed order
+            continuation_token: Token to resume the feed after these changes
+
+        Returns:
+            Number of changes applied
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS _affected_documents (document TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM _affected_documents")
+
+        count = 0
+        anchors = set()
+        for operation, user, relation, object, condition in changes:
+            if operation == TupleOperation.DELETE:
+                cursor.execute("DELETE FROM fga_tuples WHERE object = ? AND relation = ? AND user = ?",
+                               (object, relation, user))
+            else:
+                cursor.execute("INSERT OR IGNORE INTO fga_tuples (user, relation, object, condition) "
+                               "VALUES (?, ?, ?, ?)", (user, relation, object, condition))
+            anchors.add(object)
+            count += 1
+
+        # Deletes only remove an edge below the anchor object, so the documents
+        # depending on an anchor can be found from the post-change tuples.
+        for object in anchors:
+            object_type = object.split(":", 1)[0]
+            if object_type == "document":
+                cursor.execute("INSERT OR IGNORE INTO _affected_documents VALUES (?)", (object,))
+            elif object_type == "folder":
+                cursor.execute('''
+                INSERT OR IGNORE INTO _affected_documents
+                SELECT object FROM fga_tuples WHERE relation = 'parent' AND user = ?
+                ''', (object,))
+            elif object_type == "editors":
+                cursor.execute('''
+                INSERT OR IGNORE INTO _affected_documents
+                SELECT p.object FROM fga_tuples e
+                JOIN fga_tuples p ON p.user = e.object AND p.relation = 'parent'
+                WHERE e.relation = 'editor' AND e.user = ? || '#member'
+                ''', (object,))
+
+        cursor.execute("INSERT OR IGNORE INTO _affected_documents "
+                       "SELECT 'document:' || document FROM permission_index_pending")
+        cursor.execute("DELETE FROM permission_index_pending")
+        self._refresh_affected(cursor)
+        if continuation_token is not None:
+            cursor.execute("INSERT OR REPLACE INTO permission_index_state VALUES ('continuation_token', ?)",
+                           (continuation_token,))
+        self.conn.commit()
+        self.applied_changes += count
+        return count
+
+    def rebuild(self) -> None:
+        """Recompute document_permissions for every document from the tuple copy."""
+        cursor = self.conn.cursor()
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS _affected_documents (document TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM _affected_documents")
+        cursor.execute('''
+        INSERT OR IGNORE INTO _affected_documents
+        SELECT object FROM fga_tuples WHERE object LIKE 'document:%'
+        ''')
+        cursor.execute("DELETE FROM document_permissions")
+        cursor.execute("DELETE FROM permission_index_pending")
+        self._refresh_affected(cursor)
+        self.conn.commit()
+
+    def _refresh_affected(self, cursor: sqlite3.Cursor) -> None:
+        cursor.execute('''
+        DELETE FROM document_permissions WHERE document IN (
+            SELECT CAST(substr(document, 10) AS INTEGER) FROM _affected_documents
+        )
+        ''')
+        cursor.execute(f"INSERT OR IGNORE INTO document_permissions (user, relation, document) "
+                       f"{DERIVE_PERMISSIONS_SQL}")
+
+    def mark_synced(self, last_change_at: Optional[str] = None) -> None:
+        """Record that the change feed was read to its end."""
+        self.last_synced_at = time.monotonic()
+        if last_change_at is not None:
+            self.last_change_at = last_change_at
+
+    def lag_seconds(self) -> float:
+        """Seconds since the feed was last read to its end (infinite if never)."""
+        if self.last_synced_at is None:
+            return float("inf")
+        return time.monotonic() - self.last_synced_at
+
+    def is_fresh(self) -> bool:
+        """Return True if the index may be used instead of live checks."""
+        return self.lag_seconds() <= self.max_lag
+
+
+class PermissionIndexSync:
+    """Background task tailing the store's ReadChanges feed into a PermissionIndex."""
+
+    def __init__(self, client: OpenFgaClient, index: PermissionIndex,
+                 interval: float = 1.0, page_size: int = 100, db: Optional[DatabasePool] = None):
+        """
+        Initialize the sync component.
+
+        Args:
+            client: OpenFgaClient instance for the store to follow
+            index: The PermissionIndex to keep up to date
+            interval: Seconds to wait between polls once the feed is drained
+            page_size: Number of changes requested per ReadChanges call
+            db: DatabasePool whose writer connection the index uses; index
+                updates then run on its writer thread instead of the event loop
+        """
+        self.client = client
+        self.index = index
+        self.interval = interval
+        self.page_size = page_size
+        self.db = db
+        self.errors = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self, fn: Callable[[], Any]) -> Any:
+        if self.db is None:
+            return fn()
+        return await self.db.write(lambda conn: fn())
+
+    async def sync_once(self) -> int:
+        """
+        Read the change feed to its end and apply every page.
+
+        Returns:
+            Number of changes applied
+        """
+        applied = 0
+        token = await self._run(lambda: self.index.continuation_token)
+        while True:
+            options = {"page_size": self.page_size}
+            if token:
+                options["continuation_token"] = token
+            response = await self.client.read_changes(ClientReadChangesRequest(type=None), options)
+
+            changes = [(change.operation, change.tuple_key.user, change.tuple_key.relation,
+                        change.tuple_key.object,
+                        change.tuple_key.condition.name if change.tuple_key.condition else None)
+                       for change in response.changes or []]
+            next_token = response.continuation_token or token
+            applied += await self._run(lambda: self.index.apply_changes(changes, next_token))
+            if response.changes:
+                last = response.changes[-1].timestamp
+                self.index.last_change_at = str(last) if last is not None else None
+
+            # The feed returns an empty page (and the same token) once drained
+            if not response.changes or next_token == token:
+                break
+            token = next_token
+
+        self.index.mark_synced()
+        return applied
+
+    async def run(self) -> None:
+        """Poll the change feed until cancelled."""
+        while True:
+            try:
+                await self.sync_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Keep polling; the index reports itself stale through its lag
+                self.errors += 1
+                logger.exception("Permission index sync failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> asyncio.Task:
+        """Start polling in a background task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
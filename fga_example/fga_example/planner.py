@@ -0,0 +1,242 @@
+"""
+Cost-based choice of authorization strategy for document searches.
+
+A search first finds the rows matching the term, then has to drop the rows
+the user cannot read. There are three ways to do that:
+
+1. check: batch-check every matching row
+2. list: intersect the rows with list_documents_for_user
+3. hybrid: start both and keep whichever finishes first
+
+SearchPlanner picks one per query from the match count and what it knows
+about the size of the user's accessible set, and records the plan and its
+timings so the thresholds can be tuned.
+
+Readers granted through the published_only condition of model.fga only see
+published documents. The planner remembers, per user, whether the user can
+read any document while it is unpublished (as an owner or editor); when not,
+the search adds ``is_published = 1`` to its SQL (plan.published_only) and
+unpublished rows are never authorized. Accessible sets are kept per
+publication status, since they are listed with it as the check context.
+
+Accessible sets and published-only answers decide authorization, so tuple
+writes must reach invalidate_tuples (AuthorizedDocumentService.write_tuples
+and delete_tuples do). Writes made elsewhere are seen once entries expire
+after accessible_ttl. Size estimates are kept: they only pick a strategy.
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+CHECK = "check"
+LIST = "list"
+HYBRID = "hybrid"
+# Filtered by a JOIN on the local permission index (see permission_index.py)
+INDEX = "index"
+
+
+class SearchPlan(BaseModel):
+    """Pydantic model describing how one search was authorized."""
+    strategy: str
+    user_id: str
+    relation: str
+    match_count: int
+    accessible_estimate: Optional[int] = None
+    accessible_cached: bool = False
+    published_only: bool = False
+    winner: Optional[str] = None
+    result_count: int = 0
+    sql_ms: float = 0.0
+    authz_ms: float = 0.0
+    total_ms: float = 0.0
+
+
+class SearchPlanner:
+    """Chooses a SearchPlan strategy and caches users' accessible document sets."""
+
+    def __init__(
+        self,
+        check_threshold: int = 50,
+        list_threshold: int = 500,
+        list_ratio: float = 2.0,
+        accessible_ttl: float = 30.0,
+        size_ttl: float = 600.0,
+        max_users: int = 1000,
+        history_size: int = 100,
+        leaf_types: Iterable[str] = ("document",),
+    ):
+        """
+        Initialize the planner.
+
+        Args:
+            check_threshold: Match counts up to this always use batch checks
+                (50 fits in a single batch check request)
+            list_threshold: Match counts from this always use list_objects
+            list_ratio: Between the thresholds, prefer list_objects when the
+                known accessible set is at most list_ratio times the match count
+            accessible_ttl: Seconds an accessible set may be reused for filtering
+            size_ttl: Seconds an accessible set size is trusted as an estimate
+            max_users: Maximum number of (user, relation, publication status) sets kept
+            history_size: Number of recent plans kept for inspection
+            leaf_types: Object types whose tuples with a user subject only
+                change that user's sets (see invalidate_tuples)
+        """
+        self.check_threshold = check_threshold
+        self.list_threshold = list_threshold
+        self.list_ratio = list_ratio
+        self.accessible_ttl = accessible_ttl
+        self.size_ttl = size_ttl
+        self.max_users = max_users
+        self.leaf_types = set(leaf_types)
+
+        # Keyed on (user, relation, publication status the set was listed for)
+        self._accessible: Dict[Tuple[str, str, Optional[bool]], Tuple[Set[int], float]] = {}
+        self._sizes: Dict[Tuple[str, str, Optional[bool]], Tuple[int, float]] = {}
+        # (user, relation) -> (only published documents are accessible, time learned)
+        self._published_only: Dict[Tuple[str, str], Tuple[bool, float]] = {}
+        self.history: Deque[SearchPlan] = deque(maxlen=history_size)
+
+    @property
+    def last_plan(self) -> Optional[SearchPlan]:
+        """The most recently recorded plan, if any."""
+        return self.history[-1] if self.history else None
+
+    def get_accessible(self, user_id: str, relation: str,
+                       published: Optional[bool] = None) -> Optional[Set[int]]:
+        """
+        Return the cached accessible document IDs, or None if missing or expired.
+
+        published selects the set listed with that publication status as
+        context (None: listed without context).
+        """
+        key = (user_id, relation, published)
+        entry = self._accessible.get(key)
+        if entry is None:
+            return None
+        ids, fetched_at = entry
+        if time.monotonic() - fetched_at > self.accessible_ttl:
+            del self._accessible[key]
+            return None
+        return ids
+
+    def set_accessible(self, user_id: str, relation: str, ids: Set[int],
+                       published: Optional[bool] = None) -> None:
+        """Remember a freshly listed accessible set and its size."""
+        key = (user_id, relation, published)
+        now = time.monotonic()
+        for table in (self._accessible, self._sizes):
+            if key not in table and len(table) >= self.max_users:
+                # Dicts keep insertion order: drop the oldest entry
+                del table[next(iter(table))]
+        self._accessible[key] = (ids, now)
+        self._sizes[key] = (len(ids), now)
+
+    def estimate_accessible(self, user_id: str, relation: str,
+                            published: Optional[bool] = None) -> Optional[int]:
+        """Return the last known accessible set size, or None if unknown or too old."""
+        entry = self._sizes.get((user_id, relation, published))
+        if entry is None or time.monotonic() - entry[1] > self.size_ttl:
+            return None
+        return entry[0]
+
+    def get_published_only(self, user_id: str, relation: str) -> Optional[bool]:
+        """
+        Return whether the user holds the relation on published documents only.
+
+        Returns:
+            True or False as last learned, or None if unknown or expired
+        """
+        entry = self._published_only.get((user_id, relation))
+        if entry is None:
+            return None
+        if time.monotonic() - entry[1] > self.accessible_ttl:
+            del self._published_only[(user_id, relation)]
+            return None
+        return entry[0]
+
+    def set_published_only(self, user_id: str, relation: str, published_only: bool) -> None:
+        """Remember whether the user holds the relation on published documents only."""
+        if (user_id, relation) not in self._published_only and len(self._published_only) >= self.max_users:
+            del self._published_only[next(iter(self._published_only))]
+        self._published_only[(user_id, relation)] = (published_only, time.monotonic())
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Forget cached accessible sets for one user, or for everyone."""
+        if user_id is None:
+            self._accessible.clear()
+            self._published_only.clear()
+            return
+        for table in (self._accessible, self._published_only):
+            for key in [key for key in table if key[0] == user_id]:
+                del table[key]
+
+    def invalidate_tuples(self, tuples: Iterable[dict]) -> None:
+        """
+        Forget the accessible sets a tuple write may have changed.
+
+        A tuple on a leaf type (a document) with a user subject only changes
+        that user's sets. Any other tuple (folder and team tuples, usersets,
+        parent edges) may change the sets of many users, so all are dropped.
+
+        Args:
+            tuples: List of dicts with user, relation, object keys
+        """
+        users = set()
+        for t in tuples:
+            subject_type, _, subject = t["user"].partition(":")
+            if (t["object"].split(":", 1)[0] not in self.leaf_types or subject_type != "user"
+                    or "#" in subject or subject == "*"):
+                self.invalidate()
+                return
+            users.add(subject)
+        for user_id in users:
+            self.invalidate(user_id)
+
+    def choose(self, user_id: str, relation: str, match_count: int,
+               published_only: bool = False) -> SearchPlan:
+        """
+        Pick the authorization strategy for a search.
+
+        Args:
+            user_id: The user searching
+            relation: The relation required on each document
+            match_count: Number of rows matching the search term
+            published_only: The rows were filtered to published documents, so
+                only the accessible set listed for published documents is needed
+
+        Returns:
+            A SearchPlan with the strategy filled in
+        """
+        statuses = (True,) if published_only else (True, False)
+        cached = all(self.get_accessible(user_id, relation, published) is not None for published in statuses)
+        estimates = [self.estimate_accessible(user_id, relation, published) for published in statuses]
+        estimate = None if None in estimates else sum(estimates)
+
+        if cached and match_count > 0:
+            # Intersecting with a cached set costs no FGA call at all
+            strategy = LIST
+        elif match_count <= self.check_threshold:
+            strategy = CHECK
+        elif match_count >= self.list_threshold:
+            strategy = LIST
+        elif estimate is not None:
+            strategy = LIST if estimate <= self.list_ratio * match_count else CHECK
+        else:
+            strategy = HYBRID
+
+        return SearchPlan(
+            strategy=strategy,
+            user_id=user_id,
+            relation=relation,
+            match_count=match_count,
+            accessible_estimate=estimate,
+            accessible_cached=cached,
+            published_only=published_only,
+        )
+
+    def record(self, plan: SearchPlan) -> None:
+        """Store a completed plan in the history."""
+        self.history.append(plan)
@@ -0,0 +1,297 @@
+"""
+Incremental setup: bring an existing store in line with the desired state.
+
+This module contains:
+1. find_store: looks a store up by ID or name
+2. ensure_authorization_model: reuses the store's latest model when it matches model.fga
+3. read_tuple_keys: reads every tuple of a store, page by page
+4. diff_tuples / reconcile_tuples: writes and deletes only the difference
+
+Running setup again against a large, mostly unchanged dataset then costs
+one paged read of the store instead of a full import, and leaves no
+extra stores or models behind.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from openfga_sdk import OpenFgaClient
+from openfga_sdk.exceptions import NotFoundException, ValidationException
+from openfga_sdk.models.read_request_tuple_key import ReadRequestTupleKey
+from pydantic import BaseModel
+
+from fga_example.bulk_import import import_tuples
+from fga_example.cache import context_key
+from fga_example.client_pool import get_client_factory
+from fga_example.dsl import load_model
+from fga_example.fga_client import (
+    get_project_root,
+    initialize_authorization_model,
+    initialize_store,
+    model_content_hash,
+)
+
+# OpenFGA caps read and list-stores pages at 100 items
+READ_PAGE_SIZE = 100
+
+# (user, relation, object, condition name, condition context as cache.context_key)
+TupleKey = Tuple[str, str, str, Optional[str], Optional[str]]
+
+
+class TupleDiff(BaseModel):
+    """Pydantic model with the tuples to write and delete to reach the desired state."""
+    to_write: List[dict] = []
+    to_delete: List[dict] = []
+    unchanged: int = 0
+
+
+class ReconcileResult(BaseModel):
+    """Pydantic model summarizing a reconcile run."""
+    store_id: str
+    authorization_model_id: str
+    store_created: bool
+    model_written: bool
+    written: int
+    deleted: int
+    unchanged: int
+
+
+def tuple_key(t: dict) -> TupleKey:
+    """Identity of a tuple dict for diffing, including its condition's name and context."""
+    condition = t.get("condition")
+    if not condition:
+        return t["user"], t["relation"], t["object"], None, None
+    return t["user"], t["relation"], t["object"], condition["name"], context_key(condition.get("context"))
+
+
+def _tuple_dict(key: TupleKey) -> dict:
+    user, relation, obj, _, _ = key
+    return {"user": user, "relation": relation, "object": obj}
+
+
+async def find_store(api_url: Optional[str] = None, name: Optional[str] = None,
+                     store_id: Optional[str] = None) -> Optional[str]:
+    """
+    Find an existing store.
+
+    Args:
+        api_url: URL of the OpenFGA API
+        name: Store name to look for when no ID is given; the most recently
+            created store wins if several share the name
+        store_id: Store ID to confirm
+
+    Returns:
+        The store ID, or None if there is no such store
+    """
+    if store_id:
+        client = await get_client_factory().get(api_url, store_id, warm=False)
+        try:
+            await client.get_store()
+        except (NotFoundException, ValidationException):
+            return None
+        return store_id
+
+    client = await get_client_factory().get(api_url)
+    matches = []
+    continuation_token = None
+    while True:
+        # Servers that do not support the name filter return every store; matches are checked below
+        options = {"page_size": READ_PAGE_SIZE, "name": name}
+        if continuation_token:
+            options["continuation_token"] = continuation_token
+        response = await client.list_stores(options)
+        matches.extend(store for store in response.stores if store.name == name)
+        continuation_token = response.continuation_token
+        if not continuation_token:
+            break
+    if not matches:
+        return None
+    return max(matches, key=lambda store: store.created_at).id
+
+
+def _normalize_model(value):
+    """Comparable form of a model: SDK attribute names, no empty or null fields."""
+    if isinstance(value, dict):
+        normalized = {}
+        for key, item in value.items():
+            # The DSL output uses the API's camelCase names for these two
+            key = {"computedUserset": "computed_userset", "tupleToUserset": "tuple_to_userset"}.get(key, key)
+            item = _normalize_model(item)
+            # Empty "this" and "wildcard" markers are meaningful
+            if item is None or item == "" or (item in ({}, []) and key not in ("this", "wildcard")):
+                continue
+            normalized[key] = item
+        return normalized
+    if isinstance(value, list):
+        return [_normalize_model(item) for item in value]
+    return value
+
+
+async def ensure_authorization_model(client: OpenFgaClient, model_path=None,
+                                     api_url: Optional[str] = None) -> Tuple[str, bool]:
+    """
+    Return the ID of a model matching model.fga, writing one only if needed.
+
+    The store's latest model is compared with the compiled model file by
+    content hash; see also the local model ID cache of
+    initialize_authorization_model.
+
+    Args:
+        client: OpenFgaClient bound to the store
+        model_path: Path to the model.fga file, defaults to the project's model.fga
+        api_url: API URL of the store
+
+    Returns:
+        (authorization model ID, whether a new model was written)
+    """
+    if model_path is None:
+        model_path = get_project_root() / "fga_example" / "model.fga"
+    desired = model_content_hash(_normalize_model(load_model(model_path)))
+    try:
+        response = await client.read_latest_authorization_model()
+    except NotFoundException:
+        response = None
+    latest = response.authorization_model if response is not None else None
+    if latest is not None:
+        current = latest.to_dict()
+        current.pop("id", None)
+        if model_content_hash(_normalize_model(current)) == desired:
+            print(f"Authorization model unchanged, reusing ID: {latest.id}")
+            return latest.id, False
+
+    store_id = client.get_store_id()
+    model_id = await initialize_authorization_model(model_path=model_path, store_id=store_id,
+                                                    api_url=api_url)
+    return model_id, True
+
+
+async def read_tuple_keys(client: OpenFgaClient, types: Optional[Iterable[str]] = None) -> Set[TupleKey]:
+    """
+    Read every tuple of the store.
+
+    The store is read with an empty tuple key, the only Read that returns
+    every tuple: OpenFGA rejects a type-only object ("folder:") without a user.
+
+    Args:
+        client: OpenFgaClient bound to the store
+        types: Optional object types to keep; tuples on other types are left out
+
+    Returns:
+        The set of tuple keys in the store
+    """
+    types = set(types) if types is not None else None
+    keys: Set[TupleKey] = set()
+    continuation_token = None
+    while True:
+        options = {"page_size": READ_PAGE_SIZE}
+        if continuation_token:
+            options["continuation_token"] = continuation_token
+        response = await client.read(ReadRequestTupleKey(), options)
+        for t in response.tuples:
+            if types is not None and t.key.object.split(":", 1)[0] not in types:
+                continue
+            condition = t.key.condition
+            keys.add((t.key.user, t.key.relation, t.key.object,
+                      condition.name if condition else None,
+                      context_key(condition.context) if condition else None))
+        continuation_token = response.continuation_token
+        if not continuation_token:
+            return keys
+
+
+def diff_tuples(current: Set[TupleKey], desired: Iterable[dict]) -> TupleDiff:
+    """
+    Compute the writes and deletes that turn current into desired.
+
+    A tuple whose condition or condition context changed is deleted and
+    written again.
+    """
+    desired_keys: Dict[TupleKey, dict] = {tuple_key(t): t for t in desired}
+    diff = TupleDiff()
+    diff.to_write = [t for key, t in desired_keys.items() if key not in current]
+    diff.to_delete = [_tuple_dict(key) for key in current if key not in desired_keys]
+    diff.unchanged = len(desired_keys) - len(diff.to_write)
+    return diff
+
+
+async def reconcile_tuples(client: OpenFgaClient, desired: Iterable[dict], types: Iterable[str],
+                           delete: bool = True, **import_options) -> TupleDiff:
+    """
+    Make the store's tuples equal to desired, writing and deleting only the difference.
+
+    Args:
+        client: OpenFgaClient bound to the store
+        desired: Iterable of tuple dicts (e.g. iter_tuples(path))
+        types: Object types of the model; tuples on other types are left alone
+        delete: Also delete tuples missing from desired
+        import_options: Passed on to import_tuples (chunk_size, max_concurrency, ...)
+
+    Returns:
+        The applied TupleDiff
+    """
+    current = await read_tuple_keys(client, types)
+    diff = diff_tuples(current, desired)
+    if not delete:
+        diff.to_delete = []
+    print(f"{len(current)} tuples in store: {len(diff.to_write)} to write, "
+          f"{len(diff.to_delete)} to delete, {diff.unchanged} unchanged")
+    # Deletes first, so a tuple whose condition changed is removed before it is rewritten
+    if diff.to_delete:
+        await import_tuples(client, diff.to_delete, delete=True, **import_options)
+    if diff.to_write:
+        await import_tuples(client, diff.to_write, **import_options)
+    return diff
+
+
+async def reconcile_project(tuples: Iterable[dict], store_name: str, store_id: Optional[str] = None,
+                            api_url: Optional[str] = None, model_path=None,
+                            delete: bool = True) -> ReconcileResult:
+    """
+    Find or create the store, then bring its model and tuples up to date.
+
+    Args:
+        tuples: Desired tuples (e.g. iter_tuples(path))
+        store_name: Name of the store to find, or to create if it does not exist
+        store_id: ID of the store to use instead of looking it up by name
+        api_url: URL of the OpenFGA API
+        model_path: Path to the model.fga file, defaults to the project's model.fga
+        delete: Also delete tuples that are not in tuples
+
+    Returns:
+        ReconcileResult
+    """
+    if model_path is None:
+        model_path = get_project_root() / "fga_example" / "model.fga"
+
+    found = await find_store(api_url, name=store_name, store_id=store_id)
+    if store_id and found is None:
+        raise ValueError(f"Store {store_id} not found")
+    store_created = found is None
+    if store_created:
+        found = await initialize_store(api_url=api_url, store_name=store_name)
+        print(f"Store {store_name!r} not found, created it with ID: {found}")
+    else:
+        print(f"Reconciling store {store_name!r} with ID: {found}")
+
+    store_client = await get_client_factory().get(api_url, found)
+    model_id, model_written = await ensure_authorization_model(store_client, model_path, api_url)
+
+    client = await get_client_factory().get(api_url, found, model_id)
+    types = [type_def["type"] for type_def in load_model(model_path)["type_definitions"]]
+    if store_created:
+        # Nothing to diff against
+        current: Set[TupleKey] = set()
+        diff = diff_tuples(current, tuples)
+        if diff.to_write:
+            await import_tuples(client, diff.to_write)
+    else:
+        diff = await reconcile_tuples(client, tuples, types, delete=delete)
+
+    return ReconcileResult(
+        store_id=found,
+        authorization_model_id=model_id,
+        store_created=store_created,
+        model_written=model_written,
+        written=len(diff.to_write),
+        deleted=len(diff.to_delete),
+        unchanged=diff.unchanged,
+    )
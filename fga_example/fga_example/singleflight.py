@@ -0,0 +1,81 @@
+"""
+Coalescing of concurrent identical OpenFGA requests.
+
+This module contains:
+1. SingleFlight: an in-flight request table that lets concurrent callers
+   asking the same question share one awaited request
+
+Unlike DecisionCache, nothing is kept once the request completes, so
+results are never stale.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    In-flight request table keyed on the request parameters.
+
+    The first caller for a key starts the request as a task; callers arriving
+    while it runs await the same task. Errors are raised to every waiter.
+    Cancelling one waiter does not affect the others; the underlying request
+    is only cancelled once every waiter has gone away.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() once for all concurrent callers using the same key.
+
+        Args:
+            key: Hashable identity of the request
+            fn: Zero-argument callable returning the awaitable to run
+
+        Returns:
+            The result of fn()
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda _, key=key, task=task: self._forget(key, task))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.done() or self._calls.get(key) is not task:
+                raise
+            self._waiters[key] -= 1
+            if self._waiters[key] == 0:
+                # Nobody is left to receive the result; drop the entry right
+                # away so a new caller starts a fresh request.
+                self._forget(key, task)
+                task.cancel()
+            raise
+
+    def stats(self) -> Dict[str, int]:
+        """Return started/coalesced counters and the number of requests in flight."""
+        return {
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+        }
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
@@ -0,0 +1,261 @@
+"""
+Background warm-up of accessible document sets for active users.
+
+The first list or search of a user, after a login or a process restart,
+pays for list_documents_for_user before the planner has the user's
+accessible sets. This module moves that cost off the request path.
+
+This module contains:
+1. WarmupScheduler: tracks a bounded set of recently active users and keeps
+   their accessible sets (reader and writer by default) in the service's
+   planner, listing them in the background with limited concurrency and
+   refreshing them shortly before the planner's TTL expires
+2. Activity snapshots: the active user set is saved to a JSON file on stop
+   (and periodically), and replayed at startup, so a deployed or restarted
+   process warms the users who were active before it started
+
+Users idle for longer than idle_ttl stop being refreshed; their entries
+then simply expire in the planner.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from fga_example.document_service import AuthorizedDocumentService
+
+logger = logging.getLogger(__name__)
+
+# Relations prefetched by default
+DEFAULT_RELATIONS = ("reader", "writer")
+
+
+def planner_sets(max_users: int, relations: Iterable[str] = DEFAULT_RELATIONS) -> int:
+    """Return the number of planner sets max_users warmed users take (one per relation and publication status)."""
+    return max_users * len(list(relations)) * 2
+
+
+class WarmupScheduler:
+    """
+    Prefetches the planner's accessible sets for the most recently active users.
+
+    Call touch() for every request; the background task (start/stop) lists
+    the accessible sets of newly seen users and refreshes known ones
+    refresh_margin seconds before the planner would drop them.
+    """
+
+    def __init__(self, service: AuthorizedDocumentService, relations: Iterable[str] = DEFAULT_RELATIONS,
+                 max_users: int = 250, max_concurrency: int = 4, refresh_margin: float = 5.0,
+                 idle_ttl: float = 900.0, interval: float = 1.0, snapshot_path: Optional[str] = None,
+                 snapshot_interval: float = 60.0):
+        """
+        Initialize the scheduler.
+
+        Args:
+            service: The service whose planner is kept warm
+            relations: Relations to prefetch accessible sets for
+            max_users: Maximum number of active users tracked; the least
+                recently active user is dropped first. Each user takes two
+                planner sets per relation (published and not), which must fit
+                the planner's max_users (see planner_sets)
+            max_concurrency: Maximum number of users warmed at once
+            refresh_margin: Seconds before the planner's accessible_ttl at
+                which a user's sets are listed again
+            idle_ttl: Seconds without activity after which a user is dropped
+            interval: Seconds between scheduling passes
+            snapshot_path: JSON file the active users are saved to and loaded from
+            snapshot_interval: Seconds between periodic snapshot saves
+        """
+        if max_users <= 0 or max_concurrency <= 0:
+            raise ValueError("max_users and max_concurrency must be positive integers")
+        relations = list(relations)
+        if planner_sets(max_users, relations) > service.planner.max_users:
+            raise ValueError("max_users warmed sets do not fit the planner's max_users")
+        if refresh_margin >= service.planner.accessible_ttl:
+            raise ValueError("refresh_margin must be shorter than the planner's accessible_ttl")
+        self.service = service
+        self.relations = relations
+        self.max_users = max_users
+        self.max_concurrency = max_concurrency
+        self.refresh_margin = refresh_margin
+        self.idle_ttl = idle_ttl
+        self.interval = interval
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+
+        # user_id -> last activity (wall clock, so snapshots survive restarts), least recent first
+        self._active: "OrderedDict[str, float]" = OrderedDict()
+        # user_id -> monotonic time at which the user's sets are due for a listing
+        self._due: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.warmed = 0
+        self.refreshed = 0
+        self.listings = 0
+        self.errors = 0
+
+    def touch(self, user_id: str) -> None:
+        """Record activity of a user; a user not seen before is warmed on the next pass."""
+        self._active[user_id] = time.time()
+        self._active.move_to_end(user_id)
+        self._due.setdefault(user_id, 0.0)
+        while len(self._active) > self.max_users:
+            self._drop(next(iter(self._active)))
+
+    def _drop(self, user_id: str) -> None:
+        self._active.pop(user_id, None)
+        self._due.pop(user_id, None)
+
+    def due_users(self) -> List[str]:
+        """Return the active users whose sets are due, most recently active first; drops idle users."""
+        now, wall = time.monotonic(), time.time()
+        for user_id in [user_id for user_id, active_at in self._active.items() if wall - active_at > self.idle_ttl]:
+            self._drop(user_id)
+        return [user_id for user_id in reversed(self._active) if self._due.get(user_id, 0.0) <= now]
+
+    async def _warm(self, user_id: str, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            if user_id not in self._active:
+                # Dropped while waiting for a slot
+                return
+            first = self._due.get(user_id) == 0.0
+            try:
+                # A first warm-up skips sets the user's own requests already listed
+                listings = await self.service.prefetch_accessible(user_id, self.relations, refresh=not first)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Try again on a later pass; requests fall back to listing on demand
+                self.errors += 1
+                logger.exception("Warm-up failed for user %s", user_id)
+                if user_id in self._due:
+                    self._due[user_id] = time.monotonic() + self.refresh_margin
+                return
+            self.listings += listings
+            if user_id in self._due:
+                self._due[user_id] = (time.monotonic() + self.service.planner.accessible_ttl
+                                      - self.refresh_margin)
+            if first:
+                self.warmed += 1
+            else:
+                self.refreshed += 1
+
+    async def warm_once(self) -> int:
+        """
+        List the accessible sets of every due user.
+
+        Returns:
+            Number of users warmed or refreshed
+        """
+        users = self.due_users()
+        if users:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            await asyncio.gather(*(self._warm(user_id, semaphore) for user_id in users))
+        return len(users)
+
+    def load_snapshot(self) -> int:
+        """
+        Replay the activity snapshot, if there is one.
+
+        Users idle for longer than idle_ttl are skipped; the others are
+        warmed on the next pass, most recently active first.
+
+        Returns:
+            Number of users loaded
+        """
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return 0
+        try:
+            with open(self.snapshot_path, 'r') as file:
+                users = json.load(file)["users"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable warm-up snapshot %s: %s", self.snapshot_path, e)
+            return 0
+        wall = time.time()
+        loaded = []
+        for user_id, active_at in sorted(users.items(), key=lambda item: item[1]):
+            if wall - active_at > self.idle_ttl or user_id in self._active:
+                continue
+            self._active[user_id] = active_at
+            self._due[user_id] = 0.0
+            loaded.append(user_id)
+        # Keep recency order after merging with users touched before the replay
+        for user_id in sorted(self._active, key=self._active.get):
+            self._active.move_to_end(user_id)
+        while len(self._active) > self.max_users:
+            self._drop(next(iter(self._active)))
+        return sum(1 for user_id in loaded if user_id in self._active)
+
+    def save_snapshot(self) -> None:
+        """
+        Write the active users to the snapshot file.
+
+        Entries already in the file (from other worker processes) are merged
+        by latest activity, and the file is replaced atomically.
+        """
+        if not self.snapshot_path:
+            return
+        users = {}
+        try:
+            with open(self.snapshot_path, 'r') as file:
+                users = json.load(file)["users"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        for user_id, active_at in self._active.items():
+            users[user_id] = max(active_at, users.get(user_id, 0.0))
+        wall = time.time()
+        recent = sorted((item for item in users.items() if wall - item[1] <= self.idle_ttl),
+                        key=lambda item: item[1])[-self.max_users:]
+
+        temp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as file:
+            json.dump({"saved_at": wall, "users": dict(recent)}, file)
+        os.replace(temp_path, self.snapshot_path)
+
+    async def run(self) -> None:
+        """Warm due users every interval and save the snapshot every snapshot_interval, until cancelled."""
+        saved_at = time.monotonic()
+        while True:
+            try:
+                await self.warm_once()
+                if self.snapshot_path and time.monotonic() - saved_at >= self.snapshot_interval:
+                    self.save_snapshot()
+                    saved_at = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.errors += 1
+                logger.exception("Warm-up pass failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> asyncio.Task:
+        """Replay the snapshot and start warming in a background task."""
+        if self._task is None or self._task.done():
+            self.load_snapshot()
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop the background task and save the snapshot."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.save_snapshot()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of tracked users and warm-up counters."""
+        return {
+            "users": len(self._active),
+            "warmed": self.warmed,
+            "refreshed": self.refreshed,
+            "listings": self.listings,
+            "errors": self.errors,
+        }
+
+    def __len__(self) -> int:
+        return len(self._active)